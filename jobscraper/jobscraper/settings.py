@@ -4,8 +4,8 @@ from pathlib import Path
 
 # Load environment variables from .env file if it exists
 env_path = Path(__file__).resolve().parent.parent.parent / '.env'
+# Quietly: commands' stdout is often parsed or mailed by cron
 if env_path.exists():
-    print(f"Loading environment variables from {env_path}")
     with open(env_path) as f:
         for line in f:
             line = line.strip()
@@ -13,8 +13,6 @@ if env_path.exists():
                 continue
             key, value = line.split('=', 1)
             os.environ[key] = value.strip()
-            # Uncomment for debugging
-            # print(f"Set {key}={value.strip()}")
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -91,6 +89,31 @@ else:
         }
     }
 
+# Read replica for reporting commands and the digest selection (see
+# scraper/routers.py). PGREPLICA_* default to the primary's PG* values, so
+# e.g. only PGREPLICA_HOST needs setting. Without Postgres, SQLITE_REPLICA_NAME
+# names a second SQLite file to try the routing locally.
+if os.environ.get('PGDATABASE') and (os.environ.get('PGREPLICA_HOST') or os.environ.get('PGREPLICA_DATABASE')):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('PGREPLICA_DATABASE', DATABASES['default']['NAME']),
+        'USER': os.environ.get('PGREPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get('PGREPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.environ.get('PGREPLICA_HOST', DATABASES['default']['HOST']),
+        'PORT': os.environ.get('PGREPLICA_PORT', DATABASES['default']['PORT']),
+    }
+elif not os.environ.get('PGDATABASE') and os.environ.get('SQLITE_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('SQLITE_REPLICA_NAME'),
+    }
+
+DATABASE_ROUTERS = ['scraper.routers.ReplicaRouter']
+# Alias of the replica, empty to read everything from the primary
+REPLICA_DATABASE = 'replica' if 'replica' in DATABASES else ''
+# Above this lag, replica_reads() reads from the primary instead
+REPLICA_MAX_LAG_SECONDS = int(os.environ.get('REPLICA_MAX_LAG_SECONDS', '30'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/dev/ref/settings/#auth-password-validators
@@ -142,6 +165,160 @@ EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
+# Seconds before a slow SMTP server fails the attempt
+EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', 30))
+
+# Emails are queued in grabbo_email_outbox and sent by scraper.outbox,
+# EMAIL_OUTBOX_BATCH at a time over one connection. A failed email is retried
+# with backoff until it has been attempted EMAIL_OUTBOX_MAX_ATTEMPTS times; a
+# sender holding it longer than the lease is presumed dead. The lease is
+# renewed before each send, so it must outlast one send (EMAIL_TIMEOUT).
+EMAIL_OUTBOX_BATCH = int(os.environ.get('EMAIL_OUTBOX_BATCH', 50))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+EMAIL_OUTBOX_LEASE_SECONDS = int(os.environ.get('EMAIL_OUTBOX_LEASE_SECONDS', 300))
+
+# Listing pages are queued in grabbo_page_work_item. A page is retried until it
+# has been attempted this many times; a worker holding a page longer than the
+# lease is presumed dead and the page goes to another worker.
+SCRAPER_MAX_PAGE_ATTEMPTS = int(os.environ.get('SCRAPER_MAX_PAGE_ATTEMPTS', 3))
+SCRAPER_PAGE_LEASE_SECONDS = int(os.environ.get('SCRAPER_PAGE_LEASE_SECONDS', 300))
+# Pages queued ahead of the last one processed, so several browsers can scrape
+# one search side by side. A search whose page count is known is queued whole.
+SCRAPER_QUEUE_WINDOW = int(os.environ.get('SCRAPER_QUEUE_WINDOW', 2))
+# Pages past the last one of a search have no offers and fail; after this many
+# failed pages in a row, a search whose page count is unknown is taken as ended
+SCRAPER_MAX_FAILED_PAGES = int(os.environ.get('SCRAPER_MAX_FAILED_PAGES', 3))
+# Loads of a page within one attempt before the attempt counts as failed
+SCRAPER_PAGE_RETRIES = int(os.environ.get('SCRAPER_PAGE_RETRIES', 2))
+# A listing page is read once it shows SCRAPER_READY_MIN_OFFERS offers (or
+# has finished loading with fewer), or, if SCRAPER_READY_RESPONSE is set, once
+# a response whose URL contains it has arrived.
+SCRAPER_READY_MIN_OFFERS = int(os.environ.get('SCRAPER_READY_MIN_OFFERS', 20))
+SCRAPER_READY_RESPONSE = os.environ.get('SCRAPER_READY_RESPONSE', '')
+# Page timeouts are the p95 latency of the last pages times
+# SCRAPER_TIMEOUT_P95_FACTOR, at least SCRAPER_TIMEOUT_MIN_SECONDS. Until
+# SCRAPER_TIMEOUT_MIN_SAMPLES pages were timed, the 20s/10s ceilings apply.
+SCRAPER_TIMEOUT_P95_FACTOR = float(os.environ.get('SCRAPER_TIMEOUT_P95_FACTOR', 3))
+SCRAPER_TIMEOUT_MIN_SECONDS = float(os.environ.get('SCRAPER_TIMEOUT_MIN_SECONDS', 3))
+SCRAPER_TIMEOUT_MIN_SAMPLES = int(os.environ.get('SCRAPER_TIMEOUT_MIN_SAMPLES', 20))
+
+# Requests per second to each host. The rate starts at SCRAPER_RATE_INITIAL
+# and adapts between the min and max: it grows while responses are fast and
+# halves on 429, 5xx, timeouts or responses slower than SCRAPER_TARGET_LATENCY.
+SCRAPER_RATE_INITIAL = float(os.environ.get('SCRAPER_RATE_INITIAL', 0.5))
+SCRAPER_RATE_MIN = float(os.environ.get('SCRAPER_RATE_MIN', 0.1))
+SCRAPER_RATE_MAX = float(os.environ.get('SCRAPER_RATE_MAX', 2.0))
+SCRAPER_TARGET_LATENCY = float(os.environ.get('SCRAPER_TARGET_LATENCY', 5.0))
+# Consecutive failures that pause a host, and the initial pause in seconds
+SCRAPER_BREAKER_THRESHOLD = int(os.environ.get('SCRAPER_BREAKER_THRESHOLD', 5))
+SCRAPER_BREAKER_COOLDOWN = float(os.environ.get('SCRAPER_BREAKER_COOLDOWN', 30))
+
+# Hours a listing page's fingerprint is trusted. Within that time a page listing
+# the same offers (ids and links) is not parsed or checked against the
+# database, so edits to an offer show up once its page's fingerprint expires.
+SCRAPER_PAGE_CACHE_TTL_HOURS = int(os.environ.get('SCRAPER_PAGE_CACHE_TTL_HOURS', 72))
+
+# Memory budgets in MB. Python RSS is the scraper process, browser RSS is the
+# Playwright driver and Chromium. The browser is recycled every
+# SCRAPER_PAGES_PER_BROWSER pages, earlier when over its budget, and fewer
+# pages go through each browser while Python is over its budget.
+SCRAPER_PAGES_PER_BROWSER = int(os.environ.get('SCRAPER_PAGES_PER_BROWSER', 2))
+SCRAPER_PYTHON_RSS_BUDGET_MB = int(os.environ.get('SCRAPER_PYTHON_RSS_BUDGET_MB', 300))
+SCRAPER_BROWSER_RSS_BUDGET_MB = int(os.environ.get('SCRAPER_BROWSER_RSS_BUDGET_MB', 400))
+
+# Searches with more listing pages than SCRAPER_PARTITION_PAGE_BUDGET are split
+# into sub-searches (see scraper/partition.py). Queued pages, of one search or
+# its parts, are scraped by up to SCRAPER_PARTITION_CONCURRENCY browsers at
+# once. 0 disables splitting.
+# SCRAPER_PARTITION_FACETS are the filters to split on, "param=v1,v2;param=..."
+SCRAPER_PARTITION_PAGE_BUDGET = int(os.environ.get('SCRAPER_PARTITION_PAGE_BUDGET', 15))
+SCRAPER_PARTITION_CONCURRENCY = int(os.environ.get('SCRAPER_PARTITION_CONCURRENCY', 2))
+SCRAPER_PARTITION_FACETS = os.environ.get(
+    'SCRAPER_PARTITION_FACETS', 'wm=full-office,hybrid,home-office,mobile;et=1,3,17,4,18,19,20,21'
+)
+
+# Parallel requests of the HTTP client (offer details), still rate limited per host
+SCRAPER_HTTP_CONCURRENCY = int(os.environ.get('SCRAPER_HTTP_CONCURRENCY', 4))
+# Offer pages fetched per enrichment run
+ENRICH_BUDGET = int(os.environ.get('ENRICH_BUDGET', 200))
+# Fetches of an offer page before enrichment gives up on it; failed ones are
+# retried after a backoff of an hour or more, so they don't take the budget
+ENRICH_MAX_ATTEMPTS = int(os.environ.get('ENRICH_MAX_ATTEMPTS', 5))
+# Company profile pages fetched per run, and days a company's industry and
+# size are trusted before its profile is fetched again
+COMPANY_ENRICH_BUDGET = int(os.environ.get('COMPANY_ENRICH_BUDGET', 100))
+COMPANY_ENRICH_TTL_DAYS = int(os.environ.get('COMPANY_ENRICH_TTL_DAYS', 30))
+
+# The digest sends relevant offers not sent before, scraped in the last
+# DIGEST_LOOKBACK_DAYS days
+DIGEST_LOOKBACK_DAYS = int(os.environ.get('DIGEST_LOOKBACK_DAYS', 3))
+
+# Offers paying at most this much per month (PLN, any contract) are left out
+# of the digest. 0 disables the filter.
+DIGEST_MIN_SALARY = int(os.environ.get('DIGEST_MIN_SALARY', 0))
+# Offers of companies known to have fewer / more employees than this are left
+# out of the digest. Companies of unknown size are kept. 0 disables a filter.
+DIGEST_MIN_COMPANY_SIZE = int(os.environ.get('DIGEST_MIN_COMPANY_SIZE', 0))
+DIGEST_MAX_COMPANY_SIZE = int(os.environ.get('DIGEST_MAX_COMPANY_SIZE', 0))
+
+# Description of the offers we're looking for. Jobs are scored by their
+# similarity to it (Job.lena_comparibility) and the digest is sorted by score.
+SCORING_PROFILE = os.environ.get(
+    'SCORING_PROFILE',
+    'analityk analiza danych raportowanie excel sql specjalista koordynator projektów badania administracja',
+)
+# Offers scoring below this are left out of the digest. Offers that look like
+# EXCLUDED_TERMS in scraper/scoring.py score below 0.
+DIGEST_MIN_SCORE = float(os.environ.get('DIGEST_MIN_SCORE', 0.0))
+
+# Estimated similarity of company, title and seniority above which two offers
+# are treated as the same position (see scraper/dedup.py)
+DEDUP_THRESHOLD = float(os.environ.get('DEDUP_THRESHOLD', 0.8))
+
+# Job boards read through their listing APIs (see scraper/boards.py), and the
+# number of listing pages read from each per run
+BOARD_ADAPTERS = [name for name in os.environ.get('BOARD_ADAPTERS', 'nofluffjobs,justjoinit').split(',') if name]
+BOARD_MAX_PAGES = int(os.environ.get('BOARD_MAX_PAGES', 5))
+
+# Cache of /api/jobs responses. Its keys carry a generation kept in the
+# database and bumped when jobs change, so a per-process cache is enough: the
+# web process stops serving old responses as soon as the worker commits. A
+# shared API_CACHE_BACKEND only saves recomputing a response per process.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('API_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('API_CACHE_LOCATION', ''),
+    }
+}
+API_CACHE_TTL = int(os.environ.get('API_CACHE_TTL', 300))
+
+# Jobs older than this are moved out of grabbo_job by archive_jobs
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 90))
+
+# Import time allowed for the cold start of a reporting command, checked by
+# check_startup (the test suite only checks which modules are imported)
+STARTUP_BUDGET_MS = int(os.environ.get('STARTUP_BUDGET_MS', 1000))
+
+# Every listing page fetched is kept here, zstd-compressed, one segment per
+# scraper run, so reextract_jobs can apply parser fixes without scraping
+# again. Empty disables the archive.
+PAGE_ARCHIVE_DIR = os.environ.get('PAGE_ARCHIVE_DIR', str(BASE_DIR / 'page_archive'))
+PAGE_ARCHIVE_LEVEL = int(os.environ.get('PAGE_ARCHIVE_LEVEL', 10))
+# Segments older than this many days are deleted by the prune_pages job; 0 keeps them all
+PAGE_ARCHIVE_KEEP_DAYS = int(os.environ.get('PAGE_ARCHIVE_KEEP_DAYS', 90))
+
+# run_scheduler jobs: task name -> cron expression (UTC). Empty disables a job.
+SCHEDULER_JOBS = {
+    'scrape': os.environ.get('SCRAPE_CRON', '0 6 * * *'),
+    'digest': os.environ.get('DIGEST_CRON', '30 6 * * *'),
+    'enrich': os.environ.get('ENRICH_CRON', '45 * * * *'),
+    'companies': os.environ.get('COMPANIES_CRON', '20 6 * * *'),
+    'boards': os.environ.get('BOARDS_CRON', '15 6 * * *'),
+    'archive': os.environ.get('ARCHIVE_CRON', '0 3 * * *'),
+    'prune_pages': os.environ.get('PRUNE_PAGES_CRON', '30 3 * * *'),
+    'outbox': os.environ.get('OUTBOX_CRON', '*/5 * * * *'),
+}
+SCHEDULER_POLL_INTERVAL = int(os.environ.get('SCHEDULER_POLL_INTERVAL', 30))
 
 LOGGING = {
     'version': 1,
@@ -0,0 +1,50 @@
+# jobscraper/jobscraper/settings_test.py
+# Settings for the test suite: everything in memory, nothing leaves the machine.
+# manage.py picks this module for `manage.py test` unless DJANGO_SETTINGS_MODULE is set.
+from jobscraper.settings import *  # noqa: F401,F403
+
+# In-memory SQLite regardless of PGDATABASE, so the suite never touches a real database
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+    # Second database for the replica routing tests
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+
+# Reads stay on the primary unless a routing test turns the replica on; it
+# also lets the test replica be migrated (see ReplicaRouter.allow_migrate)
+REPLICA_DATABASE = ''
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# The stub browser answers instantly, so don't rate limit
+SCRAPER_RATE_INITIAL = 1000.0
+SCRAPER_RATE_MAX = 1000.0
+
+# Tests that archive pages use a temporary directory
+PAGE_ARCHIVE_DIR = ''
+
+# Searches are scraped whole unless a test partitions them
+SCRAPER_PARTITION_PAGE_BUDGET = 0
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'root': {
+        'handlers': [],
+        'level': 'CRITICAL',
+    },
+}
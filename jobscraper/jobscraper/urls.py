@@ -1,3 +1,7 @@
 from django.urls import path
 
-urlpatterns = []
\ No newline at end of file
+from scraper import api
+
+urlpatterns = [
+    path('api/jobs', api.jobs, name='api-jobs'),
+]
@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'jobscraper.settings')
+    # Tests run hermetically against an in-memory database
+    default_settings = 'jobscraper.settings_test' if sys.argv[1:2] == ['test'] else 'jobscraper.settings'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', default_settings)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
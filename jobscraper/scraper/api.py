@@ -0,0 +1,188 @@
+import datetime
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Max
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_GET
+
+from scraper.models import CacheGeneration, Job, JobBoard
+from scraper.search import filter_jobs
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever jobs change, which retires every cached response at once.
+# It lives in the database, as the default cache isn't shared between the
+# worker invalidating it and the web process serving the API.
+GENERATION_NAME = 'api:jobs'
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def invalidate_cache():
+    """Make the API recompute its responses; call when a run has committed its jobs."""
+    bumped = CacheGeneration.objects.filter(name=GENERATION_NAME).update(value=F('value') + 1)
+    if not bumped:
+        _, created = CacheGeneration.objects.get_or_create(name=GENERATION_NAME, defaults={'value': 1})
+        if not created:
+            # Created by another process in between
+            CacheGeneration.objects.filter(name=GENERATION_NAME).update(value=F('value') + 1)
+
+
+def _generation():
+    return CacheGeneration.objects.filter(name=GENERATION_NAME).values_list('value', flat=True).first() or 0
+
+
+def _parse_params(request):
+    """
+    Validated filters of a request, in a canonical form usable as a cache key.
+
+    Raises:
+        ValueError: With a message for the client if a parameter is invalid
+    """
+    params = {}
+
+    since = request.GET.get('since')
+    if since:
+        moment = parse_datetime(since)
+        if moment is None:
+            day = parse_date(since)
+            if day is None:
+                raise ValueError("since must be an ISO date or datetime")
+            moment = datetime.datetime.combine(day, datetime.time())
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment, datetime.timezone.utc)
+        params['since'] = moment.isoformat()
+
+    board = request.GET.get('board')
+    if board:
+        names = {choice.name.lower(): choice.value for choice in JobBoard}
+        if board.lower() not in names:
+            raise ValueError(f"board must be one of {', '.join(sorted(names))}")
+        params['board'] = names[board.lower()]
+
+    query = request.GET.get('q', '').strip()
+    if query:
+        params['q'] = query
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        if not cursor.isdigit():
+            raise ValueError("cursor must be a value of next_cursor")
+        params['cursor'] = int(cursor)
+
+    limit = request.GET.get('limit', DEFAULT_LIMIT)
+    try:
+        params['limit'] = min(max(int(limit), 1), MAX_LIMIT)
+    except ValueError:
+        raise ValueError("limit must be a number")
+    return params
+
+
+def _serialize(job):
+    salary = job.salary
+    return {
+        'id': job.id,
+        'board': JobBoard(job.board).name.lower(),
+        'original_id': job.original_id,
+        'title': job.title,
+        'company': job.company.name if job.company else None,
+        'url': job.url,
+        'seniority': job.seniority,
+        'salary_text': job.salary_text,
+        'salary': salary and {
+            'monthly_from': salary.monthly_from,
+            'monthly_to': salary.monthly_to,
+            'currency': salary.currency,
+            'contract_type': salary.contract_type,
+        },
+        'score': job.lena_comparibility,
+        'cluster_id': job.cluster_id,
+        'created_at': job.created_at.isoformat(),
+    }
+
+
+def _build_response(params):
+    """
+    Compute a page of jobs, newest first.
+
+    The response is dated by the newest of the latest job's creation and
+    the last enrichment and scoring of any job.
+
+    Returns:
+        tuple: (body, ETag, Last-Modified timestamp)
+    """
+    latest = Job.objects.order_by('-id').values('id', 'created_at').first()
+    # Scoring rewrites scores of old jobs, so the newest job alone doesn't date the data
+    touched = Job.objects.aggregate(enriched=Max('enriched_at'), scored=Max('scored_at'))
+
+    queryset = Job.objects.select_related('company', 'salary').order_by('-id')
+    if 'since' in params:
+        queryset = queryset.filter(created_at__gte=params['since'])
+    if 'board' in params:
+        queryset = queryset.filter(board=params['board'])
+    if 'q' in params:
+        queryset = filter_jobs(queryset, params['q'])
+    # Keyset pagination: the cursor is the id of the last job of the previous page
+    if 'cursor' in params:
+        queryset = queryset.filter(id__lt=params['cursor'])
+
+    jobs = list(queryset[:params['limit'] + 1])
+    has_next_page = len(jobs) > params['limit']
+    jobs = jobs[:params['limit']]
+
+    body = json.dumps({
+        'results': [_serialize(job) for job in jobs],
+        'next_cursor': str(jobs[-1].id) if has_next_page else None,
+    })
+    max_id = latest['id'] if latest else 0
+    moments = [moment for moment in touched.values() if moment]
+    if latest:
+        moments.append(latest['created_at'])
+    last_modified = max(moments).timestamp() if moments else 0
+    etag = f'{max_id}-{int(last_modified)}-{hashlib.sha1(body.encode()).hexdigest()[:16]}'
+    return body, etag, last_modified
+
+
+@require_GET
+def jobs(request):
+    """
+    GET /api/jobs?since=&board=&q=&cursor=&limit=
+
+    Jobs newest first, `limit` (default 50) at a time; pass `next_cursor` of
+    a response as `cursor` for the next page. Responses are cached until the
+    next scrape run and support conditional requests.
+    """
+    try:
+        params = _parse_params(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    # One small query, so every process sees an invalidation at once
+    generation = _generation()
+    key = f'api:jobs:{generation}:{hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()}'
+    cached = cache.get(key)
+    if cached is None:
+        cached = _build_response(params)
+        cache.set(key, cached, settings.API_CACHE_TTL)
+    body, etag, last_modified = cached
+    etag = quote_etag(f'{generation}-{etag}')
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        not_modified = etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    else:
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        not_modified = if_modified_since is not None and int(last_modified) <= if_modified_since
+
+    response = HttpResponseNotModified() if not_modified else HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'no-cache'
+    return response
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def _install_search_triggers(sender, using, **kwargs):
+    from django.db import connections
+    from scraper.search import install_sqlite_triggers
+    install_sqlite_triggers(connections[using])
 
 
 class ScraperConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scraper'
+
+    def ready(self):
+        post_migrate.connect(_install_search_triggers, sender=self)
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+
+from django.conf import settings
+
+from scraper import api
+from scraper.http_client import get_client
+from scraper.ingest import JobIngestor, JobRecord
+from scraper.models import JobBoard
+
+logger = logging.getLogger(__name__)
+
+# Board adapters by name, filled in by @register
+ADAPTERS = {}
+
+
+def register(adapter_class):
+    """Class decorator making an adapter available under its name."""
+    ADAPTERS[adapter_class.name] = adapter_class
+    return adapter_class
+
+
+def salary_text(amount_from, amount_to, currency, contract_type, period):
+    """Salary text in the form parse_salary understands, e.g. "10000 - 15000 PLN b2b / month"."""
+    if amount_from is None and amount_to is None:
+        return ''
+    if amount_from is None:
+        amounts = f'do {amount_to:.0f}'
+    elif amount_to is None:
+        amounts = f'od {amount_from:.0f}'
+    elif amount_to == amount_from:
+        amounts = f'{amount_from:.0f}'
+    else:
+        amounts = f'{amount_from:.0f} - {amount_to:.0f}'
+    return ' '.join(part for part in [amounts, currency, contract_type, '/', period] if part)
+
+
+class BoardAdapter:
+    """
+    Reads offers of one job board through its public listing API.
+
+    Subclasses describe how to request a listing page (`page_request`) and
+    how to turn its JSON into JobRecords (`parse`). Fetching, pagination and
+    error handling are shared, so adapters can be tested by feeding recorded
+    responses to `parse`.
+    """
+    name = None
+    board = None
+
+    def __init__(self, max_pages=None):
+        self.max_pages = max_pages or settings.BOARD_MAX_PAGES
+
+    def page_request(self, page):
+        """
+        Returns:
+            tuple: (method, url, keyword arguments for HttpClient.request)
+        """
+        raise NotImplementedError
+
+    def parse(self, payload, page=1):
+        """
+        Args:
+            payload: Decoded JSON of listing page `page`
+
+        Returns:
+            tuple: (list of JobRecords, whether there is a next page)
+        """
+        raise NotImplementedError
+
+    async def fetch(self, client, page):
+        """Decoded JSON of a listing page."""
+        method, url, kwargs = self.page_request(page)
+        response = await asyncio.to_thread(client.request, method, url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def download(self, client):
+        """
+        Read listing pages until the last one or max_pages.
+
+        Returns:
+            list: JobRecords of every page read; a failed page ends the listing
+        """
+        records = []
+        for page in range(1, self.max_pages + 1):
+            try:
+                page_records, has_next_page = self.parse(await self.fetch(client, page), page)
+            except Exception as e:
+                logger.error(f"Error reading page {page} of {self.name}: {e}")
+                break
+            records.extend(page_records)
+            if not has_next_page or not page_records:
+                break
+        logger.info(f"Read {len(records)} offers from {self.name}")
+        return records
+
+
+@register
+class NoFluffJobsAdapter(BoardAdapter):
+    name = 'nofluffjobs'
+    board = JobBoard.NO_FLUFF
+    search_url = 'https://nofluffjobs.com/api/search/posting'
+    offer_url = 'https://nofluffjobs.com/pl/job/{slug}'
+    page_size = 100
+
+    def page_request(self, page):
+        params = {
+            'salaryCurrency': 'PLN',
+            'salaryPeriod': 'month',
+            'region': 'pl',
+            'page': page,
+            'pageSize': self.page_size,
+        }
+        body = {'criteriaSearch': {'country': ['POL']}, 'page': page, 'pageSize': self.page_size}
+        return 'POST', self.search_url, {'params': params, 'json': body}
+
+    def parse(self, payload, page=1):
+        records = []
+        for posting in payload.get('postings', []):
+            salary = posting.get('salary') or {}
+            records.append(JobRecord(
+                board=self.board,
+                original_id=posting['id'],
+                title=posting['title'],
+                url=self.offer_url.format(slug=posting.get('url') or posting['id']),
+                company_name=posting.get('name') or 'Unknown',
+                company_url='',
+                seniority=', '.join(posting.get('seniority') or []),
+                salary_text=salary_text(
+                    salary.get('from'), salary.get('to'), salary.get('currency'), salary.get('type'), 'month',
+                ),
+            ))
+        return records, page < payload.get('totalPages', 0)
+
+
+@register
+class JustJoinITAdapter(BoardAdapter):
+    name = 'justjoinit'
+    board = JobBoard.JUST_JOIN_IT
+    search_url = 'https://api.justjoin.it/v2/user-panel/offers'
+    offer_url = 'https://justjoin.it/job-offer/{slug}'
+    page_size = 100
+
+    def page_request(self, page):
+        params = {
+            'page': page,
+            'perPage': self.page_size,
+            'sortBy': 'published',
+            'orderBy': 'DESC',
+        }
+        return 'GET', self.search_url, {'params': params, 'headers': {'Version': '2'}}
+
+    def parse(self, payload, page=1):
+        records = []
+        for offer in payload.get('data', []):
+            # An offer lists a salary per contract type; the first is the headline one
+            employment = (offer.get('employmentTypes') or [{}])[0]
+            records.append(JobRecord(
+                board=self.board,
+                original_id=offer['slug'],
+                title=offer['title'],
+                url=self.offer_url.format(slug=offer['slug']),
+                company_name=offer.get('companyName') or 'Unknown',
+                company_url='',
+                seniority=offer.get('experienceLevel') or '',
+                salary_text=salary_text(
+                    employment.get('from'), employment.get('to'), employment.get('currency'),
+                    employment.get('type'), employment.get('unit') or 'month',
+                ),
+            ))
+        meta = payload.get('meta') or {}
+        return records, meta.get('nextPage') is not None
+
+
+async def _download_boards(adapters):
+    client = get_client()
+    results = await asyncio.gather(*(adapter.download(client) for adapter in adapters), return_exceptions=True)
+    return dict(zip((adapter.name for adapter in adapters), results))
+
+
+def download_boards(names=None):
+    """
+    Read every configured board concurrently and save the new offers.
+
+    Args:
+        names (list, optional): Adapter names (default: BOARD_ADAPTERS)
+
+    Returns:
+        int: Number of jobs added to the database
+    """
+    names = names or settings.BOARD_ADAPTERS
+    unknown = [name for name in names if name not in ADAPTERS]
+    if unknown:
+        raise ValueError(f"Unknown board adapters: {', '.join(unknown)}. Available: {', '.join(ADAPTERS)}")
+
+    results = asyncio.run(_download_boards([ADAPTERS[name]() for name in names]))
+
+    ingestor = JobIngestor()
+    total_jobs_added = 0
+    for name, records in results.items():
+        if isinstance(records, Exception):
+            logger.error(f"Error downloading from {name}: {records}")
+            continue
+        jobs_added = len(ingestor.ingest(records))
+        total_jobs_added += jobs_added
+        logger.info(f"Added {jobs_added} jobs from {name}")
+    api.invalidate_cache()
+    return total_jobs_added
@@ -0,0 +1,401 @@
+import csv
+import io
+import logging
+
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from scraper.models import Company, HypeStatus, Job, JobBoard
+
+logger = logging.getLogger(__name__)
+
+# Columns of an export file, in order; import_jobs reads the same files
+EXPORT_FIELDS = [
+    'id', 'original_id', 'board', 'board_name',
+    'title', 'url', 'seniority', 'salary_text',
+    'company_id', 'company_name', 'company_url',
+    'status', 'status_name', 'created_at',
+    'lena_comparibility',
+]
+
+# Columns an import file can't do without
+REQUIRED_FIELDS = {'board', 'original_id'}
+
+# Rows read, looked up and saved at once by the ORM import
+IMPORT_CHUNK_SIZE = 1000
+
+
+def _label_case(column, choices):
+    """SQL (and params) giving the label of an IntegerChoices column, like get_FOO_display()."""
+    whens = ' '.join('WHEN %s THEN %s' for _ in choices.choices)
+    params = [part for choice in choices.choices for part in choice]
+    return f"CASE {column} {whens} ELSE {column}::text END", params
+
+
+def export_query(board=None, limit=None):
+    """
+    The SELECT behind export_jobs on Postgres.
+
+    Returns:
+        tuple: (SQL, params)
+    """
+    board_name, board_params = _label_case('j.board', JobBoard)
+    status_name, status_params = _label_case('j.status', HypeStatus)
+    sql = (
+        f"SELECT j.id, j.original_id, j.board, {board_name} AS board_name, "
+        "j.title, j.url, j.seniority, j.salary_text, "
+        "j.company_id, COALESCE(c.name, '') AS company_name, COALESCE(c.url, '') AS company_url, "
+        f"j.status, {status_name} AS status_name, j.created_at, "
+        "j.lena_comparibility "
+        "FROM grabbo_job j LEFT JOIN grabbo_company c ON c.id = j.company_id"
+    )
+    params = board_params + status_params
+    if board:
+        sql += " WHERE j.board = %s"
+        params.append(board)
+    sql += " ORDER BY j.id"
+    if limit:
+        sql += " LIMIT %s"
+        params.append(limit)
+    return sql, params
+
+
+def _copy_export(output, board, limit):
+    sql, params = export_query(board, limit)
+    # The database reads of jobs are routed to, see scraper/routers.py
+    with connections[Job.objects.db].cursor() as cursor:
+        # COPY takes no parameters, so they are bound client-side
+        query = cursor.mogrify(sql, params).decode('utf-8')
+        cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)", output)
+        return cursor.rowcount
+
+
+def _orm_export(output, board, limit):
+    queryset = Job.objects.select_related('company').order_by('id')
+    if board:
+        queryset = queryset.filter(board=board)
+    if limit:
+        queryset = queryset[:limit]
+
+    writer = csv.DictWriter(output, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    exported = 0
+    for job in queryset.iterator(chunk_size=IMPORT_CHUNK_SIZE):
+        writer.writerow({
+            'id': job.id,
+            'original_id': job.original_id,
+            'board': job.board,
+            'board_name': job.get_board_display(),
+            'title': job.title,
+            'url': job.url,
+            'seniority': job.seniority,
+            'salary_text': job.salary_text,
+            'company_id': job.company_id,
+            'company_name': job.company.name if job.company else '',
+            'company_url': job.company.url if job.company else '',
+            'status': job.status,
+            'status_name': job.get_status_display(),
+            'created_at': job.created_at.isoformat() if job.created_at else '',
+            'lena_comparibility': job.lena_comparibility,
+        })
+        exported += 1
+    return exported
+
+
+def export_jobs(output, board=None, limit=None):
+    """
+    Write jobs to a CSV file with the EXPORT_FIELDS columns, ordered by id.
+
+    On Postgres the rows are produced by COPY and streamed to the file as
+    they come, without going through Django models. Other databases write
+    them from the ORM.
+
+    Args:
+        output: Text file open for writing, with newline=''
+        board (int, optional): Only jobs of this board
+        limit (int, optional): At most this many jobs
+
+    Returns:
+        int: Number of jobs written
+    """
+    if connections[Job.objects.db].vendor == 'postgresql':
+        return _copy_export(output, board, limit)
+    return _orm_export(output, board, limit)
+
+
+def copy_rows(table, columns, rows):
+    """
+    Append rows to a table with COPY FROM STDIN (Postgres only).
+
+    Args:
+        table (str): Table name
+        columns (list): Column names, in the order of the row values
+        rows (iterable): Tuples of values, None for NULL
+
+    Returns:
+        int: Number of rows copied
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # \N marks NULL, so an empty string stays empty
+        writer.writerow(['\\N' if value is None else value for value in row])
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+        )
+        return cursor.rowcount
+
+
+def _check_header(columns):
+    unknown = set(columns) - set(EXPORT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown columns in the import file: {', '.join(sorted(unknown))}")
+    missing = REQUIRED_FIELDS - set(columns)
+    if missing:
+        raise ValueError(f"Missing columns in the import file: {', '.join(sorted(missing))}")
+
+
+# The last row of every offer in the file, merged into grabbo_job. Values
+# are cast from the text they were copied as; empty or absent ones get the
+# model defaults.
+LATEST_STATEMENT = """
+    CREATE TEMP TABLE job_import_latest ON COMMIT DROP AS
+    SELECT DISTINCT ON (board::integer, original_id)
+        board::integer AS board,
+        original_id,
+        left(COALESCE(title, ''), 256) AS title,
+        left(COALESCE(url, ''), 256) AS url,
+        left(COALESCE(seniority, ''), 256) AS seniority,
+        left(COALESCE(salary_text, ''), 256) AS salary_text,
+        left(COALESCE(company_name, ''), 255) AS company_name,
+        left(COALESCE(company_url, ''), 1024) AS company_url,
+        NULL::integer AS company_id,
+        COALESCE(NULLIF(status, '')::integer, %(status)s) AS status,
+        COALESCE(NULLIF(created_at, '')::timestamptz, now()) AS created_at,
+        COALESCE(NULLIF(lena_comparibility, '')::double precision, 0) AS lena_comparibility
+    FROM job_import
+    ORDER BY board::integer, original_id, line DESC
+"""
+
+# Company ids of the latest rows, copied in once _match_company resolved them
+COMPANY_TABLE_STATEMENT = (
+    "CREATE TEMP TABLE job_import_company (name text, url text, company_id integer) ON COMMIT DROP"
+)
+COMPANY_UPDATE_STATEMENT = """
+    UPDATE job_import_latest s SET company_id = c.company_id
+    FROM job_import_company c
+    WHERE c.name = s.company_name AND c.url = s.company_url
+"""
+
+# Saved offers that differ from the file; their content hash is cleared, so
+# the next scrape of the offer hashes it again
+UPDATE_STATEMENT = """
+    UPDATE grabbo_job j SET
+        title = s.title, url = s.url, seniority = s.seniority, salary_text = s.salary_text,
+        company_id = s.company_id, status = s.status, lena_comparibility = s.lena_comparibility,
+        content_hash = ''
+    FROM job_import_latest s
+    WHERE j.board = s.board AND j.original_id = s.original_id
+        AND (j.title, j.url, j.seniority, j.salary_text, j.company_id, j.status, j.lena_comparibility)
+            IS DISTINCT FROM (s.title, s.url, s.seniority, s.salary_text, s.company_id, s.status, s.lena_comparibility)
+"""
+
+# Offers not saved yet. They were mailed, or not, wherever they were
+# exported from, so they are marked sent like the offers from before the
+# digest tracked it.
+INSERT_STATEMENT = """
+    INSERT INTO grabbo_job (
+        board, original_id, title, url, company_id, description, requirements, responsibilities,
+        seniority, salary_text, status, created_at, lena_comparibility, content_hash, digest_sent_at,
+        enrich_attempts
+    )
+    SELECT
+        s.board, s.original_id, s.title, s.url, s.company_id, '', '', '',
+        s.seniority, s.salary_text, s.status, s.created_at, s.lena_comparibility, '', now(),
+        0
+    FROM job_import_latest s
+    WHERE NOT EXISTS (SELECT 1 FROM grabbo_job j WHERE j.board = s.board AND j.original_id = s.original_id)
+"""
+
+
+def _match_company(name, url):
+    """
+    Id of the company of an import row, created if missing.
+
+    Names are matched by the manager, like the ingest matches scraped
+    offers, so an imported company doesn't duplicate a scraped one.
+    """
+    return Company.objects.create_or_update_if_better(name=name[:255], url=url[:1024]).id
+
+
+def _copy_import(source, columns):
+    staging_columns = ', '.join(f'{name} text' for name in EXPORT_FIELDS)
+    copied_columns = ', '.join(columns)
+    params = {'status': HypeStatus.UNKNOWN.value}
+    with transaction.atomic(), connection.cursor() as cursor:
+        # line keeps the order of the file, for rows repeating an offer
+        cursor.execute(f"CREATE TEMP TABLE job_import (line bigserial, {staging_columns}) ON COMMIT DROP")
+        cursor.copy_expert(f"COPY job_import ({copied_columns}) FROM STDIN WITH (FORMAT csv)", source)
+        logger.info(f"Copied {cursor.rowcount} rows into the staging table")
+        cursor.execute(LATEST_STATEMENT, params)
+
+        cursor.execute("SELECT DISTINCT company_name, company_url FROM job_import_latest WHERE company_name <> ''")
+        companies = [(name, url, _match_company(name, url)) for name, url in cursor.fetchall()]
+        cursor.execute(COMPANY_TABLE_STATEMENT)
+        copy_rows('job_import_company', ['name', 'url', 'company_id'], companies)
+        cursor.execute(COMPANY_UPDATE_STATEMENT)
+
+        cursor.execute(UPDATE_STATEMENT)
+        updated = cursor.rowcount
+        cursor.execute(INSERT_STATEMENT)
+        created = cursor.rowcount
+    return created, updated
+
+
+# Job fields an import sets on saved jobs
+IMPORTED_FIELDS = ['title', 'url', 'seniority', 'salary_text', 'company_id', 'status', 'lena_comparibility']
+
+
+class _OrmImporter:
+    """Merges import rows through the ORM, a chunk at a time."""
+
+    def __init__(self):
+        # Company id by (name, url)
+        self._companies = {}
+
+    def _company_id(self, name, url):
+        if not name:
+            return None
+        key = (name[:255], url[:1024])
+        if key not in self._companies:
+            self._companies[key] = _match_company(name, url)
+        return self._companies[key]
+
+    def _values(self, row):
+        """IMPORTED_FIELDS of a row, with the defaults the COPY merge uses."""
+        return {
+            'title': (row.get('title') or '')[:256],
+            'url': (row.get('url') or '')[:256],
+            'seniority': (row.get('seniority') or '')[:256],
+            'salary_text': (row.get('salary_text') or '')[:256],
+            'company_id': self._company_id(row.get('company_name') or '', row.get('company_url') or ''),
+            'status': int(row.get('status') or HypeStatus.UNKNOWN),
+            'lena_comparibility': float(row.get('lena_comparibility') or 0),
+        }
+
+    def merge(self, rows):
+        """
+        Returns:
+            tuple: (jobs created, jobs updated)
+        """
+        latest = {}
+        for row in rows:
+            latest[(int(row['board']), row['original_id'])] = row
+
+        saved = set()
+        updated = []
+        for board in {board for board, _ in latest}:
+            original_ids = [original_id for b, original_id in latest if b == board]
+            for job in Job.objects.filter(board=board, original_id__in=original_ids):
+                key = (job.board, job.original_id)
+                saved.add(key)
+                values = self._values(latest[key])
+                if all(getattr(job, name) == value for name, value in values.items()):
+                    continue
+                for name, value in values.items():
+                    setattr(job, name, value)
+                job.content_hash = ''
+                updated.append(job)
+
+        now = timezone.now()
+        new = []
+        for key, row in latest.items():
+            if key in saved:
+                continue
+            job = Job(
+                board=key[0],
+                original_id=key[1],
+                description='',
+                requirements='',
+                responsibilities='',
+                digest_sent_at=now,
+                **self._values(row),
+            )
+            new.append((job, parse_datetime(row.get('created_at') or '')))
+
+        Job.objects.bulk_update(updated, IMPORTED_FIELDS + ['content_hash'], batch_size=500)
+        Job.objects.bulk_create([job for job, _ in new], batch_size=500)
+        # created_at is auto_now_add, which overwrites it on create
+        dated = []
+        for job, created_at in new:
+            if created_at:
+                job.created_at = created_at
+                dated.append(job)
+        Job.objects.bulk_update(dated, ['created_at'], batch_size=500)
+        return len(new), len(updated)
+
+
+def _orm_import(source):
+    reader = csv.DictReader(source)
+    _check_header(reader.fieldnames or [])
+    importer = _OrmImporter()
+    created = updated = 0
+    with transaction.atomic():
+        rows = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) == IMPORT_CHUNK_SIZE:
+                chunk_created, chunk_updated = importer.merge(rows)
+                created, updated, rows = created + chunk_created, updated + chunk_updated, []
+        if rows:
+            chunk_created, chunk_updated = importer.merge(rows)
+            created, updated = created + chunk_created, updated + chunk_updated
+    return created, updated
+
+
+def import_jobs(source):
+    """
+    Merge jobs from a CSV file in the export_jobs format into the database.
+
+    Rows are matched with saved jobs on (board, original_id): differing jobs
+    are updated, the others are created, and the last row wins when an offer
+    repeats. Companies are matched by name like scraped offers (see
+    CompanyManager), and created if missing. Only board and original_id are
+    required, other columns may be left out. Created jobs are clustered
+    right away, so the digest doesn't have to.
+
+    On Postgres the file is loaded with COPY into a temporary staging table
+    and merged with a few set-based statements; other databases go through
+    the ORM in chunks. Either way the import is one transaction.
+
+    Args:
+        source: Text file open for reading, with newline=''
+
+    Returns:
+        tuple: (jobs created, jobs updated)
+
+    Raises:
+        ValueError: If the header has unknown columns or lacks required ones
+    """
+    if connection.vendor == 'postgresql':
+        header = source.readline()
+        columns = next(csv.reader([header]), [])
+        _check_header(columns)
+        # The rest of the file, without its header
+        created, updated = _copy_import(source, columns)
+    else:
+        created, updated = _orm_import(source)
+
+    if created:
+        # Imports numpy, kept out of the startup of export_jobs_csv
+        from scraper.dedup import cluster_new_jobs
+
+        try:
+            cluster_new_jobs()
+        except Exception as e:
+            # Jobs left unclustered are picked up before the next digest
+            logger.error(f"Error clustering imported jobs: {e}")
+    return created, updated
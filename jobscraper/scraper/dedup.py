@@ -0,0 +1,188 @@
+import logging
+import re
+import zlib
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from scraper.models import Job, JobLshBucket, JobSignature
+from scraper.search import unaccent
+
+logger = logging.getLogger(__name__)
+
+# 16 bands of 4 rows: offers with similarity 0.7 become candidates 98% of
+# the time, offers with similarity 0.3 only 12% of the time
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 3
+# Jobs looked up in the index with one query
+LOOKUP_CHUNK_SIZE = 50
+
+# Mersenne prime larger than any shingle hash; fixed seed so signatures are
+# comparable across processes and runs
+PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(1729)
+_A = _rng.integers(1, 1 << 32, NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 32, NUM_PERMUTATIONS, dtype=np.uint64)
+
+# Legal forms and gender markers that differ between postings of one offer
+NOISE_RE = re.compile(r'\b(sp\.? ?z ?o\.? ?o|s\.? ?a|sp\.? ?k|sp\.? ?j|spolka \w+)\b\.?|\((k|m|f|x)(/(k|m|f|x|d))+\)')
+NON_WORD_RE = re.compile(r'[^\w]+')
+
+
+def normalize(company, title, seniority):
+    """Canonical text of an offer, ignoring case, accents, punctuation and legal forms."""
+    text = unaccent(f'{company} {title} {seniority}'.lower())
+    text = NOISE_RE.sub(' ', text)
+    return NON_WORD_RE.sub(' ', text).strip()
+
+
+def shingles(text):
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """
+    MinHash signature of the character shingles of text.
+
+    Returns:
+        numpy.ndarray: NUM_PERMUTATIONS uint64 values
+    """
+    hashes = np.array([zlib.crc32(shingle.encode()) for shingle in shingles(text)], dtype=np.uint64)
+    # permutations x shingles, each row one hash function
+    permuted = (np.outer(_A, hashes) + _B[:, None]) % PRIME
+    return permuted.min(axis=1)
+
+
+def band_buckets(signature):
+    """LSH bucket of every band of a signature."""
+    return [
+        zlib.crc32(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes())
+        for band in range(BANDS)
+    ]
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the shingles behind two signatures."""
+    return float(np.mean(signature == other))
+
+
+def job_signature(job):
+    company = job.company.name if job.company else ''
+    return minhash(normalize(company, job.title, job.seniority))
+
+
+def _find_clusters(signatures, buckets):
+    """Cluster of an indexed near-duplicate for each signature, or None."""
+    wanted = {(band, bucket) for job_buckets in buckets for band, bucket in enumerate(job_buckets)}
+    candidates = {}
+    for job_id, band, bucket in (
+        JobLshBucket.objects
+        .filter(bucket__in={bucket for _, bucket in wanted})
+        .values_list('job_id', 'band', 'bucket')
+    ):
+        if (band, bucket) in wanted:
+            candidates.setdefault((band, bucket), set()).add(job_id)
+    if not candidates:
+        return [None] * len(signatures)
+
+    candidate_ids = set().union(*candidates.values())
+    indexed = {
+        job_id: (np.frombuffer(bytes(signature), dtype=np.uint64), cluster_id)
+        for job_id, signature, cluster_id in (
+            JobSignature.objects
+            .filter(job_id__in=candidate_ids)
+            .values_list('job_id', 'minhash', 'job__cluster_id')
+        )
+    }
+
+    clusters = []
+    for signature, job_buckets in zip(signatures, buckets):
+        matches = set()
+        for band, bucket in enumerate(job_buckets):
+            matches |= candidates.get((band, bucket), set())
+        duplicates = [
+            indexed[job_id][1] for job_id in matches
+            if job_id in indexed and similarity(signature, indexed[job_id][0]) >= settings.DEDUP_THRESHOLD
+        ]
+        # The oldest cluster wins when an offer resembles several
+        clusters.append(min(duplicates) if duplicates else None)
+    return clusters
+
+
+def cluster_jobs(jobs):
+    """
+    Index jobs for near-duplicate lookup and link each to a cluster.
+
+    A job resembling an indexed job (same company, title and seniority up to
+    small differences) joins that job's cluster; otherwise it starts its own
+    cluster, identified by its own id. Jobs are processed in order, so a
+    batch may contain duplicates of itself.
+
+    Args:
+        jobs (list): Saved Jobs, with company loaded, not yet clustered
+
+    Returns:
+        int: Number of jobs found to duplicate another
+    """
+    duplicates = 0
+    for start in range(0, len(jobs), LOOKUP_CHUNK_SIZE):
+        chunk = jobs[start:start + LOOKUP_CHUNK_SIZE]
+        signatures = [job_signature(job) for job in chunk]
+        buckets = [band_buckets(signature) for signature in signatures]
+        clusters = _find_clusters(signatures, buckets)
+
+        # Index of the chunk itself, for duplicates within it
+        local = {}
+        for i, job in enumerate(chunk):
+            matches = {j for band, bucket in enumerate(buckets[i]) for j in local.get((band, bucket), ())}
+            found = [chunk[j].cluster_id for j in matches if similarity(signatures[i], signatures[j]) >= settings.DEDUP_THRESHOLD]
+            if clusters[i]:
+                found.append(clusters[i])
+
+            job.cluster_id = min(found) if found else job.id
+            duplicates += bool(found)
+            for band, bucket in enumerate(buckets[i]):
+                local.setdefault((band, bucket), []).append(i)
+
+        with transaction.atomic():
+            JobSignature.objects.bulk_create(
+                JobSignature(job=job, minhash=signature.tobytes()) for job, signature in zip(chunk, signatures)
+            )
+            JobLshBucket.objects.bulk_create(
+                JobLshBucket(job=job, band=band, bucket=bucket)
+                for job, job_buckets in zip(chunk, buckets)
+                for band, bucket in enumerate(job_buckets)
+            )
+            Job.objects.bulk_update(chunk, ['cluster'])
+    return duplicates
+
+
+def cluster_new_jobs(chunk_size=1000):
+    """
+    Cluster every job that hasn't been clustered yet, oldest first.
+
+    Returns:
+        int: Number of jobs found to duplicate another
+    """
+    duplicates = 0
+    clustered = 0
+    while True:
+        jobs = list(
+            Job.objects.filter(cluster__isnull=True)
+            .select_related('company')
+            .only('id', 'title', 'seniority', 'company__name')
+            .order_by('id')[:chunk_size]
+        )
+        if not jobs:
+            break
+        duplicates += cluster_jobs(jobs)
+        clustered += len(jobs)
+
+    if clustered:
+        logger.info(f"Clustered {clustered} jobs, {duplicates} of them near-duplicates of earlier offers")
+    return duplicates
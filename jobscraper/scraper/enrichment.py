@@ -0,0 +1,324 @@
+import datetime
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from scraper import api
+from scraper.http_client import get_client
+from scraper.models import Company, Job, JobBoard
+from scraper.throttle import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Offer page sections copied into the matching Job fields
+DETAIL_SECTIONS = {
+    'description': ['section-about-project', 'section-about-us-description', 'section-about-us'],
+    'responsibilities': ['section-responsibilities'],
+    'requirements': ['section-requirements'],
+}
+
+# scored_at is cleared so the job is rescored with its details
+ENRICHED_FIELDS = ['description', 'requirements', 'responsibilities', 'enriched_at', 'scored_at']
+ATTEMPT_FIELDS = ['enrich_attempts', 'enrich_next_attempt_at']
+
+# Company fields read from profile pages
+COMPANY_FIELDS = ['industry', 'size_from', 'size_to', 'last_enriched_at']
+
+# Profile page elements with the company size ("250-499 pracowników") and industry
+COMPANY_SIZE_SECTIONS = ['text-company-size', 'company-size', 'section-company-size']
+COMPANY_INDUSTRY_SECTIONS = ['text-company-industry', 'company-industry', 'section-company-industry']
+
+
+def parse_job_details(content):
+    """
+    Extract the description, requirements and responsibilities of an offer page.
+
+    Returns:
+        dict: Field name -> text, empty for sections the page doesn't have
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    details = {}
+    for field, sections in DETAIL_SECTIONS.items():
+        details[field] = ''
+        for section in sections:
+            element = soup.find(attrs={'data-test': section})
+            if element:
+                details[field] = element.get_text('\n', strip=True)
+                break
+    return details
+
+
+def fetch_job_details(job):
+    """
+    Download the offer page of a job.
+
+    Returns:
+        dict or None: Parsed details, empty strings if the offer is gone,
+        or None if the page couldn't be fetched or had none of the sections
+        (e.g. it wasn't fully rendered) and should be retried later
+    """
+    try:
+        response = get_client().get(job.url)
+    except requests.RequestException as e:
+        logger.warning(f"Could not fetch details of job {job.original_id}: {e}")
+        return None
+
+    if response.status_code in (404, 410):
+        # The offer was taken down; mark it so it isn't retried forever
+        return {field: '' for field in DETAIL_SECTIONS}
+    if response.status_code != 200:
+        logger.warning(f"HTTP {response.status_code} for details of job {job.original_id}")
+        return None
+    details = parse_job_details(response.text)
+    if not any(details.values()):
+        logger.warning(f"No details found on the page of job {job.original_id}")
+        return None
+    return details
+
+
+def enrich_jobs(budget=None):
+    """
+    Fill in details of jobs that were never enriched, newest first.
+
+    Pages are fetched concurrently under the per-host rate limit and written
+    with bulk_update in small batches, so an interrupted run keeps what it
+    fetched and the next run picks up the rest. Every fetch counts as an
+    attempt: a job whose page failed waits out a backoff before it is tried
+    again, and is left unenriched after ENRICH_MAX_ATTEMPTS, so pages that
+    keep failing don't take the budget of the older jobs.
+
+    Args:
+        budget (int, optional): Maximum offer pages to fetch (default: ENRICH_BUDGET)
+
+    Returns:
+        int: Number of jobs enriched
+    """
+    budget = budget or settings.ENRICH_BUDGET
+    now = timezone.now()
+    backlog = list(
+        Job.objects
+        .filter(board=JobBoard.PRACUJ, enriched_at__isnull=True, enrich_attempts__lt=settings.ENRICH_MAX_ATTEMPTS)
+        .filter(Q(enrich_next_attempt_at__isnull=True) | Q(enrich_next_attempt_at__lte=now))
+        .only('id', 'original_id', 'url', 'enriched_at', 'enrich_attempts')
+        .order_by('-id')[:budget]
+    )
+    if not backlog:
+        logger.info("No jobs waiting for enrichment")
+        return 0
+
+    # Counted before fetching, so a run that dies mid-way backs off too
+    for job in backlog:
+        job.enrich_attempts += 1
+        job.enrich_next_attempt_at = now + datetime.timedelta(
+            seconds=3600 + backoff_delay(job.enrich_attempts - 1, base=3600, cap=7 * 86400)
+        )
+    Job.objects.bulk_update(backlog, ATTEMPT_FIELDS, batch_size=500)
+
+    logger.info(f"Enriching {len(backlog)} jobs")
+    enriched = 0
+    pending = []
+    for job, details in _fetch_all(backlog, fetch_job_details):
+        for field, value in details.items():
+            setattr(job, field, value)
+        job.enriched_at = timezone.now()
+        job.scored_at = None
+        pending.append(job)
+
+        if len(pending) >= 50:
+            Job.objects.bulk_update(pending, ENRICHED_FIELDS)
+            enriched += len(pending)
+            pending = []
+
+    if pending:
+        Job.objects.bulk_update(pending, ENRICHED_FIELDS)
+        enriched += len(pending)
+
+    if enriched:
+        api.invalidate_cache()
+    given_up = sum(
+        1 for job in backlog if job.enriched_at is None and job.enrich_attempts >= settings.ENRICH_MAX_ATTEMPTS
+    )
+    if given_up:
+        logger.warning(f"Gave up enriching {given_up} jobs after {settings.ENRICH_MAX_ATTEMPTS} attempts")
+    logger.info(f"Enriched {enriched} of {len(backlog)} jobs")
+    return enriched
+
+
+def _fetch_all(items, fetch):
+    """
+    Run fetch over items concurrently, SCRAPER_HTTP_CONCURRENCY at a time.
+
+    Yields:
+        tuple: (item, result) in completion order, leaving out items whose
+        fetch failed or returned None
+    """
+    with ThreadPoolExecutor(max_workers=settings.SCRAPER_HTTP_CONCURRENCY) as executor:
+        futures = {executor.submit(fetch, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Error enriching {type(item).__name__.lower()} {item.pk}: {e}")
+                continue
+            if result is not None:
+                yield item, result
+
+
+def parse_company_size(text):
+    """
+    Read a company size such as "250-499 pracowników" or "1000+".
+
+    Returns:
+        tuple: (size_from, size_to), 0 where unknown or open-ended
+    """
+    numbers = [int(re.sub(r'\s', '', number)) for number in re.findall(r'\d[\d\s]*\d|\d', text)]
+    if not numbers:
+        return 0, 0
+    if len(numbers) == 1:
+        if '+' in text or re.search(r'\b(powyżej|ponad|over|more than)\b', text, re.IGNORECASE):
+            return numbers[0], 0
+        if re.search(r'\b(do|poniżej|up to|less than)\b', text, re.IGNORECASE):
+            return 1, numbers[0]
+        return numbers[0], numbers[0]
+    return min(numbers[:2]), max(numbers[:2])
+
+
+def _organization(data):
+    """The schema.org organization in JSON-LD data, or None."""
+    if isinstance(data, list):
+        return next((found for found in map(_organization, data) if found), None)
+    if not isinstance(data, dict):
+        return None
+    if 'numberOfEmployees' in data or data.get('@type') in ('Organization', 'Corporation'):
+        return data
+    return _organization(data.get('@graph', []))
+
+
+def parse_company_profile(content):
+    """
+    Read the industry and size of a company profile page.
+
+    The schema.org Organization data of the page is used if it has any,
+    the labelled page sections otherwise.
+
+    Returns:
+        dict: industry, size_from and size_to; '' and 0 where unknown
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    profile = {'industry': '', 'size_from': 0, 'size_to': 0}
+
+    for script in soup.find_all('script', attrs={'type': 'application/ld+json'}):
+        try:
+            organization = _organization(json.loads(script.string or ''))
+        except ValueError:
+            continue
+        if not organization:
+            continue
+        industry = organization.get('industry') or ''
+        profile['industry'] = (', '.join(industry) if isinstance(industry, list) else str(industry))[:255]
+        employees = organization.get('numberOfEmployees')
+        if isinstance(employees, dict):
+            if 'minValue' in employees or 'maxValue' in employees:
+                profile['size_from'] = int(employees.get('minValue') or 0)
+                profile['size_to'] = int(employees.get('maxValue') or 0)
+            elif employees.get('value'):
+                profile['size_from'], profile['size_to'] = parse_company_size(str(employees['value']))
+        elif employees:
+            profile['size_from'], profile['size_to'] = parse_company_size(str(employees))
+        return profile
+
+    for section in COMPANY_SIZE_SECTIONS:
+        element = soup.find(attrs={'data-test': section})
+        if element:
+            profile['size_from'], profile['size_to'] = parse_company_size(element.get_text(' ', strip=True))
+            break
+    for section in COMPANY_INDUSTRY_SECTIONS:
+        element = soup.find(attrs={'data-test': section})
+        if element:
+            profile['industry'] = element.get_text(', ', strip=True)[:255]
+            break
+    return profile
+
+
+def fetch_company_profile(company):
+    """
+    Download the profile page of a company.
+
+    Returns:
+        dict or None: Parsed profile, unknown values if the page is gone,
+        or None if the page couldn't be fetched and should be retried later
+    """
+    try:
+        response = get_client().get(company.url)
+    except requests.RequestException as e:
+        logger.warning(f"Could not fetch profile of company {company.name}: {e}")
+        return None
+
+    if response.status_code in (404, 410):
+        # Don't ask again before the TTL runs out
+        return {'industry': '', 'size_from': 0, 'size_to': 0}
+    if response.status_code != 200:
+        logger.warning(f"HTTP {response.status_code} for profile of company {company.name}")
+        return None
+    return parse_company_profile(response.text)
+
+
+def enrich_companies(budget=None):
+    """
+    Fill in industry and size of companies never enriched or enriched more
+    than COMPANY_ENRICH_TTL_DAYS ago, those never enriched first.
+
+    Profile pages are fetched concurrently under the per-host rate limit and
+    written with bulk_update in small batches. Companies within the TTL cost
+    nothing, so known companies are never fetched on every run.
+
+    Args:
+        budget (int, optional): Maximum profile pages to fetch (default: COMPANY_ENRICH_BUDGET)
+
+    Returns:
+        int: Number of companies enriched
+    """
+    budget = budget or settings.COMPANY_ENRICH_BUDGET
+    stale_before = timezone.now() - datetime.timedelta(days=settings.COMPANY_ENRICH_TTL_DAYS)
+    backlog = list(
+        Company.objects
+        .filter(url__startswith='http')
+        .filter(Q(last_enriched_at__isnull=True) | Q(last_enriched_at__lt=stale_before))
+        .only('id', 'name', 'url')
+        .order_by(F('last_enriched_at').asc(nulls_first=True), 'id')[:budget]
+    )
+    if not backlog:
+        logger.info("No companies waiting for enrichment")
+        return 0
+
+    logger.info(f"Enriching {len(backlog)} companies")
+    enriched = 0
+    pending = []
+    for company, profile in _fetch_all(backlog, fetch_company_profile):
+        for field, value in profile.items():
+            setattr(company, field, value)
+        company.last_enriched_at = timezone.now()
+        pending.append(company)
+
+        if len(pending) >= 50:
+            Company.objects.bulk_update(pending, COMPANY_FIELDS)
+            enriched += len(pending)
+            pending = []
+
+    if pending:
+        Company.objects.bulk_update(pending, COMPANY_FIELDS)
+        enriched += len(pending)
+
+    if enriched:
+        api.invalidate_cache()
+
+    logger.info(f"Enriched {enriched} of {len(backlog)} companies")
+    return enriched
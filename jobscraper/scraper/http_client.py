@@ -0,0 +1,92 @@
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from scraper.throttle import backoff_delay, get_throttle
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.102 Safari/537.36'
+
+# Statuses that mean the server is pushing back and the request may succeed later
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpClient:
+    """
+    Pooled HTTP client whose requests go through the per-host throttles.
+
+    Safe to share between threads; connections are kept alive between
+    requests and, in long-running workers, between runs.
+    """
+
+    def __init__(self, pool_size=10, timeout=20, max_attempts=3):
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request, retrying with backoff on timeouts and retryable statuses.
+
+        Returns:
+            requests.Response: The last response, whatever its status
+
+        Raises:
+            requests.RequestException: If no response arrived on any attempt
+        """
+        throttle = get_throttle(url)
+        kwargs.setdefault('timeout', self.timeout)
+
+        for attempt in range(self.max_attempts):
+            throttle.acquire()
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.Timeout:
+                throttle.record(time.monotonic() - started, timed_out=True)
+                if attempt == self.max_attempts - 1:
+                    raise
+                logger.warning(f"Request to {url} timed out on attempt {attempt + 1}")
+            except requests.RequestException as e:
+                # Refused connections, SSL errors, bad URLs: not the host pushing back
+                throttle.record_error(time.monotonic() - started)
+                if attempt == self.max_attempts - 1:
+                    raise
+                logger.warning(f"Request to {url} failed on attempt {attempt + 1}: {e}")
+            else:
+                throttle.record(time.monotonic() - started, status=response.status_code)
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_attempts - 1:
+                    return response
+                logger.warning(f"HTTP {response.status_code} from {url} on attempt {attempt + 1}")
+            time.sleep(backoff_delay(attempt))
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Return the process-wide HttpClient, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(pool_size=settings.SCRAPER_HTTP_CONCURRENCY)
+        return _client
@@ -0,0 +1,307 @@
+import hashlib
+import logging
+from collections import namedtuple
+
+from django.db import DatabaseError, transaction
+
+from scraper.dedup import cluster_jobs
+from scraper.models import Company, Job, JobRevision, Salary
+from scraper.retention import archived_ids
+from scraper.salary import parse_salaries
+
+logger = logging.getLogger(__name__)
+
+# An offer as read from a job board listing, before it's matched with the database
+JobRecord = namedtuple(
+    'JobRecord',
+    ['board', 'original_id', 'title', 'url', 'company_name', 'company_url', 'seniority', 'salary_text'],
+)
+
+# Ids looked up in one existence query
+LOOKUP_CHUNK_SIZE = 500
+
+# Job fields filled in from a JobRecord
+SCRAPED_FIELDS = ['title', 'url', 'company', 'seniority', 'salary_text', 'salary']
+
+
+def content_hash(record):
+    """Hash of a record's scraped fields, normalized the way they are saved."""
+    normalized = [
+        record.title[:256],
+        record.url[:256],
+        record.company_name.lower(),
+        record.company_url.strip(),
+        record.seniority.lower()[:256],
+        record.salary_text[:256],
+    ]
+    return hashlib.blake2b('\x1f'.join(normalized).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _differs(job, name, value):
+    field = Job._meta.get_field(name)
+    if field.is_relation:
+        # Compare ids, loading the related row would cost a query per job
+        return getattr(job, field.attname) != (value.pk if value else None)
+    return getattr(job, name) != value
+
+
+def _company_key(name):
+    """A company name as CompanyManager matches it."""
+    return name.lower().replace('sp. z o.o.', '').strip()
+
+
+def _same_company(company, record):
+    """Whether a saved company is the one a record names, told without creating anything."""
+    return (
+        company is not None
+        and _company_key(company.name) == _company_key(record.company_name)
+        and company.url == record.company_url.strip()
+    )
+
+
+def _saved_values(job, names):
+    """Values of the fields as in the database, related rows by id."""
+    attnames = [Job._meta.get_field(name).attname for name in names]
+    return {attname: getattr(job, attname) for attname in attnames}
+
+
+class JobIngestor:
+    """
+    Saves offers from any board in batches.
+
+    Offers already in the database are found with one query per batch, which
+    also reads their content hash: unchanged offers are skipped, edited ones
+    are updated with their old values kept as a JobRevision. Companies and
+    salaries are matched once per distinct value, and new jobs are inserted
+    with bulk_create. Keep one instance around to keep its company and salary
+    caches warm between batches.
+    """
+
+    def __init__(self):
+        # Companies already matched in the database, keyed by (name, url)
+        self._company_cache = {}
+        # Salary rows by ParsedSalary
+        self._salary_cache = {}
+
+    def reset_caches(self):
+        """
+        Empty the company and salary caches.
+
+        Long-lived instances call this between runs, so the caches don't
+        grow without bound and companies edited meanwhile are read again.
+        """
+        self._company_cache.clear()
+        self._salary_cache.clear()
+
+    def ingest(self, records, failed=None):
+        """
+        Save the records that aren't in the database yet, and update the
+        jobs whose offer was edited since it was saved.
+
+        New jobs are inserted together; if that fails, they are inserted one
+        by one, so a bad record only loses itself and not its whole page.
+
+        Args:
+            records (list): JobRecords, possibly from several boards
+            failed (list, optional): Gets the records that couldn't be inserted
+
+        Returns:
+            list: Jobs created
+        """
+        new_records, changed_records = self._match(records)
+        if changed_records:
+            updated = self._rewrite(changed_records)
+            logger.info(f"Updated {len(updated)} edited jobs")
+        if not new_records:
+            return []
+
+        salaries = self._get_salaries(record.salary_text for record in new_records)
+        jobs = [
+            Job(
+                board=record.board,
+                original_id=record.original_id,
+                **self._scraped_fields(record, salaries),
+                content_hash=content_hash(record),
+                # Filled in by enrichment
+                description='',
+                requirements='',
+                responsibilities='',
+            )
+            for record in new_records
+        ]
+        try:
+            with transaction.atomic():
+                Job.objects.bulk_create(jobs, batch_size=500)
+        except DatabaseError as e:
+            logger.warning(f"Saving {len(jobs)} jobs at once failed, saving them one by one: {e}")
+            jobs = self._create_each(jobs, new_records, failed)
+
+        try:
+            cluster_jobs(jobs)
+        except Exception as e:
+            # Jobs left unclustered are picked up before the next digest
+            logger.error(f"Error clustering new jobs: {e}")
+        return jobs
+
+    def _create_each(self, jobs, records, failed):
+        """Insert jobs one at a time, skipping those the database rejects."""
+        created = []
+        for job, record in zip(jobs, records):
+            # Ids given by the rolled back insert
+            job.pk = None
+            try:
+                with transaction.atomic():
+                    job.save(force_insert=True)
+            except DatabaseError as e:
+                logger.error(f"Could not save job {record.board}/{record.original_id}: {e}")
+                if failed is not None:
+                    failed.append(record)
+                continue
+            created.append(job)
+        return created
+
+    def update(self, records):
+        """
+        Rewrite the scraped fields of saved jobs that differ from the records.
+
+        Used to apply parser fixes to offers read again from archived pages,
+        so every field is compared whatever the content hash says. A later
+        record of the same offer wins over an earlier one.
+
+        Args:
+            records (list): JobRecords, possibly from several boards
+
+        Returns:
+            list: Jobs updated
+        """
+        return self._rewrite({(record.board, record.original_id): record for record in records})
+
+    def _rewrite(self, latest):
+        """
+        Save the scraped fields of jobs that differ from their records.
+
+        Args:
+            latest (dict): (board, original_id) -> JobRecord
+
+        The company of a job is only looked up (and possibly created) when
+        the saved one isn't the one the record names, so ambiguous names
+        don't get a new company on every rewrite. Jobs saved before content
+        hashes get theirs without a JobRevision: what differs is mostly how
+        older code normalized the fields, not an edit of the offer.
+
+        Returns:
+            list: Jobs whose fields changed, with a new JobRevision unless they
+            had no content hash yet
+        """
+        salaries = self._get_salaries(record.salary_text for record in latest.values())
+
+        updated = []
+        rehashed = []
+        revisions = []
+        keys = list(latest)
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            for board in {board for board, _ in chunk}:
+                original_ids = [original_id for b, original_id in chunk if b == board]
+                jobs = (
+                    Job.objects
+                    .filter(board=board, original_id__in=original_ids)
+                    .select_related('company')
+                    .only('board', 'original_id', 'scored_at', 'content_hash', *SCRAPED_FIELDS,
+                          'company__name', 'company__url')
+                )
+                for job in jobs:
+                    record = latest[(job.board, job.original_id)]
+                    company = job.company if _same_company(job.company, record) else None
+                    fields = self._scraped_fields(record, salaries, company)
+                    changed = [name for name, value in fields.items() if _differs(job, name, value)]
+                    digest = content_hash(record)
+                    if not changed:
+                        if job.content_hash != digest:
+                            # Saved before content hashes, or by an older parser
+                            job.content_hash = digest
+                            rehashed.append(job)
+                        continue
+                    if job.content_hash:
+                        revisions.append(JobRevision(job=job, changes=_saved_values(job, changed)))
+                    for name in changed:
+                        setattr(job, name, fields[name])
+                    job.content_hash = digest
+                    if 'title' in changed:
+                        job.scored_at = None
+                    updated.append(job)
+
+        with transaction.atomic():
+            Job.objects.bulk_update(updated, SCRAPED_FIELDS + ['scored_at', 'content_hash'], batch_size=500)
+            Job.objects.bulk_update(rehashed, ['content_hash'], batch_size=500)
+            JobRevision.objects.bulk_create(revisions, batch_size=500)
+        return updated
+
+    def _scraped_fields(self, record, salaries, company=None):
+        return {
+            'title': record.title[:256],
+            'url': record.url[:256],
+            'company': company or self._get_company(record.company_name, record.company_url),
+            'seniority': record.seniority.lower()[:256],
+            'salary_text': record.salary_text[:256],
+            'salary': salaries[record.salary_text],
+        }
+
+    def _match(self, records):
+        """
+        Sort records out against the database, the first of repeated ones only.
+
+        Returns:
+            tuple: (records neither in the database nor archived, (board,
+            original_id) -> record for saved jobs whose content hash differs)
+        """
+        unique = {}
+        for record in records:
+            unique.setdefault((record.board, record.original_id), record)
+
+        existing = set()
+        changed = {}
+        keys = list(unique)
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            for board in {board for board, _ in chunk}:
+                original_ids = [original_id for b, original_id in chunk if b == board]
+                saved = (
+                    Job.objects
+                    .filter(board=board, original_id__in=original_ids)
+                    .values_list('board', 'original_id', 'content_hash')
+                )
+                for job_board, original_id, saved_hash in saved:
+                    key = (job_board, original_id)
+                    existing.add(key)
+                    if saved_hash != content_hash(unique[key]):
+                        changed[key] = unique[key]
+                # Old offers moved out by archive_jobs
+                existing.update((board, original_id) for original_id in archived_ids(board, original_ids))
+        return [record for key, record in unique.items() if key not in existing], changed
+
+    def _get_company(self, name, url):
+        cache_key = (name.lower(), url.strip())
+        company = self._company_cache.get(cache_key)
+        if company is None:
+            # The manager matches names that differ between boards
+            company = Company.objects.create_or_update_if_better(
+                name=name.lower(),
+                url=url,
+                size_from=0,
+                size_to=0,
+            )
+            self._company_cache[cache_key] = company
+        return company
+
+    def _get_salaries(self, texts):
+        """Salary row (or None) for every distinct salary text."""
+        salaries = {}
+        for text, parsed in parse_salaries(texts).items():
+            if parsed is None:
+                salaries[text] = None
+                continue
+            if parsed not in self._salary_cache:
+                self._salary_cache[parsed] = Salary.objects.get_for_parsed(parsed)
+            salaries[text] = self._salary_cache[parsed]
+        return salaries
@@ -1,224 +1,501 @@
 import logging
-import random
 import time
 import asyncio
 from asyncio import Future
 from concurrent.futures import ThreadPoolExecutor
-import gc
 import sys
 
 from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright, Error as PlaywrightError
-
-from scraper.models import Company, Job
+from django.conf import settings
+from django.db import connections
+from playwright.async_api import async_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from scraper import page_cache, work_queue
+from scraper.ingest import JobIngestor, JobRecord
+from scraper.memory import get_governor
+from scraper.models import JobBoard
+from scraper.page_archive import open_segment
+from scraper.partition import SearchSize, plan_partitions
+from scraper.readiness import PageTimings, get_readiness
+from scraper.throttle import backoff_delay, get_throttle, metrics as throttle_metrics
 
 logger = logging.getLogger(__name__)
 
+OFFERS_SELECTOR = 'div[data-test="section-offers"]'
+# Number of the last listing page, absent when there is only one
+MAX_PAGE_SELECTOR = '[data-test="top-pagination-max-page-number"]'
+COOKIE_BUTTON_SELECTOR = 'button[data-test="button-submitCookie"]'
+
+# Launch browser with minimal memory usage settings
+BROWSER_ARGS = [
+    '--disable-gpu',
+    '--disable-dev-shm-usage',
+    '--disable-setuid-sandbox',
+    '--no-sandbox',
+    '--single-process',
+    '--disable-extensions',
+    '--js-flags=--max-old-space-size=128'
+]
+
+
+def parse_listing(content):
+    """
+    Read the offers of a listing page's HTML (the offers section is enough).
+
+    Returns:
+        tuple: (offers found on the page, JobRecords of the offers that could be read)
+    """
+    # Use the default HTML parser since lxml might not be available
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # Find the job listings section
+    jobs_section = soup.find('div', {'data-test': 'section-offers'})
+    if not jobs_section or not jobs_section.children:
+        return 0, []
+
+    offers_found = 0
+    records = []
+    for job in jobs_section:
+        if hasattr(job, 'children'):
+            try:
+                job_data = list(job.children)[0]
+                job_id = job_data.attrs.get('data-test-offerid')
+                if not job_id:
+                    logger.error('Found job without id! Skipping.')
+                    continue
+                offers_found += 1
+                records.append(parse_offer(job_data, job_id))
+            except Exception as ex:
+                logger.error(f'Error while processing job: {ex}')
+    return offers_found, records
+
+
+def parse_offer(job_data, job_id):
+    """Read an offer of the listing into a JobRecord"""
+    salary = job_data.find('span', attrs={'data-test': 'offer-salary'})
+    salary = salary.text if salary else ''
+
+    # Get seniority level - handle potential structure changes
+    section_company = job_data.find('div', attrs={'data-test': 'section-company'})
+    if section_company and section_company.next_sibling and section_company.next_sibling.find('li'):
+        seniority = section_company.next_sibling.find('li').text
+    else:
+        seniority = ''
+
+    company = job_data.find('h3')
+    if not company:
+        logger.warning("Company name not found in job data")
+        company_name = "Unknown"
+        company_url = ""
+    else:
+        company_url = company.parent.attrs.get('href') or ''
+        company_name = company.text
+
+    title_element = job_data.find('h2', attrs={'data-test': 'offer-title'})
+    title = title_element.text if title_element else 'Unknown Position'
+
+    return JobRecord(
+        board=JobBoard.PRACUJ,
+        original_id=job_id,
+        title=title,
+        url=f'https://www.pracuj.pl/praca/,oferta,{job_id}',
+        company_name=company_name,
+        company_url=company_url,
+        seniority=seniority,
+        salary_text=salary,
+    )
+
 
 class PracujDownloader:
-    def download_jobs(self, filter_url, max_pages=None):
+    def __init__(self):
+        # Kept between runs so that long-running workers start the event loop
+        # and the Playwright driver only once
+        self._loop = None
+        self._playwright = None
+        # Keeps company and salary caches warm during a run, see reset_caches()
+        self._ingestor = JobIngestor()
+        self._memory = get_governor()
+        # Page cache hits and misses, reset by the caller at the start of a run
+        self.stats = {'pages_unchanged': 0, 'pages_changed': 0}
+        # Page latencies, for adaptive timeouts and the run summary
+        self.timings = PageTimings()
+        # Raw listing pages of the current run, see scraper/page_archive.py
+        self._archive = None
+        # Database work of all pages runs here one call at a time, so pages
+        # processed concurrently never insert the same offer twice
+        self._db_executor = None
+
+    def reset_caches(self):
+        """Forget the companies and salaries matched so far; call at the start of a run."""
+        self._ingestor.reset_caches()
+
+    def download_jobs(self, filter_url, max_pages=None, run_key=None):
         """
         Download jobs from pracuj.pl based on the filter URL using Playwright.
 
         Args:
             filter_url (str): The URL with job search filters
             max_pages (int, optional): Maximum number of pages to scrape. If None, scrape all pages.
+            run_key (str, optional): Run the pages are queued under, today's by default.
+                Pages this run already scraped are skipped; pass a new key to scrape them again.
 
         Returns:
             int: Number of jobs added to the database
         """
-        # Create a new event loop to run the async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # Reuse the event loop from previous runs of this downloader
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        return self._loop.run_until_complete(self._download_jobs_async(filter_url, max_pages, run_key))
+
+    def close(self):
+        """Stop the Playwright driver and close the event loop."""
+        if self._loop is None or self._loop.is_closed():
+            return
 
         try:
-            return loop.run_until_complete(self._download_jobs_async(filter_url, max_pages))
+            if self._playwright is not None:
+                self._loop.run_until_complete(self._playwright.stop())
+        except Exception as e:
+            logger.warning(f"Error stopping Playwright: {e}")
         finally:
-            loop.close()
+            self._playwright = None
+            self._loop.close()
+            self._loop = None
+            if self._db_executor is not None:
+                self._db_executor.submit(connections.close_all).result()
+                self._db_executor.shutdown()
+                self._db_executor = None
+
+    async def _get_playwright(self):
+        """Start the Playwright driver on first use and keep it running."""
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        return self._playwright
+
+    async def _reset_playwright(self):
+        """Stop the current Playwright driver, ignoring errors."""
+        if self._playwright is None:
+            return
+        try:
+            await self._playwright.stop()
+        except Exception:
+            pass
+        self._playwright = None
 
-    async def _download_jobs_async(self, filter_url, max_pages=None):
+    async def _download_jobs_async(self, filter_url, max_pages=None, run_key=None):
         """Async implementation of download_jobs using Playwright"""
-        jobs_added = 0
-        page_number = 1
+        run_key = run_key or work_queue.current_run_key()
+
+        # Long searches are split into parts scraped side by side
+        partitions = [(filter_url, None)]
+        if max_pages is None and settings.SCRAPER_PARTITION_PAGE_BUDGET:
+            partitions = await self._partition(filter_url)
+
+        # Searches of known length are queued whole, the others a window of
+        # pages at a time; every processed page queues the window after it.
+        # If this run was interrupted earlier, this resumes where it stopped.
+        pages_queued = 0
+        for search_url, pages in partitions:
+            last = pages or settings.SCRAPER_QUEUE_WINDOW
+            await self._run_in_thread(
+                None, lambda: work_queue.enqueue_pages(run_key, search_url, 1, last, max_pages))
+            pages_queued += min(last, max_pages or last)
+
+        search_urls = [search_url for search_url, _ in partitions]
+        jobs_added = await self._drain_queue(
+            run_key=run_key,
+            search_url=search_urls,
+            concurrency=max(1, min(pages_queued, settings.SCRAPER_PARTITION_CONCURRENCY)),
+        )
 
-        # Maximum pages to process before restarting browser
-        # Setting to a very small number to ensure browser gets restarted frequently
-        pages_per_browser = 2
+        logger.info(f"Total jobs added: {jobs_added}")
+        logger.info(f"Fetcher metrics: {throttle_metrics()}")
+        logger.info(f"Page latencies: {self.timings.summary()}")
+        return jobs_added
 
-        # Keep track of browser restarts to prevent infinite loops
-        browser_restart_count = 0
-        max_browser_restarts = 5
+    def process_queue(self, run_key=None):
+        """
+        Process queued pages of any search until the queue is empty.
 
-        while True:
-            # Exit if we've restarted the browser too many times
-            if browser_restart_count >= max_browser_restarts:
-                logger.error(f"Too many browser restarts ({browser_restart_count}). Stopping.")
-                break
+        Used by queue workers running next to the process that seeded the run.
 
-            # Check if we've reached the maximum number of pages to scrape
-            if max_pages and page_number > max_pages:
-                logger.info(f"Reached max pages limit ({max_pages}). Stopping.")
-                break
+        Returns:
+            int: Number of jobs added to the database
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        return self._loop.run_until_complete(self._drain_queue(run_key=run_key))
+
+    async def _partition(self, filter_url):
+        """(search URL, listing pages or None) of the parts of a search, within SCRAPER_PARTITION_PAGE_BUDGET pages each"""
+        try:
+            partitions = await plan_partitions(filter_url, self._count_searches)
+        except Exception as e:
+            logger.error(f"Could not partition {filter_url}, scraping it whole: {e}")
+            return [(filter_url, None)]
+
+        if len(partitions) > 1:
+            logger.info(f"Split {filter_url} into {len(partitions)} parts: "
+                        + ', '.join(f"{url} ({pages} pages)" for url, pages in partitions))
+        return partitions
 
+    async def _count_searches(self, urls):
+        """SearchSize of every search URL, None where it couldn't be counted"""
+        browser = await self._launch_browser()
+        try:
+            return [await self._count_search(browser, url) for url in urls]
+        finally:
             try:
-                # Process a batch of pages with a fresh browser instance
-                logger.info(f"Starting new browser instance (restart #{browser_restart_count})")
-                result, failed_page_offset = await self._process_batch(
-                    filter_url,
-                    start_page=page_number,
-                    max_pages=pages_per_browser if not max_pages else min(pages_per_browser,
-                                                                          max_pages - page_number + 1)
-                )
-
-                if result < 0:
-                    # Negative return indicates an error, retry with a fresh browser
-                    logger.warning(f"Browser error detected on page offset {failed_page_offset}. Restarting browser.")
-                    browser_restart_count += 1
-                    # Adjust page_number to retry from the failed page
-                    page_number = page_number + failed_page_offset
-                    continue
+                await browser.close()
+            except:
+                pass
 
-                # Update counters
-                jobs_added += result
-                page_number += pages_per_browser
+    async def _count_search(self, browser, url):
+        context = None
+        try:
+            context = await self._new_context(browser)
+            page = await context.new_page()
+            offers = await self._count_offers(page, url)
+            if not offers:
+                return SearchSize(0, 0)
+            max_page = page.locator(MAX_PAGE_SELECTOR)
+            if not await max_page.count():
+                return SearchSize(1, offers)
+            pages = int((await max_page.first.text_content()).strip())
+            # Every page but the last is full
+            last_page_offers = await self._count_offers(page, f'{url}&pn={pages}')
+            return SearchSize(pages, (pages - 1) * offers + last_page_offers)
+        except Exception as e:
+            logger.warning(f"Could not count the offers of {url}: {e}")
+            return None
+        finally:
+            # Closing the context closes its pages
+            if context is not None:
+                try:
+                    await context.close()
+                except:
+                    pass
+
+    async def _count_offers(self, page, url):
+        """Offers on the listing page at url, which is left loaded"""
+        ready = get_readiness(OFFERS_SELECTOR).watch(page)
+        await self._goto(page, url)
+        try:
+            await ready(self.timings.timeout('ready'))
+        except PlaywrightTimeoutError:
+            # No offers section, no offers
+            return 0
+        content = await page.locator(OFFERS_SELECTOR).first.evaluate('el => el.outerHTML')
+        return parse_listing(content)[0]
+
+    async def _drain_queue(self, run_key=None, search_url=None, concurrency=1):
+        """
+        Claim and process work items in browser-sized batches until none are left.
 
-                # Force garbage collection between batches
-                gc.collect()
+        search_url may be a list of the parts of a search; `concurrency`
+        browsers then drain them side by side.
+        """
+        # Peak memory is reported per run
+        self._memory = get_governor()
+
+        self._archive = open_segment()
+        try:
+            results = await asyncio.gather(*(self._drain_batches(run_key, search_url) for _ in range(concurrency)))
+            jobs_added = sum(results)
+        finally:
+            if self._archive is not None:
+                self._archive.close()
+                logger.info(f"Archived {self._archive.pages} pages to {self._archive.path}")
+                self._archive = None
 
-                # Reset restart counter on successful batch
-                browser_restart_count = 0
+        self._memory.log_peaks()
+        return jobs_added
+
+    async def _drain_batches(self, run_key, search_url):
+        jobs_added = 0
+        # Page failures are retried through the queue; this only guards
+        # against failures outside of any page, like the browser not starting
+        consecutive_failures = 0
+        max_consecutive_failures = settings.SCRAPER_MAX_PAGE_ATTEMPTS
 
+        while consecutive_failures < max_consecutive_failures:
+            try:
+                # Process a batch of pages with a fresh browser instance
+                batch_jobs_added, pages_claimed = await self._process_batch(run_key, search_url)
             except Exception as e:
                 logger.error(f"Fatal error during job processing: {e}")
-                browser_restart_count += 1
-                # Sleep a bit before retrying to avoid hammering the server
-                await asyncio.sleep(5)
+                # Back off before retrying to avoid hammering the server
+                await asyncio.sleep(backoff_delay(consecutive_failures, base=5))
+                consecutive_failures += 1
+                continue
+
+            jobs_added += batch_jobs_added
+            consecutive_failures = 0
+            if not pages_claimed:
+                break
 
-        logger.info(f"Total jobs added: {jobs_added}")
+            # Collect garbage and adapt the batch size to memory use
+            self._memory.after_batch()
+        else:
+            logger.error(f"Too many consecutive failures ({consecutive_failures}). Stopping, "
+                         f"unfinished pages stay queued for the next run.")
         return jobs_added
 
-    async def _process_batch(self, filter_url, start_page, max_pages):
-        """Process a batch of pages with a fresh browser instance"""
+    async def _process_batch(self, run_key, search_url):
+        """
+        Process queued pages with a fresh browser instance.
+
+        The browser is recycled after the governor's pages_per_browser pages,
+        or earlier if its memory goes over budget.
+
+        Returns:
+            tuple: (jobs added, number of work items claimed)
+        """
         batch_jobs_added = 0
+        pages_claimed = 0
 
-        try:
-            async with async_playwright() as p:
-                # Launch browser with minimal memory usage settings
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--disable-gpu',
-                        '--disable-dev-shm-usage',
-                        '--disable-setuid-sandbox',
-                        '--no-sandbox',
-                        '--single-process',
-                        '--disable-extensions',
-                        '--js-flags=--max-old-space-size=128'
-                    ]
-                )
+        browser = await self._launch_browser()
 
+        try:
+            for page_index in range(self._memory.pages_per_browser):
+                if page_index and self._memory.browser_over_budget():
+                    break
+                item = await self._run_in_thread(None, lambda: work_queue.claim_item(run_key, search_url))
+                if item is None:
+                    break
+                pages_claimed += 1
+
+                url = f'{item.search_url}&pn={item.page_number}'
+                logger.info(f"Scraping page {item.page_number} (attempt {item.attempts}): {url}")
+
+                result = None
+                error = 'page processing failed'
+                context = None
                 try:
-                    # Process each page in the batch
-                    for page_offset in range(max_pages):
-                        current_page = start_page + page_offset
-                        url = f'{filter_url}&pn={current_page}'
-                        logger.info(f"Scraping page {current_page}: {url}")
-
-                        # Create a new context for this page
+                    # Create a new context for this page
+                    context = await self._new_context(browser)
+                    result = await self._process_single_page(
+                        context, url,
+                        is_first_page=(item.page_number == 1),
+                        cache_key=(item.search_url, item.page_number),
+                    )
+                except Exception as e:
+                    logger.error(f"Error processing page {item.page_number}: {e}")
+                    error = e
+                finally:
+                    # Always try to close the context
+                    if context is not None:
                         try:
-                            context = await browser.new_context(
-                                viewport={'width': 1280, 'height': 800},
-                                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.102 Safari/537.36'
-                            )
-                        except PlaywrightError as e:
-                            logger.error(f"Failed to create browser context: {e}")
-                            return -1, page_offset  # Return failed page offset
+                            await context.close()
+                        except:
+                            pass
 
-                        try:
-                            # Process the page
-                            page_jobs = await self._process_single_page(context, url, is_first_page=(current_page == 1))
-
-                            if page_jobs < 0:
-                                # Error in page processing
-                                await context.close()
-                                return -1, page_offset  # Signal an error with page offset
-
-                            batch_jobs_added += page_jobs
-
-                            # If no jobs found on this page, stop processing this batch
-                            if page_jobs == 0:
-                                await context.close()
-                                break
-
-                        except Exception as e:
-                            logger.error(f"Error processing page {current_page}: {e}")
-                            try:
-                                await context.close()
-                            except:
-                                pass
-                            return -1, page_offset  # Signal an error with page offset
-                        finally:
-                            # Always try to close the context
-                            try:
-                                await context.close()
-                            except:
-                                pass
-
-                        # Brief pause between pages
-                        await asyncio.sleep(random.uniform(1, 2))
-
-                    return batch_jobs_added, -1  # Success, no page failure
+                if result is None:
+                    # Put the page back and retry it with a fresh browser
+                    await self._run_in_thread(None, lambda: work_queue.fail_item(item, error))
+                    logger.warning(f"Browser error detected on page {item.page_number}. Restarting browser.")
+                    break
 
-                finally:
-                    # Always close the browser
-                    try:
-                        await browser.close()
-                    except:
-                        pass
+                offers_found, page_jobs = result
+                batch_jobs_added += page_jobs
+                # A page without offers is past the end of the listing
+                await self._run_in_thread(None, lambda: work_queue.complete_item(item, page_jobs, offers_found > 0))
 
-        except Exception as e:
-            logger.error(f"Error initializing Playwright: {e}")
-            return -1, 0  # First page failed
+            return batch_jobs_added, pages_claimed
 
-    async def _process_single_page(self, context, url, is_first_page=False):
-        """Process a single page and extract jobs"""
-        jobs_added = 0
-        max_retries = 2
+        finally:
+            # Always close the browser
+            try:
+                await browser.close()
+            except:
+                pass
+
+    async def _launch_browser(self):
+        p = await self._get_playwright()
+        try:
+            return await p.chromium.launch(headless=True, args=BROWSER_ARGS)
+        except Exception:
+            # The driver may have died, start a fresh one on the next attempt
+            await self._reset_playwright()
+            raise
+
+    async def _new_context(self, browser):
+        return await browser.new_context(
+            viewport={'width': 1280, 'height': 800},
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.102 Safari/537.36'
+        )
+
+    async def _process_single_page(self, context, url, is_first_page=False, cache_key=None):
+        """
+        Process a single page and extract jobs.
+
+        With a (search URL, page number) cache_key, a page whose offers
+        section is unchanged since it was last processed is not parsed again.
+
+        Returns:
+            tuple: (offers found, jobs added), or None if the page failed
+        """
+        max_retries = settings.SCRAPER_PAGE_RETRIES
 
         for retry in range(max_retries):
             try:
                 # Create a new page
                 page = await context.new_page()
+                page_started = time.monotonic()
 
                 try:
-                    # Navigate to the page
-                    if is_first_page:
-                        # Accept cookies on the first page
-                        await self._accept_cookies(page, url)
-                    else:
-                        await page.goto(url, wait_until='domcontentloaded', timeout=20000)
-                        await page.wait_for_selector('div[data-test="section-offers"]', timeout=10000)
-
-                    # Short delay
-                    await asyncio.sleep(1)
-
-                    # Minimal scrolling to save memory
-                    await page.evaluate('window.scrollBy(0, 800)')
-
-                    # Get content
-                    content = await page.content()
-
-                    # Process page content
-                    jobs_added = await self._process_page_content(content)
-                    return jobs_added
+                    with self._memory.stage('fetch'):
+                        ready = get_readiness(OFFERS_SELECTOR).watch(page)
+                        # Navigate to the page
+                        await self._goto(page, url)
+
+                        # Wait for the offers, not a fixed time
+                        ready_started = time.monotonic()
+                        await ready(self.timings.timeout('ready'))
+                        self.timings.record('ready', time.monotonic() - ready_started)
+
+                        if is_first_page:
+                            # Accept cookies on the first page
+                            await self._accept_cookies(page)
+
+                    with self._memory.stage('extract'):
+                        # Only the offers section leaves the browser, never the whole document
+                        content = await page.locator(OFFERS_SELECTOR).first.evaluate('el => el.outerHTML')
+                    self._archive_page(url, cache_key, content)
+
+                    if cache_key:
+                        page_fingerprint = page_cache.fingerprint(content)
+                        cached_offers = await self._run_in_thread(
+                            None, lambda: page_cache.lookup(*cache_key, page_fingerprint))
+                        if cached_offers is not None:
+                            logger.info(f"Page {cache_key[1]} unchanged since last run. Skipping.")
+                            self.stats['pages_unchanged'] += 1
+                            self.timings.record('page', time.monotonic() - page_started)
+                            return cached_offers, 0
+                        self.stats['pages_changed'] += 1
+
+                    with self._memory.stage('parse'):
+                        # Process page content
+                        offers_found, jobs_added, saved = await self._process_page_content(content)
+
+                    # A page with offers that weren't saved must be processed again next time
+                    if cache_key and saved:
+                        await self._run_in_thread(
+                            None, lambda: page_cache.store(*cache_key, page_fingerprint, offers_found))
+                    self.timings.record('page', time.monotonic() - page_started)
+                    return offers_found, jobs_added
 
                 except PlaywrightError as e:
                     if retry < max_retries - 1:
                         logger.warning(f"Playwright error on retry {retry}: {e}")
-                        await asyncio.sleep(2)
+                        await asyncio.sleep(backoff_delay(retry))
                     else:
                         logger.error(f"Failed after {max_retries} retries: {e}")
-                        return -1
+                        return None
                 finally:
                     # Always close the page
                     try:
@@ -228,160 +505,82 @@ class PracujDownloader:
 
             except PlaywrightError as e:
                 logger.error(f"Failed to create page: {e}")
-                return -1
-
-        return jobs_added
-
-    async def _process_page_content(self, content):
-        """Process page content in a memory-efficient way"""
-        # Use the default HTML parser since lxml might not be available
-        soup = BeautifulSoup(content, 'html.parser')
-
-        # Find the job listings section
-        jobs_section = soup.find('div', {'data-test': 'section-offers'})
-        if not jobs_section or not jobs_section.children:
-            return 0
-
-        jobs_added = 0
-        # Use small ThreadPoolExecutor with limited workers
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            for job in jobs_section:
-                if hasattr(job, 'children'):
-                    try:
-                        job_data = list(job.children)[0]
-                        job_id = job_data.attrs.get('data-test-offerid')
-                        if not job_id:
-                            logger.error('Found job without id! Skipping.')
-                            continue
-
-                        # Create a local function to avoid lambda issues
-                        def check_job_exists(jid):
-                            return Job.objects.filter(original_id=jid).exists()
-
-                        # Check if job exists
-                        job_exists_future = self._run_in_thread(
-                            executor,
-                            lambda: check_job_exists(job_id)
-                        )
-
-                        try:
-                            job_exists = await job_exists_future
-                        except Exception as e:
-                            logger.error(f"Error checking if job exists: {e}")
-                            continue
-
-                        if job_exists:
-                            logger.debug(f"Job {job_id} already exists in database. Skipping.")
-                            continue
+                return None
 
-                        # Local function to add job
-                        def add_job(jdata, jid):
-                            return self._add_job_quick(jdata, jid)
+        return None
 
-                        # Process the job
-                        job_added_future = self._run_in_thread(
-                            executor,
-                            lambda: add_job(job_data, job_id)
-                        )
+    def _archive_page(self, url, cache_key, content):
+        """Keep the raw page for reextract_jobs; never fails the page."""
+        if self._archive is None:
+            return
+        search_url, page_number = cache_key or (url, None)
+        try:
+            self._archive.append(search_url, page_number, content)
+        except Exception as e:
+            logger.warning(f"Could not archive {url}: {e}")
 
-                        try:
-                            job_added = await job_added_future
-                            if job_added:
-                                jobs_added += 1
-                        except Exception as e:
-                            logger.error(f"Error adding job: {e}")
+    async def _goto(self, page, url):
+        """Navigate to url under the host's rate limit, reporting the outcome to it"""
+        throttle = get_throttle(url)
+        await throttle.acquire_async()
 
-                    except Exception as ex:
-                        logger.error(f'Error while processing job: {ex}')
+        started = time.monotonic()
+        try:
+            response = await page.goto(url, wait_until='domcontentloaded', timeout=self.timings.timeout('navigate'))
+        except PlaywrightTimeoutError:
+            throttle.record(time.monotonic() - started, timed_out=True)
+            raise
+        except PlaywrightError:
+            # Aborted navigations and the like aren't the host pushing back
+            throttle.record_error(time.monotonic() - started)
+            raise
+
+        status = response.status if response else None
+        throttle.record(time.monotonic() - started, status=status)
+        self.timings.record('navigate', time.monotonic() - started)
+        if status is not None and status >= 400:
+            raise PlaywrightError(f"HTTP {status} for {url}")
+        return response
 
-        # Clear variables to help garbage collection
-        soup = None
-        jobs_section = None
-        content = None
+    async def _process_page_content(self, content):
+        """
+        Process the HTML of the offers section (a whole page also works).
 
-        return jobs_added
+        Returns:
+            tuple: (offers found on the page, jobs added to the database,
+                whether every offer found was read and saved)
+        """
+        offers_found, records = parse_listing(content)
+        if not records:
+            return offers_found, 0, not offers_found
+        failed = []
+        try:
+            new_jobs = await self._run_in_thread(None, lambda: self._ingestor.ingest(records, failed))
+        except Exception as e:
+            logger.error(f"Error saving jobs: {e}")
+            return offers_found, 0, False
+        return offers_found, len(new_jobs), len(records) == offers_found and not failed
 
     def _run_in_thread(self, executor, func):
-        """Run a synchronous function in a thread and return a Future."""
+        """Run a synchronous function in a thread (the database thread by default) and return a Future."""
+        if executor is None:
+            if self._db_executor is None:
+                self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scraper-db')
+            executor = self._db_executor
         loop = asyncio.get_event_loop()
         return loop.run_in_executor(executor, func)
 
-    async def _accept_cookies(self, page, url):
-        """Accept cookies dialog if it appears"""
+    async def _accept_cookies(self, page):
+        """Accept the cookies dialog if the loaded page shows one"""
         try:
-            await page.goto(url, wait_until='domcontentloaded', timeout=20000)
-
-            # Wait up to 5 seconds for the cookie dialog and accept it
-            try:
-                cookie_button = await page.wait_for_selector(
-                    'button[data-test="button-submitCookie"]',
-                    timeout=5000
-                )
-                if cookie_button:
-                    await cookie_button.click()
-                    logger.info("Accepted cookies")
-
-                    # Wait a moment for the page to process the cookie acceptance
-                    await asyncio.sleep(1)
-            except:
-                # Cookie dialog might not appear if cookies already accepted
+            # The page is ready, so the dialog is there or it isn't coming
+            cookie_button = await page.query_selector(COOKIE_BUTTON_SELECTOR)
+            if cookie_button is None:
                 logger.info("No cookie dialog found or already accepted")
-                pass
-
+                return
+            await cookie_button.click()
+            # Wait for the dialog to go away rather than a fixed time
+            await page.wait_for_selector(COOKIE_BUTTON_SELECTOR, state='hidden', timeout=self.timings.timeout('ready'))
+            logger.info("Accepted cookies")
         except Exception as e:
             logger.warning(f"Error during cookie acceptance: {e}")
-
-    def _add_job_quick(self, job_data, job_id):
-        """Add a job to the database based on parsed job data"""
-        job_url = f'https://www.pracuj.pl/praca/,oferta,{job_id}'
-
-        try:
-            salary = job_data.find('span', attrs={'data-test': 'offer-salary'})
-            salary = salary.text if salary else ''
-
-            # Get seniority level - handle potential structure changes
-            section_company = job_data.find('div', attrs={'data-test': 'section-company'})
-            if section_company and section_company.next_sibling and section_company.next_sibling.find('li'):
-                seniority = section_company.next_sibling.find('li').text
-            else:
-                seniority = ''
-
-            company = self._add_or_update_company(job_data)
-            title_element = job_data.find('h2', attrs={'data-test': 'offer-title'})
-            title = title_element.text if title_element else 'Unknown Position'
-
-            Job.objects.create(
-                original_id=job_id,
-                board=3,  # Pracuj
-                salary_text=salary,
-                company=company,
-                seniority=seniority.lower(),
-                title=title,
-                url=job_url,
-                description='',  # These fields are required but we're not fetching the details
-                requirements='',
-                responsibilities='',
-            )
-            return True
-        except Exception as e:
-            logger.error(f"Error adding job {job_id}: {e}")
-            return False
-
-    def _add_or_update_company(self, job_data):
-        """Extract company info and create or update in database"""
-        company = job_data.find('h3')
-        if not company:
-            logger.warning("Company name not found in job data")
-            company_name = "Unknown"
-            company_url = ""
-        else:
-            company_url = company.parent.attrs.get('href') or ''
-            company_name = company.text.lower()
-
-        # Use the manager to properly handle company matching
-        return Company.objects.create_or_update_if_better(
-            name=company_name,
-            url=company_url,
-            size_from=0,
-            size_to=0,
-        )
\ No newline at end of file
@@ -1,22 +1,29 @@
 from django.core.mail import EmailMessage
+import hashlib
 import os
 import logging
 
+from scraper import outbox
+
 logger = logging.getLogger(__name__)
 
 
-def send_mail_with_offers(offers: list, is_test=False):
+def get_recipients():
+    """Addresses in EMAIL_RECIPIENTS, an empty list if it isn't set."""
+    return [address for address in os.environ.get('EMAIL_RECIPIENTS', '').split(',') if address]
+
+
+def build_offers_email(offers: list, is_test=False):
     """
-    Send an email with job offers.
+    Subject and HTML body of an email with job offers.
 
     Args:
         offers (list): List of job offers (dicts with title, company__name, url)
         is_test (bool): Whether this is a test email
-    """
-    if not offers:
-        logger.warning("No offers to send. Skipping email.")
-        return
 
+    Returns:
+        tuple: (subject, body)
+    """
     # Create email subject
     if is_test:
         subject = '[TEST] Job Scraper - New Job Offers'
@@ -33,10 +40,53 @@ def send_mail_with_offers(offers: list, is_test=False):
 
     if is_test:
         content = '<p><strong>This is a test email from Job Scraper</strong></p>' + content
+    return subject, content
+
+
+def queue_mail_with_offers(offers: list):
+    """
+    Queue an email with job offers in the outbox, see scraper/outbox.py.
+
+    The idempotency key is made of the offers' ids, so queueing the same
+    offers twice sends one email. The offers are marked sent once the
+    email is delivered.
+
+    Args:
+        offers (list): List of job offers (dicts with id, title, company__name, url)
+
+    Returns:
+        bool: Whether the email was queued
+    """
+    recipients = get_recipients()
+    if not recipients:
+        logger.error("No email recipients specified. Set EMAIL_RECIPIENTS environment variable.")
+        return False
+
+    subject, content = build_offers_email(offers)
+    ids = ','.join(str(offer['id']) for offer in sorted(offers, key=lambda offer: offer['id']))
+    key = 'offers:' + hashlib.sha256(ids.encode('utf-8')).hexdigest()
+    queued = outbox.enqueue(key, subject, content, recipients, job_ids=[offer['id'] for offer in offers])
+    if queued:
+        logger.info(f"Queued email with {len(offers)} job offers to {', '.join(recipients)}")
+    return queued
+
+
+def send_mail_with_offers(offers: list, is_test=False):
+    """
+    Send an email with job offers right away, bypassing the outbox.
+
+    Args:
+        offers (list): List of job offers (dicts with title, company__name, url)
+        is_test (bool): Whether this is a test email
+    """
+    if not offers:
+        logger.warning("No offers to send. Skipping email.")
+        return
 
+    subject, content = build_offers_email(offers, is_test)
 
-    recipients = os.environ.get('EMAIL_RECIPIENTS', '').split(',')
-    if not recipients or recipients[0] == '':
+    recipients = get_recipients()
+    if not recipients:
         logger.error("No email recipients specified. Set EMAIL_RECIPIENTS environment variable.")
         return
 
@@ -52,4 +102,4 @@ def send_mail_with_offers(offers: list, is_test=False):
     msg.content_subtype = 'html'
     msg.send()
 
-    logger.info(f"Email sent successfully to {', '.join(recipients)}")
\ No newline at end of file
+    logger.info(f"Email sent successfully to {', '.join(recipients)}")
@@ -0,0 +1,36 @@
+# jobscraper/scraper/management/commands/archive_jobs.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from scraper.retention import archive_jobs
+
+
+class Command(BaseCommand):
+    help = 'Move old jobs from grabbo_job to the archive table or to compressed files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.ARCHIVE_AFTER_DAYS,
+            help='Archive jobs older than this many days (default: ARCHIVE_AFTER_DAYS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of jobs moved per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--directory',
+            type=str,
+            help='Write gzipped JSON lines files here instead of the archive table',
+        )
+
+    def handle(self, *args, **options):
+        archived = archive_jobs(
+            days=options['days'],
+            batch_size=options['batch_size'],
+            directory=options['directory'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} jobs"))
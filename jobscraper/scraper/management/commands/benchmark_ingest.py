@@ -0,0 +1,68 @@
+# jobscraper/scraper/management/commands/benchmark_ingest.py
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+FIXTURES = Path(__file__).resolve().parents[2] / 'tests' / 'fixtures'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Time parsing and saving of recorded listing pages, then roll everything back'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=50,
+            help='Listing pages to ingest, cycling through the recorded ones (default: 50)',
+        )
+        parser.add_argument(
+            '--fixtures',
+            default=str(FIXTURES),
+            help='Directory of pracuj_offers_*.html listing pages',
+        )
+
+    def handle(self, *args, **options):
+        # Imported here so other commands don't pay for BeautifulSoup and Playwright
+        from scraper.ingest import JobIngestor
+        from scraper.job_downloader import parse_listing
+
+        listings = [path.read_text() for path in sorted(Path(options['fixtures']).glob('pracuj_offers_*.html'))]
+        if not listings:
+            raise CommandError(f"No pracuj_offers_*.html pages in {options['fixtures']}")
+
+        ingestor = JobIngestor()
+        parse_seconds = ingest_seconds = 0.0
+        offers = queries = 0
+        try:
+            with transaction.atomic():
+                for page in range(options['pages']):
+                    started = time.perf_counter()
+                    _, records = parse_listing(listings[page % len(listings)])
+                    parse_seconds += time.perf_counter() - started
+
+                    # Every page brings new offers, as on a first run
+                    records = [record._replace(original_id=f'{record.original_id}-{page}') for record in records]
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        ingestor.ingest(records)
+                        ingest_seconds += time.perf_counter() - started
+                    queries += len(captured)
+                    offers += len(records)
+                raise Rollback
+        except Rollback:
+            pass
+
+        pages = options['pages']
+        self.stdout.write(f"Pages: {pages}, offers: {offers}")
+        self.stdout.write(f"Parsing: {parse_seconds * 1000 / pages:.2f} ms/page")
+        self.stdout.write(f"Saving: {ingest_seconds * 1000 / max(offers, 1):.2f} ms/offer, "
+                          f"{queries / pages:.1f} queries/page")
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, nothing was saved"))
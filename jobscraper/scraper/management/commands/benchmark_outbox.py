@@ -0,0 +1,76 @@
+# jobscraper/scraper/management/commands/benchmark_outbox.py
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from scraper.outbox import enqueue, send_outbox
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Time sending queued emails to a local SMTP server, then roll the outbox back'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--messages',
+            type=int,
+            default=200,
+            help='Emails to queue and send (default: 200)',
+        )
+        parser.add_argument(
+            '--host',
+            help='SMTP server to send to (default: start an aiosmtpd sink on localhost)',
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8025,
+            help='Port of the SMTP server (default: 8025)',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEFAULT_FROM_EMAIL:
+            raise CommandError("Set DEFAULT_FROM_EMAIL, the sender of the emails")
+
+        controller = None
+        host = options['host']
+        if not host:
+            try:
+                # Optional, only needed for this benchmark
+                from aiosmtpd.controller import Controller
+                from aiosmtpd.handlers import Sink
+            except ImportError:
+                raise CommandError("Install aiosmtpd or pass --host of a local SMTP server")
+            host = '127.0.0.1'
+            controller = Controller(Sink(), hostname=host, port=options['port'])
+            controller.start()
+
+        connection = get_connection(
+            'django.core.mail.backends.smtp.EmailBackend',
+            host=host, port=options['port'], username='', password='', use_tls=False, use_ssl=False,
+        )
+        messages = options['messages']
+        body = '<h2>New Job Offers:</h2><br>' + '<a href="https://www.pracuj.pl/">Analityk danych at ACME</a><br>' * 100
+        try:
+            with transaction.atomic():
+                for number in range(messages):
+                    enqueue(f'benchmark:{number}', f'Benchmark {number}', body, ['benchmark@example.com'])
+                started = time.perf_counter()
+                sent = send_outbox(connection=connection)
+                seconds = time.perf_counter() - started
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            if controller is not None:
+                controller.stop()
+
+        self.stdout.write(f"Sent {sent} of {messages} emails in {seconds:.2f}s, "
+                          f"{sent / seconds if seconds else 0:.1f} emails/s")
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, nothing was kept in the outbox"))
@@ -0,0 +1,177 @@
+# jobscraper/scraper/management/commands/benchmark_queries.py
+import datetime
+import io
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from scraper.api import DEFAULT_LIMIT, _build_response
+from scraper.bulk_copy import export_jobs
+from scraper.ingest import JobIngestor, JobRecord
+from scraper.models import Company, Job
+from scraper.search import search_jobs
+from scraper.synthetic import delete_synthetic, generate
+from scraper.tasks import digest_offers
+
+# Company names looked up per run of company_match
+COMPANY_SAMPLE = 100
+# Offers per run of ingest_seen, as many as on a few listing pages
+INGEST_SAMPLE = 500
+# Words in the name of a database the benchmark may fill without --force
+SCRATCH_DATABASE_WORDS = ('test', 'bench')
+
+
+def _is_scratch_database():
+    """Whether the default database is in memory or named as one for tests or benchmarks."""
+    name = str(connection.settings_dict['NAME'])
+    if connection.vendor == 'sqlite' and connection.creation.is_in_memory_db(name):
+        return True
+    return any(word in os.path.basename(name).lower() for word in SCRATCH_DATABASE_WORDS)
+
+
+def _digest():
+    since = timezone.now() - datetime.timedelta(days=settings.DIGEST_LOOKBACK_DAYS)
+    return list(digest_offers(since))
+
+
+def _count_jobs():
+    call_command('count_jobs', stdout=io.StringIO())
+
+
+def _export():
+    with open(os.devnull, 'w', newline='', encoding='utf-8') as output:
+        export_jobs(output)
+
+
+def _api_page():
+    return _build_response({'limit': DEFAULT_LIMIT})
+
+
+def _api_search():
+    return _build_response({'limit': DEFAULT_LIMIT, 'q': 'analityk'})
+
+
+def _search():
+    return search_jobs('analityk danych')
+
+
+class Command(BaseCommand):
+    help = 'Time the production queries at several table sizes, filling the tables with synthetic jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales',
+            default='10000,1000000,10000000',
+            help='Comma-separated numbers of jobs to benchmark at (default: 10000,1000000,10000000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs of each query per scale; the median is reported (default: 3)',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic data (default: 0)')
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the synthetic jobs afterwards (default: delete them)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help="Run even if the database name doesn't contain 'test' or 'bench'",
+        )
+
+    def handle(self, *args, **options):
+        if not options['force'] and not _is_scratch_database():
+            raise CommandError(
+                f"{connection.settings_dict['NAME']} doesn't look like a test or benchmark database; "
+                "the benchmark adds and deletes millions of rows. Pass --force to run it anyway"
+            )
+        try:
+            scales = sorted({int(scale) for scale in options['scales'].split(',') if scale.strip()})
+        except ValueError:
+            raise CommandError("--scales must be comma-separated numbers")
+        if not scales:
+            raise CommandError("Give at least one scale")
+
+        queries = {
+            'digest': _digest,
+            'api_page': _api_page,
+            'api_search': _api_search,
+            'search': _search,
+            'count_jobs': _count_jobs,
+            'export': _export,
+            f'company_match x{COMPANY_SAMPLE}': self._company_match,
+            f'ingest_seen x{INGEST_SAMPLE}': self._ingest_seen,
+        }
+        results = {}
+        sizes = []
+        try:
+            for scale in scales:
+                existing = Job.objects.count()
+                if existing < scale:
+                    self.stdout.write(f"Generating {scale - existing} jobs for the {scale} scale...")
+                    generate(scale - existing, seed=options['seed'] + scale)
+                else:
+                    self.stdout.write(f"{existing} jobs already, benchmarking at that size")
+                self._analyze()
+                sizes.append(Job.objects.count())
+                self._prepare()
+
+                for name, query in queries.items():
+                    timings = []
+                    for _ in range(options['repeat']):
+                        started = time.perf_counter()
+                        query()
+                        timings.append(time.perf_counter() - started)
+                    results.setdefault(name, []).append(statistics.median(timings) * 1000)
+                    self.stdout.write(f"  {name}: {results[name][-1]:.1f} ms")
+        finally:
+            if not options['keep']:
+                self.stdout.write(f"Deleted {delete_synthetic()} synthetic jobs")
+
+        self._print_table(sizes, results, options['repeat'])
+
+    def _prepare(self):
+        """Pick the inputs of the sampled queries from the current data."""
+        self.company_names = list(
+            Company.objects.order_by('-id').values_list('name', flat=True)[:COMPANY_SAMPLE]
+        )
+        self.records = [
+            JobRecord(job.board, job.original_id, job.title, job.url,
+                      job.company.name if job.company else '', job.company.url if job.company else '',
+                      job.seniority, job.salary_text)
+            for job in Job.objects.select_related('company').order_by('-id')[:INGEST_SAMPLE]
+        ]
+
+    def _company_match(self):
+        for name in self.company_names:
+            Company.objects.get_possible_match(name).count()
+
+    def _ingest_seen(self):
+        # Offers already saved and unchanged: only the lookups run
+        JobIngestor().ingest(self.records)
+
+    def _analyze(self):
+        """Refresh the planner statistics after the bulk load."""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                for table in ('grabbo_job', 'grabbo_company', 'grabbo_salary'):
+                    cursor.execute(f'ANALYZE {table}')
+            elif connection.vendor == 'sqlite':
+                cursor.execute('ANALYZE')
+
+    def _print_table(self, sizes, results, repeat):
+        width = max(len(name) for name in results) + 2
+        self.stdout.write(f"\nMedian of {repeat} runs in ms, by number of jobs ({connection.vendor}):")
+        self.stdout.write('query'.ljust(width) + ''.join(f'{size:>14,}' for size in sizes))
+        for name, timings in results.items():
+            self.stdout.write(name.ljust(width) + ''.join(f'{ms:>14.1f}' for ms in timings))
+        self.stdout.write(self.style.SUCCESS("Benchmark finished"))
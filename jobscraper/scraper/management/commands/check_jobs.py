@@ -3,6 +3,7 @@ from django.core.management.base import BaseCommand
 from django.db.models import Count
 from django.db.models.functions import TruncDate
 from scraper.models import Job, JobBoard
+from scraper.routers import replica_reads
 import datetime
 
 
@@ -14,6 +15,8 @@ class Command(BaseCommand):
         parser.add_argument('--month', type=int, default=2, help='Month to analyze (default: February)')
         parser.add_argument('--year', type=int, default=2025, help='Year to analyze (default: 2025)')
 
+    # A month of jobs, read from the replica when there is a fresh one
+    @replica_reads()
     def handle(self, *args, **options):
         board_id = options.get('board')
         month = options.get('month')
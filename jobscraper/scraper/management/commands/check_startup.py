@@ -0,0 +1,78 @@
+# jobscraper/scraper/management/commands/check_startup.py
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Dependencies that only scraping, enrichment and scoring should pay for
+HEAVY_MODULES = ['playwright', 'bs4', 'lxml', 'numpy', 'scipy', 'requests', 'zstandard']
+
+
+def parse_importtime(output):
+    """
+    Read the output of `python -X importtime`.
+
+    Returns:
+        list: (module name, nesting level, cumulative import time in microseconds)
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # One space after the separator, then two per level of nesting
+        name = name.rstrip()[1:]
+        level = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), level, int(cumulative)))
+    return modules
+
+
+class Command(BaseCommand):
+    help = 'Measure the cold start of a management command with python -X importtime'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'commands',
+            nargs='*',
+            default=['count_jobs', 'check_db', 'export_jobs_csv', 'search_jobs'],
+            help='Commands to measure (default: the reporting commands)',
+        )
+        parser.add_argument(
+            '--budget-ms',
+            type=int,
+            default=settings.STARTUP_BUDGET_MS,
+            help='Fail if importing for a command takes longer, 0 to only check which modules '
+                 'are imported (default: STARTUP_BUDGET_MS)',
+        )
+
+    def handle(self, *args, **options):
+        failures = []
+        for command in options['commands']:
+            # --help loads settings, the apps and the command without touching the database
+            result = subprocess.run(
+                [sys.executable, '-X', 'importtime', 'manage.py', command, '--help'],
+                cwd=Path(settings.BASE_DIR),
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode != 0:
+                raise CommandError(f"{command} --help failed: {result.stderr[-500:]}")
+
+            modules = parse_importtime(result.stderr)
+            top_level = [(name, time) for name, level, time in modules if level == 0]
+            total_ms = sum(time for _, time in top_level) / 1000
+            heavy = sorted({name.split('.')[0] for name, _, _ in modules} & set(HEAVY_MODULES))
+            slowest = sorted(top_level, key=lambda item: item[1], reverse=True)[:3]
+
+            self.stdout.write(f"{command}: {total_ms:.0f} ms importing, slowest: "
+                              + ', '.join(f"{name} {time / 1000:.0f} ms" for name, time in slowest))
+            if heavy:
+                failures.append(f"{command} imports {', '.join(heavy)}")
+            if options['budget_ms'] and total_ms > options['budget_ms']:
+                failures.append(f"{command} takes {total_ms:.0f} ms, over the budget of {options['budget_ms']} ms")
+
+        if failures:
+            raise CommandError('; '.join(failures))
+        self.stdout.write(self.style.SUCCESS("Startup within budget"))
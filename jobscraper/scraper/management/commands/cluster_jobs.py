@@ -0,0 +1,20 @@
+# jobscraper/scraper/management/commands/cluster_jobs.py
+from django.core.management.base import BaseCommand
+
+from scraper.dedup import cluster_new_jobs
+
+
+class Command(BaseCommand):
+    help = 'Link jobs that were never clustered to their near-duplicates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of jobs loaded at a time (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        duplicates = cluster_new_jobs(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Found {duplicates} near-duplicate jobs"))
@@ -3,11 +3,14 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.db.models import Count
 from scraper.models import Job
+from scraper.routers import replica_reads
 
 
 class Command(BaseCommand):
     help = 'Count jobs and check date distribution'
 
+    # Aggregates over every job, read from the replica when there is a fresh one
+    @replica_reads()
     def handle(self, *args, **options):
         # Get today's date
         today = timezone.now().date()
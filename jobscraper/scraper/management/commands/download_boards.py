@@ -0,0 +1,26 @@
+# jobscraper/scraper/management/commands/download_boards.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from scraper.boards import ADAPTERS, download_boards
+
+
+class Command(BaseCommand):
+    help = 'Download offers from job boards with public listing APIs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--board',
+            action='append',
+            choices=sorted(ADAPTERS),
+            help='Board to read, can be repeated (default: BOARD_ADAPTERS)',
+        )
+
+    def handle(self, *args, **options):
+        boards = options['board'] or settings.BOARD_ADAPTERS
+        self.stdout.write(f"Downloading offers from {', '.join(boards)}...")
+        try:
+            jobs_added = download_boards(boards)
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"Added {jobs_added} jobs"))
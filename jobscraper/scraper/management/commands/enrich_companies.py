@@ -0,0 +1,22 @@
+# jobscraper/scraper/management/commands/enrich_companies.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from scraper.enrichment import enrich_companies
+
+
+class Command(BaseCommand):
+    help = 'Fetch company profile pages to fill in industry and size of companies'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget',
+            type=int,
+            default=settings.COMPANY_ENRICH_BUDGET,
+            help='Maximum number of profile pages to fetch (default: COMPANY_ENRICH_BUDGET)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Enriching up to {options['budget']} companies...")
+        enriched = enrich_companies(budget=options['budget'])
+        self.stdout.write(self.style.SUCCESS(f"Enriched {enriched} companies"))
@@ -0,0 +1,22 @@
+# jobscraper/scraper/management/commands/enrich_jobs.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from scraper.enrichment import enrich_jobs
+
+
+class Command(BaseCommand):
+    help = 'Fetch offer pages to fill in description, requirements and responsibilities of jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget',
+            type=int,
+            default=settings.ENRICH_BUDGET,
+            help='Maximum number of offer pages to fetch (default: ENRICH_BUDGET)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Enriching up to {options['budget']} jobs...")
+        enriched = enrich_jobs(budget=options['budget'])
+        self.stdout.write(self.style.SUCCESS(f"Enriched {enriched} jobs"))
@@ -1,9 +1,10 @@
 # jobscraper/scraper/management/commands/export_jobs_csv.py
-import csv
 import os
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from scraper.models import Job, JobBoard, HypeStatus
+from scraper.bulk_copy import export_jobs
+from scraper.models import Job, JobBoard
+from scraper.routers import replica_reads
 
 
 class Command(BaseCommand):
@@ -14,6 +15,8 @@ class Command(BaseCommand):
         parser.add_argument('--board', type=int, help='Filter by job board (1=NoFluff, 2=JustJoin, 3=Pracuj)')
         parser.add_argument('--limit', type=int, help='Limit the number of records')
 
+    # Reads every job, from the replica when there is a fresh one
+    @replica_reads()
     def handle(self, *args, **options):
         # Prepare output file path
         output_path = options.get('output')
@@ -41,58 +44,9 @@ class Command(BaseCommand):
         total_jobs = queryset.count()
         self.stdout.write(f"Exporting {total_jobs} jobs to {output_path}")
 
-        # Define fieldnames for the CSV
-        fieldnames = [
-            'id', 'original_id', 'board', 'board_name',
-            'title', 'url', 'seniority', 'salary_text',
-            'company_id', 'company_name', 'company_url',
-            'status', 'status_name', 'created_at',
-            'lena_comparibility'
-        ]
-
-        # Write to CSV
+        # Write to CSV, with COPY on Postgres and from the ORM elsewhere
         with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-
-            # Process in batches to avoid memory issues with large databases
-            batch_size = 1000
-            processed = 0
-
-            for i in range(0, total_jobs, batch_size):
-                batch = queryset[i:i + batch_size]
-                for job in batch:
-                    # Convert board ID to name
-                    board_name = job.get_board_display()
-
-                    # Convert status ID to name
-                    status_name = job.get_status_display()
-
-                    # Get company info safely
-                    company_id = job.company.id if job.company else None
-                    company_name = job.company.name if job.company else ''
-                    company_url = job.company.url if job.company else ''
-
-                    writer.writerow({
-                        'id': job.id,
-                        'original_id': job.original_id,
-                        'board': job.board,
-                        'board_name': board_name,
-                        'title': job.title,
-                        'url': job.url,
-                        'seniority': job.seniority,
-                        'salary_text': job.salary_text,
-                        'company_id': company_id,
-                        'company_name': company_name,
-                        'company_url': company_url,
-                        'status': job.status,
-                        'status_name': status_name,
-                        'created_at': job.created_at.isoformat() if job.created_at else '',
-                        'lena_comparibility': job.lena_comparibility
-                    })
-
-                processed += len(batch)
-                self.stdout.write(f"Progress: {processed}/{total_jobs} jobs processed")
+            export_jobs(csvfile, board=board_id, limit=limit)
 
         # Print summary
         file_size = os.path.getsize(output_path) / (1024 * 1024)  # Size in MB
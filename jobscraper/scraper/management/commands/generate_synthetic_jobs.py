@@ -0,0 +1,49 @@
+# jobscraper/scraper/management/commands/generate_synthetic_jobs.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from scraper.synthetic import delete_synthetic, generate
+
+
+class Command(BaseCommand):
+    help = 'Add realistic synthetic jobs and companies, to see how the app behaves with more data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=10000,
+            help='Jobs to add (default: 10000)',
+        )
+        parser.add_argument(
+            '--companies',
+            type=int,
+            help='Companies to add (default: one per 20 jobs)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='Age of the oldest job in days (default: 365)',
+        )
+        parser.add_argument('--seed', type=int, help='Seed for reproducible data')
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Delete the synthetic jobs and companies instead',
+        )
+
+    def handle(self, *args, **options):
+        if options['delete']:
+            deleted = delete_synthetic()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} synthetic jobs"))
+            return
+
+        started = time.perf_counter()
+        added = generate(options['jobs'], companies=options['companies'], days=options['days'], seed=options['seed'])
+        seconds = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Added {added} synthetic jobs in {seconds:.1f}s ({added / seconds if seconds else 0:.0f} jobs/s). "
+            f"Remove them with --delete"
+        ))
@@ -0,0 +1,29 @@
+# jobscraper/scraper/management/commands/import_jobs.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from scraper.bulk_copy import import_jobs
+
+
+class Command(BaseCommand):
+    help = 'Merge jobs from a CSV file written by export_jobs_csv, matching them on board and original id'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='CSV file to import')
+
+    def handle(self, *args, **options):
+        engine = 'COPY' if connection.vendor == 'postgresql' else 'ORM'
+        self.stdout.write(f"Importing {options['path']} ({engine})")
+
+        started = time.perf_counter()
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as csvfile:
+                created, updated = import_jobs(csvfile)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Import complete in {time.perf_counter() - started:.1f}s: {created} jobs created, {updated} updated"
+        ))
@@ -0,0 +1,59 @@
+# jobscraper/scraper/management/commands/parse_salaries.py
+from django.core.management.base import BaseCommand
+
+from scraper.models import Job, Salary
+from scraper.salary import parse_salaries
+
+
+class Command(BaseCommand):
+    help = 'Parse salary_text of existing jobs into Salary rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Jobs processed per chunk')
+        parser.add_argument('--all', action='store_true', help='Re-parse jobs that already have a salary')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        queryset = Job.objects.exclude(salary_text='')
+        if not options['all']:
+            queryset = queryset.filter(salary__isnull=True)
+
+        total_jobs = queryset.count()
+        self.stdout.write(f"Parsing salaries of {total_jobs} jobs in chunks of {chunk_size}")
+
+        salaries = {}
+        processed = 0
+        linked = 0
+        last_id = 0
+        while True:
+            # Walk the table by primary key so every chunk is an index range scan
+            chunk = list(
+                queryset
+                .filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'salary_text')[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1][0]
+
+            parsed = parse_salaries(text for _, text in chunk)
+            jobs_by_salary = {}
+            for job_id, text in chunk:
+                if parsed[text] is None:
+                    continue
+                if parsed[text] not in salaries:
+                    salaries[parsed[text]] = Salary.objects.get_for_parsed(parsed[text])
+                jobs_by_salary.setdefault(salaries[parsed[text]].id, []).append(job_id)
+
+            # One UPDATE per distinct salary rather than one per job
+            for salary_id, job_ids in jobs_by_salary.items():
+                linked += Job.objects.filter(id__in=job_ids).update(salary_id=salary_id)
+
+            processed += len(chunk)
+            self.stdout.write(f"Progress: {processed}/{total_jobs} jobs processed")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Linked {linked} jobs to {len(salaries)} distinct salaries, "
+            f"{processed - linked} salary texts had no amount"
+        ))
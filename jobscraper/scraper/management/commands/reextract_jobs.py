@@ -0,0 +1,53 @@
+# jobscraper/scraper/management/commands/reextract_jobs.py
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Re-parse archived listing pages with the current parser and update the jobs that changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--directory',
+            type=str,
+            default=settings.PAGE_ARCHIVE_DIR,
+            help='Page archive directory (default: PAGE_ARCHIVE_DIR)',
+        )
+        parser.add_argument(
+            '--since',
+            type=datetime.date.fromisoformat,
+            help='Only pages archived on or after this day (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Parser processes (default: one per CPU)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Parse the pages and report, without updating jobs',
+        )
+
+    def handle(self, *args, **options):
+        if not options['directory']:
+            raise CommandError("No page archive: set PAGE_ARCHIVE_DIR or pass --directory")
+
+        # Imported here so other commands don't pay for zstandard and BeautifulSoup
+        from scraper.page_archive import reextract_jobs
+
+        stats = reextract_jobs(
+            directory=options['directory'],
+            since=options['since'],
+            workers=options['workers'],
+            dry_run=options['dry_run'],
+        )
+        self.stdout.write(
+            f"Read {stats['pages']} pages in {stats['segments']} segments, {stats['offers']} distinct offers"
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS("Dry run, no jobs updated"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Updated {stats['updated']} jobs"))
@@ -0,0 +1,23 @@
+# jobscraper/scraper/management/commands/run_queue_worker.py
+from django.core.management.base import BaseCommand
+
+from scraper.job_downloader import PracujDownloader
+
+
+class Command(BaseCommand):
+    help = 'Scrape queued listing pages until the queue is empty (run several to scale out)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--run-key',
+            type=str,
+            help='Only process pages of this run (default: any run)',
+        )
+
+    def handle(self, *args, **options):
+        downloader = PracujDownloader()
+        try:
+            jobs_added = downloader.process_queue(run_key=options.get('run_key'))
+        finally:
+            downloader.close()
+        self.stdout.write(self.style.SUCCESS(f'Queue drained. {jobs_added} new jobs added to database.'))
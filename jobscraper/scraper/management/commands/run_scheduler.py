@@ -0,0 +1,51 @@
+# jobscraper/scraper/management/commands/run_scheduler.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from scraper.scheduler import CronSchedule, Scheduler
+from scraper.tasks import SCHEDULED_AFTER, SCHEDULED_TASKS, close_downloader
+
+
+class Command(BaseCommand):
+    help = 'Run scrape and digest jobs on cron schedules in a long-running process'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='Print the configured jobs and their next run times, then exit',
+        )
+
+    def handle(self, *args, **options):
+        jobs = {}
+        for name, cron in settings.SCHEDULER_JOBS.items():
+            if not cron:
+                continue
+            if name not in SCHEDULED_TASKS:
+                raise CommandError(f"Unknown scheduler job '{name}'. Available: {', '.join(SCHEDULED_TASKS)}")
+            try:
+                CronSchedule(cron)
+            except ValueError as e:
+                raise CommandError(f"Invalid schedule for '{name}': {e}")
+            jobs[name] = (cron, import_string(SCHEDULED_TASKS[name]))
+
+        if not jobs:
+            raise CommandError("No scheduler jobs configured. Set SCRAPE_CRON or DIGEST_CRON.")
+
+        scheduler = Scheduler(jobs, poll_interval=settings.SCHEDULER_POLL_INTERVAL, waits_for=SCHEDULED_AFTER)
+
+        if options['list']:
+            self.stdout.write(f"Now: {timezone.now().isoformat()}")
+            for name, next_run in scheduler.next_runs.items():
+                self.stdout.write(f"  {name}: '{jobs[name][0]}' next at {next_run.isoformat()}")
+            return
+
+        self.stdout.write(f"Starting scheduler with jobs: {', '.join(jobs)}")
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('Scheduler stopped')
+        finally:
+            close_downloader()
@@ -0,0 +1,25 @@
+# jobscraper/scraper/management/commands/score_jobs.py
+from django.core.management.base import BaseCommand
+
+from scraper.scoring import score_jobs
+
+
+class Command(BaseCommand):
+    help = 'Score jobs by their similarity to SCORING_PROFILE'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rescore every job, e.g. after changing SCORING_PROFILE',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Number of jobs scored at a time (default: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        scored = score_jobs(rescore=options['all'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Scored {scored} jobs"))
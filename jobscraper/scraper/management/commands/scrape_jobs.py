@@ -1,10 +1,25 @@
+# jobscraper/scraper/management/commands/scrape_jobs.py
 from django.core.management.base import BaseCommand
+from scraper import work_queue
 from scraper.tasks import download_and_send
 
 class Command(BaseCommand):
     help = 'Scrape jobs from pracuj.pl and send email with results'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--run-key',
+            type=str,
+            help="Queue the pages under this run (default: today's, so pages done today are skipped)",
+        )
+        parser.add_argument(
+            '--new-run',
+            action='store_true',
+            help='Scrape every page again under a new run key',
+        )
+
     def handle(self, *args, **options):
+        run_key = work_queue.new_run_key() if options['new_run'] else options['run_key']
         self.stdout.write('Starting job scraping...')
-        result = download_and_send()
-        self.stdout.write(self.style.SUCCESS(f'Job scraping completed: {result}'))
\ No newline at end of file
+        result = download_and_send(run_key=run_key)
+        self.stdout.write(self.style.SUCCESS(f'Job scraping completed: {result}'))
@@ -0,0 +1,30 @@
+# jobscraper/scraper/management/commands/search_jobs.py
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from scraper.search import search_jobs
+
+
+class Command(BaseCommand):
+    help = 'Full-text search over job titles and descriptions, best matches first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('query', type=str, help='Words to search for, e.g. "analityk danych"')
+        parser.add_argument('--limit', type=int, default=20, help='Maximum number of results (default: 20)')
+        parser.add_argument('--days', type=int, help='Only jobs created in the last N days')
+
+    def handle(self, *args, **options):
+        since = None
+        if options.get('days'):
+            since = timezone.now() - datetime.timedelta(days=options['days'])
+
+        results = search_jobs(options['query'], limit=options['limit'], since=since)
+        if not results:
+            self.stdout.write(self.style.WARNING("No matching jobs"))
+            return
+
+        for job in results:
+            company = job.company.name if job.company else 'Unknown Company'
+            self.stdout.write(f"{job.rank:7.3f}  {job.created_at:%Y-%m-%d}  {job.title} at {company}  {job.url}")
@@ -0,0 +1,21 @@
+# jobscraper/scraper/management/commands/send_outbox.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from scraper.outbox import send_outbox
+
+
+class Command(BaseCommand):
+    help = 'Send the queued emails that are due (run several to scale out)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH,
+            help='Emails claimed at once (default: EMAIL_OUTBOX_BATCH)',
+        )
+
+    def handle(self, *args, **options):
+        sent = send_outbox(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} emails"))
@@ -3,7 +3,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 import os
 
-from scraper.job_downloader import PracujDownloader
+from scraper import work_queue
 from scraper.models import Job
 from scraper.mailings import send_mail_with_offers
 
@@ -50,8 +50,12 @@ class Command(BaseCommand):
         self.stdout.write(f"Jobs in database before scraping: {jobs_before}")
 
         # Scrape jobs
+        # Imported here so that loading the command doesn't import Playwright
+        from scraper.job_downloader import PracujDownloader
+
         downloader = PracujDownloader()
-        jobs_added = downloader.download_jobs(url, max_pages=max_pages)
+        # A test scrape always fetches its pages, whatever ran earlier today
+        jobs_added = downloader.download_jobs(url, max_pages=max_pages, run_key=work_queue.new_run_key())
 
         # Count new jobs
         jobs_after = Job.objects.count()
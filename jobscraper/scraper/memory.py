@@ -0,0 +1,130 @@
+import gc
+import logging
+import os
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def read_rss(pid='self'):
+    """Resident set size of a process in bytes from /proc, or None if unavailable."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def descendant_pids(pid=None):
+    """PIDs of all processes below `pid` (the current process by default)."""
+    pid = pid or os.getpid()
+    children = {}
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return []
+
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name is in parentheses and may contain spaces
+        fields = stat[stat.rfind(')') + 2:].split()
+        children.setdefault(int(fields[1]), []).append(int(entry))
+
+    descendants = []
+    pending = [pid]
+    while pending:
+        for child in children.get(pending.pop(), []):
+            descendants.append(child)
+            pending.append(child)
+    return descendants
+
+
+def children_rss():
+    """Total RSS of our child processes: the Playwright driver and Chromium."""
+    return sum(read_rss(pid) or 0 for pid in descendant_pids())
+
+
+class MemoryGovernor:
+    """
+    Keeps the scraper within memory budgets and records peak usage per stage.
+
+    Python RSS is our own process, browser RSS is every process below it. When
+    the browser goes over budget it should be recycled; when Python goes over
+    budget, fewer pages are processed per browser.
+    """
+
+    def __init__(self, python_budget_mb, browser_budget_mb, pages_per_browser):
+        self.python_budget = python_budget_mb * MB
+        self.browser_budget = browser_budget_mb * MB
+        self.max_pages_per_browser = pages_per_browser
+        self.pages_per_browser = pages_per_browser
+        self.peaks = {}
+        self.enabled = read_rss() is not None
+
+    def sample(self, stage=None):
+        """Measure current RSS, remembering it as the stage's peak if higher."""
+        if not self.enabled:
+            return 0, 0
+        python_rss = read_rss() or 0
+        browser_rss = children_rss()
+        if stage:
+            peak_python, peak_browser = self.peaks.get(stage, (0, 0))
+            self.peaks[stage] = (max(peak_python, python_rss), max(peak_browser, browser_rss))
+        return python_rss, browser_rss
+
+    @contextmanager
+    def stage(self, name):
+        """Record peak memory of the wrapped block under `name`."""
+        self.sample(name)
+        try:
+            yield
+        finally:
+            self.sample(name)
+
+    def browser_over_budget(self):
+        """Whether the browser should be recycled before the next page."""
+        _, browser_rss = self.sample()
+        if self.enabled and browser_rss > self.browser_budget:
+            logger.warning(f"Browser RSS {browser_rss / MB:.0f} MB over budget of "
+                           f"{self.browser_budget / MB:.0f} MB. Recycling browser.")
+            return True
+        return False
+
+    def after_batch(self):
+        """Collect garbage between browser batches and adapt pages per browser."""
+        gc.collect()
+        python_rss, _ = self.sample('batch')
+        if not self.enabled:
+            return
+
+        if python_rss > self.python_budget and self.pages_per_browser > 1:
+            self.pages_per_browser -= 1
+            logger.warning(f"Python RSS {python_rss / MB:.0f} MB over budget of {self.python_budget / MB:.0f} MB. "
+                           f"Processing {self.pages_per_browser} page(s) per browser.")
+        elif python_rss < self.python_budget / 2 and self.pages_per_browser < self.max_pages_per_browser:
+            self.pages_per_browser += 1
+
+    def log_peaks(self):
+        for stage, (python_rss, browser_rss) in self.peaks.items():
+            logger.info(f"Peak memory in {stage}: python {python_rss / MB:.0f} MB, browser {browser_rss / MB:.0f} MB")
+
+
+def get_governor():
+    return MemoryGovernor(
+        python_budget_mb=settings.SCRAPER_PYTHON_RSS_BUDGET_MB,
+        browser_budget_mb=settings.SCRAPER_BROWSER_RSS_BUDGET_MB,
+        pages_per_browser=settings.SCRAPER_PAGES_PER_BROWSER,
+    )
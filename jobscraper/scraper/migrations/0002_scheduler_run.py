@@ -0,0 +1,32 @@
+# Generated by Django 4.2.2 on 2026-10-18 23:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulerRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_name', models.CharField(max_length=64)),
+                ('scheduled_for', models.DateTimeField()),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(null=True)),
+                ('status', models.IntegerField(choices=[(0, 'Running'), (1, 'Succeeded'), (2, 'Failed')], default=0)),
+                ('result', models.CharField(blank=True, max_length=1024)),
+            ],
+            options={
+                'db_table': 'grabbo_scheduler_run',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='schedulerrun',
+            constraint=models.UniqueConstraint(fields=('job_name', 'scheduled_for'), name='unique_scheduler_slot'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.2 on 2026-10-18 23:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0002_scheduler_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageWorkItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_key', models.CharField(max_length=64)),
+                ('search_url', models.CharField(max_length=1024)),
+                ('page_number', models.IntegerField()),
+                ('page_limit', models.IntegerField(null=True)),
+                ('state', models.IntegerField(choices=[(0, 'Pending'), (1, 'In Progress'), (2, 'Done'), (3, 'Failed')], default=0)),
+                ('attempts', models.IntegerField(default=0)),
+                ('lease_expires_at', models.DateTimeField(null=True)),
+                ('jobs_added', models.IntegerField(default=0)),
+                ('last_error', models.CharField(blank=True, max_length=1024)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'grabbo_page_work_item',
+                'indexes': [models.Index(fields=['state', 'lease_expires_at'], name='page_work_item_claim_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pageworkitem',
+            constraint=models.UniqueConstraint(fields=('run_key', 'search_url', 'page_number'), name='unique_page_work_item'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.2 on 2026-10-18 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0003_page_work_item'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('search_url', models.CharField(max_length=1024)),
+                ('page_number', models.IntegerField()),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('offers_found', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+            options={
+                'db_table': 'grabbo_page_fingerprint',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pagefingerprint',
+            constraint=models.UniqueConstraint(fields=('search_url', 'page_number'), name='unique_page_fingerprint'),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 4.2.2 on 2026-10-18 23:45
+
+from django.db import migrations, models
+
+
+def add_legacy_salary_columns(apps, schema_editor):
+    Salary = apps.get_model('scraper', 'Salary')
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        columns = {
+            column.name: column
+            for column in connection.introspection.get_table_description(cursor, Salary._meta.db_table)
+        }
+
+    for name in ('amount_from', 'amount_to', 'currency'):
+        field = Salary._meta.get_field(name)
+        if field.column not in columns:
+            schema_editor.add_field(Salary, field)
+        elif field.null and not columns[field.column].null_ok:
+            # Open ranges ("od 5 000 zł") have only one amount
+            old_field = field.clone()
+            old_field.null = False
+            old_field.set_attributes_from_name(name)
+            old_field.model = Salary
+            schema_editor.alter_field(Salary, old_field, field)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0005_job_enriched_at'),
+    ]
+
+    operations = [
+        # grabbo_salary tables created by setup_local_db or the original project
+        # already have these columns (amounts NOT NULL), so they are only
+        # added where missing.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='salary',
+                    name='amount_from',
+                    field=models.IntegerField(null=True),
+                ),
+                migrations.AddField(
+                    model_name='salary',
+                    name='amount_to',
+                    field=models.IntegerField(null=True),
+                ),
+                migrations.AddField(
+                    model_name='salary',
+                    name='currency',
+                    field=models.CharField(default='PLN', max_length=10),
+                ),
+            ],
+        ),
+        migrations.RunPython(add_legacy_salary_columns, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='salary',
+            name='contract_type',
+            field=models.CharField(blank=True, choices=[('', 'Unknown'), ('uop', 'Umowa o pracę'), ('b2b', 'B2B'), ('uz', 'Umowa zlecenie'), ('uod', 'Umowa o dzieło')], max_length=8),
+        ),
+        migrations.AddField(
+            model_name='salary',
+            name='is_gross',
+            field=models.BooleanField(null=True),
+        ),
+        migrations.AddField(
+            model_name='salary',
+            name='monthly_from',
+            field=models.IntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='salary',
+            name='monthly_to',
+            field=models.IntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='salary',
+            name='period',
+            field=models.CharField(choices=[('hour', 'Hour'), ('day', 'Day'), ('month', 'Month'), ('year', 'Year')], default='month', max_length=8),
+        ),
+        migrations.AddIndex(
+            model_name='salary',
+            index=models.Index(fields=['currency', 'monthly_to'], name='salary_monthly_to_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salary',
+            index=models.Index(fields=['currency', 'monthly_from'], name='salary_monthly_from_idx'),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Full-text search over job titles and details, maintained by the database.
+
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'job_search') THEN
+            CREATE TEXT SEARCH CONFIGURATION job_search (COPY = simple);
+            ALTER TEXT SEARCH CONFIGURATION job_search
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+        END IF;
+    END
+    $$
+    """,
+    "ALTER TABLE grabbo_job ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION grabbo_job_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('job_search', coalesce(NEW.title, '')), 'A')
+            || setweight(to_tsvector('job_search', coalesce(NEW.description, '')), 'B')
+            || setweight(to_tsvector('job_search', coalesce(NEW.responsibilities, '')), 'C')
+            || setweight(to_tsvector('job_search', coalesce(NEW.requirements, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER grabbo_job_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, description, responsibilities, requirements ON grabbo_job
+        FOR EACH ROW EXECUTE FUNCTION grabbo_job_search_vector_update()
+    """,
+    # Fires the trigger for existing rows
+    "UPDATE grabbo_job SET title = title",
+    "CREATE INDEX grabbo_job_search_vector_idx ON grabbo_job USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS grabbo_job_search_vector_idx",
+    "DROP TRIGGER IF EXISTS grabbo_job_search_vector_trigger ON grabbo_job",
+    "DROP FUNCTION IF EXISTS grabbo_job_search_vector_update()",
+    "ALTER TABLE grabbo_job DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE grabbo_job_fts USING fts5(
+        title, description, responsibilities, requirements,
+        content='grabbo_job', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # The triggers keeping it in sync are installed after every migrate by
+    # scraper.search.install_sqlite_triggers, because SQLite drops them
+    # whenever a later migration rebuilds grabbo_job.
+    "INSERT INTO grabbo_job_fts(grabbo_job_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS grabbo_job_fts_update",
+    "DROP TRIGGER IF EXISTS grabbo_job_fts_delete",
+    "DROP TRIGGER IF EXISTS grabbo_job_fts_insert",
+    "DROP TABLE IF EXISTS grabbo_job_fts",
+]
+
+
+def _run(schema_editor, statements):
+    vendor = schema_editor.connection.vendor
+    for sql in statements.get(vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD})
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0006_salary_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
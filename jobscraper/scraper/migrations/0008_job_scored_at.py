@@ -0,0 +1,18 @@
+# Generated by Django 4.2.2 on 2026-10-18 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0007_job_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='scored_at',
+            field=models.DateTimeField(db_index=True, null=True),
+        ),
+    ]
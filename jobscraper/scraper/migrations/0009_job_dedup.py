@@ -0,0 +1,42 @@
+# Generated by Django 4.2.2 on 2026-10-18 23:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0008_job_scored_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSignature',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='scraper.job')),
+                ('minhash', models.BinaryField()),
+            ],
+            options={
+                'db_table': 'grabbo_job_signature',
+            },
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='cluster',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='scraper.job'),
+        ),
+        migrations.CreateModel(
+            name='JobLshBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='scraper.job')),
+            ],
+            options={
+                'db_table': 'grabbo_job_lsh_bucket',
+                'indexes': [models.Index(fields=['bucket', 'band'], name='lsh_bucket_band_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.2 on 2026-10-18 23:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0009_job_dedup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['board', 'original_id'], name='job_board_original_id_idx'),
+        ),
+    ]
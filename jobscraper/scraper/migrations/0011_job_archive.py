@@ -0,0 +1,100 @@
+# Generated by Django 4.2.2 on 2026-10-18 23:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Postgres keeps the archive partitioned by month of created_at, so old
+# months can be detached or dropped cheaply. Partitions are created by
+# scraper.retention before rows are moved in; the default partition only
+# catches rows that slip past that.
+POSTGRES_PARTITIONED_TABLE = [
+    "DROP TABLE grabbo_job_archive",
+    """
+    CREATE TABLE grabbo_job_archive (
+        id bigint NOT NULL,
+        board integer NOT NULL,
+        original_id varchar(256) NOT NULL,
+        title varchar(256) NOT NULL,
+        url varchar(256) NOT NULL,
+        company_name varchar(255) NOT NULL,
+        seniority varchar(256) NOT NULL,
+        salary_text varchar(256) NOT NULL,
+        salary_id bigint NULL,
+        description text NOT NULL,
+        requirements text NOT NULL,
+        responsibilities text NOT NULL,
+        status integer NOT NULL,
+        lena_comparibility double precision NOT NULL,
+        created_at timestamp with time zone NOT NULL,
+        archived_at timestamp with time zone NOT NULL,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at)
+    """,
+    "CREATE TABLE grabbo_job_archive_default PARTITION OF grabbo_job_archive DEFAULT",
+    "CREATE INDEX job_archive_original_id_idx ON grabbo_job_archive (board, original_id)",
+]
+
+
+def partition_archive(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in POSTGRES_PARTITIONED_TABLE:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0010_job_board_original_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedJob',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('board', models.IntegerField(choices=[(1, 'No Fluff'), (2, 'Just Join It'), (3, 'Pracuj')])),
+                ('original_id', models.CharField(max_length=256)),
+                ('title', models.CharField(max_length=256)),
+                ('url', models.CharField(max_length=256)),
+                ('company_name', models.CharField(max_length=255)),
+                ('seniority', models.CharField(max_length=256)),
+                ('salary_text', models.CharField(max_length=256)),
+                ('salary_id', models.BigIntegerField(null=True)),
+                ('description', models.TextField()),
+                ('requirements', models.TextField()),
+                ('responsibilities', models.TextField()),
+                ('status', models.IntegerField(choices=[(0, 'Unknown'), (1, 'Fuck It'), (2, 'Interested'), (3, 'Hyped')], default=0)),
+                ('lena_comparibility', models.FloatField(default=0.0)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'grabbo_job_archive',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedJobKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.SmallIntegerField(choices=[(1, 'No Fluff'), (2, 'Just Join It'), (3, 'Pracuj')])),
+                ('key', models.BigIntegerField()),
+            ],
+            options={
+                'db_table': 'grabbo_job_archive_key',
+            },
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='cluster',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='duplicates', to='scraper.job'),
+        ),
+        migrations.AddConstraint(
+            model_name='archivedjobkey',
+            constraint=models.UniqueConstraint(fields=('board', 'key'), name='unique_archived_job_key'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedjob',
+            index=models.Index(fields=['board', 'original_id'], name='job_archive_original_id_idx'),
+        ),
+        migrations.RunPython(partition_archive, migrations.RunPython.noop),
+    ]
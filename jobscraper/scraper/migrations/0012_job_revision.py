@@ -0,0 +1,31 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0011_job_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='content_hash',
+            field=models.CharField(default='', max_length=32),
+        ),
+        migrations.CreateModel(
+            name='JobRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+                ('changes', models.JSONField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='scraper.job')),
+            ],
+            options={
+                'db_table': 'grabbo_job_revision',
+            },
+        ),
+    ]
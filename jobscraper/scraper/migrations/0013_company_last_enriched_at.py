@@ -0,0 +1,26 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0012_job_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='last_enriched_at',
+            field=models.DateTimeField(db_index=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['size_from'], name='company_size_from_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['size_to'], name='company_size_to_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0013_company_last_enriched_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=255, unique=True)),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('recipients', models.TextField()),
+                ('state', models.IntegerField(choices=[(0, 'Pending'), (1, 'In Progress'), (2, 'Done'), (3, 'Failed')], default=0)),
+                ('attempts', models.IntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(null=True)),
+                ('lease_expires_at', models.DateTimeField(null=True)),
+                ('last_error', models.CharField(blank=True, max_length=1024)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'db_table': 'grabbo_email_outbox',
+                'indexes': [models.Index(fields=['state', 'next_attempt_at'], name='email_outbox_claim_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:26
+
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def mark_earlier_offers_sent(apps, schema_editor):
+    # Digests used to pick the offers created on the day they ran, so only
+    # today's offers may still be waiting; the rest would all be sent at once
+    Job = apps.get_model('scraper', 'Job')
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    Job.objects.filter(created_at__lt=today).update(digest_sent_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0014_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='jobs',
+            field=models.ManyToManyField(db_table='grabbo_email_outbox_job', related_name='emails', to='scraper.job'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='digest_sent_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(mark_earlier_offers_sent, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('digest_sent_at__isnull', True)), fields=['created_at'], name='job_digest_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:51
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+def merge_duplicate_salaries(apps, schema_editor):
+    # Concurrent runs could create the same salary twice; keep the oldest row
+    Salary = apps.get_model('scraper', 'Salary')
+    Job = apps.get_model('scraper', 'Job')
+    kept = {}
+    for salary in Salary.objects.order_by('id').iterator():
+        key = (salary.amount_from, salary.amount_to, salary.currency, salary.period,
+               salary.contract_type, salary.is_gross)
+        if key not in kept:
+            kept[key] = salary.id
+            continue
+        Job.objects.filter(salary_id=salary.id).update(salary_id=kept[key])
+        salary.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0015_job_digest_sent_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_salaries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='salary',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('amount_from', -1), django.db.models.functions.comparison.Coalesce('amount_to', -1), models.F('currency'), models.F('period'), models.F('contract_type'), django.db.models.functions.comparison.Coalesce(django.db.models.functions.comparison.Cast('is_gross', models.IntegerField()), -1), name='unique_salary'),
+        ),
+    ]
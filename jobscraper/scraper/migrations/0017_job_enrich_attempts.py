@@ -0,0 +1,23 @@
+# Generated by Django 4.2.2 on 2026-10-19 01:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0016_salary_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='enrich_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='enrich_next_attempt_at',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Cast, Coalesce
 
 class HypeStatus(models.IntegerChoices):
     UNKNOWN = 0  # special case
@@ -11,6 +12,30 @@ class JobBoard(models.IntegerChoices):
     JUST_JOIN_IT = 2
     PRACUJ = 3
 
+class SalaryPeriod(models.TextChoices):
+    HOUR = 'hour'
+    DAY = 'day'
+    MONTH = 'month'
+    YEAR = 'year'
+
+class ContractType(models.TextChoices):
+    UNKNOWN = ''
+    UOP = 'uop', 'Umowa o pracę'
+    B2B = 'b2b', 'B2B'
+    UZ = 'uz', 'Umowa zlecenie'
+    UOD = 'uod', 'Umowa o dzieło'
+
+class RunStatus(models.IntegerChoices):
+    RUNNING = 0
+    SUCCEEDED = 1
+    FAILED = 2
+
+class WorkItemState(models.IntegerChoices):
+    PENDING = 0
+    IN_PROGRESS = 1
+    DONE = 2
+    FAILED = 3
+
 class CompanyManager(models.Manager):
     def get_possible_match(self, name: str) -> models.QuerySet:
         """There are different company names on different boards."""
@@ -38,7 +63,9 @@ class CompanyManager(models.Manager):
             # Update company if needed
             if company.url != url:
                 company.url = url
-                company.save(update_fields=['url'])
+                # The new profile page is fetched on the next enrichment run
+                company.last_enriched_at = None
+                company.save(update_fields=['url', 'last_enriched_at'])
             return company
         # if 0 or more than 1 possible matches, we create a new company
         # if there's more than 1, we can't be sure that this is the same one,
@@ -56,6 +83,9 @@ class Company(models.Model):
     size_to = models.IntegerField(default=0)
     url = models.CharField(max_length=1024, blank=True)
     status = models.IntegerField(choices=HypeStatus.choices, default=HypeStatus.UNKNOWN)
+    # When industry and size were read from the profile page at url
+    # (see scraper/enrichment.py); 0 sizes are unknown
+    last_enriched_at = models.DateTimeField(null=True, db_index=True)
     
     objects = CompanyManager()
 
@@ -64,6 +94,11 @@ class Company(models.Model):
         
     class Meta:
         db_table = 'grabbo_company'  # Use existing table
+        indexes = [
+            # Digest filters on company size
+            models.Index(fields=['size_from'], name='company_size_from_idx'),
+            models.Index(fields=['size_to'], name='company_size_to_idx'),
+        ]
 
 class Job(models.Model):
     board = models.IntegerField(choices=JobBoard.choices)
@@ -87,24 +122,295 @@ class Job(models.Model):
     status = models.IntegerField(choices=HypeStatus.choices, default=HypeStatus.UNKNOWN)
     created_at = models.DateTimeField(auto_now_add=True)
     lena_comparibility = models.FloatField(default=0.0)
+    # When description/requirements/responsibilities were fetched from the offer page
+    enriched_at = models.DateTimeField(null=True, db_index=True)
+    # Fetches of the offer page so far; one that fails is retried after
+    # enrich_next_attempt_at, until ENRICH_MAX_ATTEMPTS (see scraper/enrichment.py)
+    enrich_attempts = models.PositiveSmallIntegerField(default=0)
+    enrich_next_attempt_at = models.DateTimeField(null=True)
+    # When lena_comparibility was computed; cleared when the text changes
+    scored_at = models.DateTimeField(null=True, db_index=True)
+    # First job of the group of near-duplicate offers this one belongs to,
+    # itself if it is the first (see scraper/dedup.py). Not a constraint, so
+    # the id stays when the first job is archived.
+    cluster = models.ForeignKey(
+        'self', on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='duplicates',
+    )
+    # Hash of the offer as last scraped (see scraper/ingest.py), to spot edits
+    # without comparing every field
+    content_hash = models.CharField(max_length=32, default='')
+    # When an email with this offer was delivered; offers still waiting have
+    # NULL here and are found through job_digest_pending_idx
+    digest_sent_at = models.DateTimeField(null=True)
 
     def __str__(self) -> str:
         return f'{self.title} in {self.company}'
         
     class Meta:
         db_table = 'grabbo_job'
+        indexes = [
+            models.Index(fields=['board', 'original_id'], name='job_board_original_id_idx'),
+            # Only offers not sent yet, so the digest's cost follows them
+            # rather than the size of the table
+            models.Index(
+                fields=['created_at'], condition=models.Q(digest_sent_at__isnull=True),
+                name='job_digest_pending_idx',
+            ),
+        ]
 
 class Category(models.Model):
     # Minimal implementation
     class Meta:
         db_table = 'grabbo_category'
 
+class SalaryManager(models.Manager):
+    def get_for_parsed(self, parsed):
+        """
+        Return the row for a ParsedSalary, creating it if needed.
+
+        Amounts are stored rounded to whole units, so "30,50–40,50 zł / godz."
+        is kept as 30–40; the monthly amounts are computed before rounding.
+        """
+        # Imported here because salary.py has no Django dependencies
+        from scraper.salary import monthly
+
+        def rounded(amount):
+            return round(amount) if amount is not None else None
+
+        # Two processes may create the same salary at once; unique_salary makes
+        # one of them fail, and get_or_create then returns the other's row
+        salary, _ = self.get_or_create(
+            amount_from=rounded(parsed.amount_from),
+            amount_to=rounded(parsed.amount_to),
+            currency=parsed.currency,
+            period=parsed.period,
+            contract_type=parsed.contract_type,
+            is_gross=parsed.is_gross,
+            defaults={
+                'monthly_from': rounded(monthly(parsed.amount_from, parsed.period)),
+                'monthly_to': rounded(monthly(parsed.amount_to, parsed.period)),
+            },
+        )
+        return salary
+
 class Salary(models.Model):
-    # Minimal implementation
+    """A distinct salary offer, shared by every job advertising the same one."""
+    # Whole units, rounded by SalaryManager.get_for_parsed
+    amount_from = models.IntegerField(null=True)
+    amount_to = models.IntegerField(null=True)
+    currency = models.CharField(max_length=10, default='PLN')
+    period = models.CharField(max_length=8, choices=SalaryPeriod.choices, default=SalaryPeriod.MONTH)
+    contract_type = models.CharField(max_length=8, choices=ContractType.choices, blank=True)
+    is_gross = models.BooleanField(null=True)
+    # Amounts converted to a monthly rate, for comparing salaries paid per hour/day/year
+    monthly_from = models.IntegerField(null=True)
+    monthly_to = models.IntegerField(null=True)
+
+    objects = SalaryManager()
+
+    def __str__(self) -> str:
+        return f'{self.amount_from}-{self.amount_to} {self.currency} / {self.period}'
+
     class Meta:
         db_table = 'grabbo_salary'
+        constraints = [
+            # NULLs never conflict in a unique index, so unknown values are
+            # compared as -1 (amounts and monthly rates are never negative)
+            models.UniqueConstraint(
+                Coalesce('amount_from', -1),
+                Coalesce('amount_to', -1),
+                'currency',
+                'period',
+                'contract_type',
+                Coalesce(Cast('is_gross', models.IntegerField()), -1),
+                name='unique_salary',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['currency', 'monthly_to'], name='salary_monthly_to_idx'),
+            models.Index(fields=['currency', 'monthly_from'], name='salary_monthly_from_idx'),
+        ]
 
 class Technology(models.Model):
     # Minimal implementation
     class Meta:
         db_table = 'grabbo_technology'
+
+class SchedulerRun(models.Model):
+    """One scheduled slot of a run_scheduler job, shared by all replicas."""
+    job_name = models.CharField(max_length=64)
+    scheduled_for = models.DateTimeField()
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True)
+    status = models.IntegerField(choices=RunStatus.choices, default=RunStatus.RUNNING)
+    result = models.CharField(max_length=1024, blank=True)
+
+    def __str__(self) -> str:
+        return f'{self.job_name} at {self.scheduled_for}'
+
+    class Meta:
+        db_table = 'grabbo_scheduler_run'
+        constraints = [
+            models.UniqueConstraint(fields=['job_name', 'scheduled_for'], name='unique_scheduler_slot'),
+        ]
+
+class PageWorkItem(models.Model):
+    """One listing page (search URL + page number) to scrape within a run."""
+    run_key = models.CharField(max_length=64)
+    search_url = models.CharField(max_length=1024)
+    page_number = models.IntegerField()
+    # Last page to scrape for this search, None means until the listing ends
+    page_limit = models.IntegerField(null=True)
+    state = models.IntegerField(choices=WorkItemState.choices, default=WorkItemState.PENDING)
+    attempts = models.IntegerField(default=0)
+    lease_expires_at = models.DateTimeField(null=True)
+    jobs_added = models.IntegerField(default=0)
+    last_error = models.CharField(max_length=1024, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f'{self.search_url} page {self.page_number} ({self.run_key})'
+
+    class Meta:
+        db_table = 'grabbo_page_work_item'
+        constraints = [
+            models.UniqueConstraint(fields=['run_key', 'search_url', 'page_number'], name='unique_page_work_item'),
+        ]
+        indexes = [
+            models.Index(fields=['state', 'lease_expires_at'], name='page_work_item_claim_idx'),
+        ]
+
+class EmailOutbox(models.Model):
+    """An email waiting to be sent, or sent, by scraper.outbox.send_outbox."""
+    # Unique per email, e.g. the digest's day and batch, so queueing it again
+    # is a no-op; also its Message-ID, so receivers can drop resends
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    # Comma-separated addresses
+    recipients = models.TextField()
+    state = models.IntegerField(choices=WorkItemState.choices, default=WorkItemState.PENDING)
+    attempts = models.IntegerField(default=0)
+    # Not sent before this, set after a failed attempt
+    next_attempt_at = models.DateTimeField(null=True)
+    lease_expires_at = models.DateTimeField(null=True)
+    last_error = models.CharField(max_length=1024, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True)
+    # Offers in the email, marked sent once it is delivered
+    jobs = models.ManyToManyField(Job, related_name='emails', db_table='grabbo_email_outbox_job')
+
+    def __str__(self) -> str:
+        return f'{self.subject} ({self.idempotency_key})'
+
+    class Meta:
+        db_table = 'grabbo_email_outbox'
+        indexes = [
+            models.Index(fields=['state', 'next_attempt_at'], name='email_outbox_claim_idx'),
+        ]
+
+class PageFingerprint(models.Model):
+    """Hash of a listing page's offers section as of the last time it was scraped."""
+    search_url = models.CharField(max_length=1024)
+    page_number = models.IntegerField()
+    fingerprint = models.CharField(max_length=64)
+    offers_found = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self) -> str:
+        return f'{self.search_url} page {self.page_number}'
+
+    class Meta:
+        db_table = 'grabbo_page_fingerprint'
+        constraints = [
+            models.UniqueConstraint(fields=['search_url', 'page_number'], name='unique_page_fingerprint'),
+        ]
+
+
+class JobSignature(models.Model):
+    """MinHash signature of a job's company, title and seniority."""
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    minhash = models.BinaryField()
+
+    class Meta:
+        db_table = 'grabbo_job_signature'
+
+class JobLshBucket(models.Model):
+    """Locality-sensitive hash bucket of one band of a job's signature."""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='lsh_buckets')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        db_table = 'grabbo_job_lsh_bucket'
+        indexes = [
+            models.Index(fields=['bucket', 'band'], name='lsh_bucket_band_idx'),
+        ]
+
+class JobRevision(models.Model):
+    """Scraped fields of a job before the offer was edited, only those that changed."""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='revisions')
+    changed_at = models.DateTimeField(auto_now_add=True)
+    # Field name -> old value, ids for companies and salaries
+    changes = models.JSONField()
+
+    class Meta:
+        db_table = 'grabbo_job_revision'
+
+class ArchivedJob(models.Model):
+    """
+    A job moved out of grabbo_job by archive_jobs, with its company and
+    salary flattened. On Postgres the table is partitioned by month of
+    created_at (see scraper/retention.py).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    board = models.IntegerField(choices=JobBoard.choices)
+    original_id = models.CharField(max_length=256)
+    title = models.CharField(max_length=256)
+    url = models.CharField(max_length=256)
+    company_name = models.CharField(max_length=255)
+    seniority = models.CharField(max_length=256)
+    salary_text = models.CharField(max_length=256)
+    salary_id = models.BigIntegerField(null=True)
+    description = models.TextField()
+    requirements = models.TextField()
+    responsibilities = models.TextField()
+    status = models.IntegerField(choices=HypeStatus.choices, default=HypeStatus.UNKNOWN)
+    lena_comparibility = models.FloatField(default=0.0)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f'{self.title} in {self.company_name}'
+
+    class Meta:
+        db_table = 'grabbo_job_archive'
+        indexes = [
+            models.Index(fields=['board', 'original_id'], name='job_archive_original_id_idx'),
+        ]
+
+class ArchivedJobKey(models.Model):
+    """64-bit hash of the (board, original_id) of an archived job, so it isn't downloaded again."""
+    board = models.SmallIntegerField(choices=JobBoard.choices)
+    key = models.BigIntegerField()
+
+    class Meta:
+        db_table = 'grabbo_job_archive_key'
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'key'], name='unique_archived_job_key'),
+        ]
+
+class CacheGeneration(models.Model):
+    """
+    Counter bumped whenever data behind a cache changes (see scraper/api.py).
+    Kept in the database so every process sees the bump, whatever the cache.
+    """
+    name = models.CharField(max_length=64, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'{self.name} {self.value}'
+
+    class Meta:
+        db_table = 'grabbo_cache_generation'
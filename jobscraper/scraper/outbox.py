@@ -0,0 +1,190 @@
+import datetime
+import hashlib
+import logging
+import smtplib
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.utils import DNS_NAME
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from scraper.models import EmailOutbox, Job, WorkItemState
+from scraper.throttle import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(idempotency_key, subject, body, recipients, job_ids=()):
+    """
+    Queue an email for send_outbox.
+
+    Call it inside the transaction that decided to send the email, so the
+    email is queued if and only if that transaction commits.
+
+    Args:
+        idempotency_key (str): Unique per email; an email already queued
+            under the key is left as it is, unless sending it failed for good,
+            in which case it is queued again with the new content
+        recipients (list): Addresses
+        job_ids (list, optional): Offers in the email, marked sent with it
+
+    Returns:
+        bool: Whether the email was queued, False if it already was
+    """
+    content = {'subject': subject[:255], 'body': body, 'recipients': ','.join(recipients)}
+    item, created = EmailOutbox.objects.get_or_create(idempotency_key=idempotency_key, defaults=content)
+    if created:
+        if job_ids:
+            item.jobs.add(*job_ids)
+        return True
+
+    requeued = (
+        EmailOutbox.objects
+        .filter(pk=item.pk, state=WorkItemState.FAILED)
+        .update(state=WorkItemState.PENDING, attempts=0, next_attempt_at=None, **content)
+    )
+    if not requeued:
+        return False
+    logger.info(f"Queueing email {item} again after it failed")
+    item.jobs.set(job_ids)
+    return True
+
+
+def message_id(idempotency_key):
+    """Message-ID header of an email, the same on every attempt to send it."""
+    digest = hashlib.sha256(idempotency_key.encode('utf-8')).hexdigest()[:32]
+    return f'<{digest}@{DNS_NAME}>'
+
+
+def claim_batch(limit):
+    """
+    Lease up to `limit` emails due for sending, oldest first.
+
+    Like work_queue.claim_item: rows locked by other senders are skipped,
+    and emails whose sender let the lease expire are claimable again.
+    """
+    now = timezone.now()
+    claimable = (
+        EmailOutbox.objects
+        .select_for_update(skip_locked=True)
+        .filter(
+            Q(state=WorkItemState.PENDING, next_attempt_at__isnull=True)
+            | Q(state=WorkItemState.PENDING, next_attempt_at__lte=now)
+            | Q(state=WorkItemState.IN_PROGRESS, lease_expires_at__lt=now)
+        )
+        .order_by('id')
+    )
+
+    with transaction.atomic():
+        items = list(claimable[:limit])
+        for item in items:
+            item.state = WorkItemState.IN_PROGRESS
+            item.attempts += 1
+            item.lease_expires_at = now + datetime.timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+        EmailOutbox.objects.bulk_update(items, ['state', 'attempts', 'lease_expires_at'])
+    return items
+
+
+def _renew_lease(item):
+    """
+    Extend the lease on an email about to be sent.
+
+    Returns:
+        bool: False if the lease ran out and another sender claimed the
+        email meanwhile; it must then be left to that sender
+    """
+    lease_expires_at = timezone.now() + datetime.timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+    # Every claim counts an attempt, so the attempts tell whether it was claimed again
+    renewed = (
+        EmailOutbox.objects
+        .filter(pk=item.pk, state=WorkItemState.IN_PROGRESS, attempts=item.attempts)
+        .update(lease_expires_at=lease_expires_at)
+    )
+    item.lease_expires_at = lease_expires_at
+    return bool(renewed)
+
+
+def _fail(item, error):
+    """Schedule another attempt with backoff, or give up once out of attempts."""
+    if item.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        item.state = WorkItemState.FAILED
+        logger.error(f"Giving up on email {item} after {item.attempts} attempts: {error}")
+    else:
+        item.state = WorkItemState.PENDING
+        # At least a minute, so the same run doesn't claim it again
+        item.next_attempt_at = timezone.now() + datetime.timedelta(
+            seconds=60 + backoff_delay(item.attempts - 1, base=60, cap=3600)
+        )
+        logger.warning(f"Could not send email {item}, retrying at {item.next_attempt_at}: {error}")
+    item.lease_expires_at = None
+    item.last_error = str(error)[:1024]
+    item.save(update_fields=['state', 'next_attempt_at', 'lease_expires_at', 'last_error'])
+
+
+def send_outbox(batch_size=None, connection=None):
+    """
+    Send the queued emails that are due, until none are left.
+
+    One SMTP connection is opened for all of them and reopened only after
+    a failure. The lease on each email is renewed just before it is sent,
+    so a slow batch can't let it go to another sender mid-way. A failed email is retried by a later run with exponential
+    backoff, up to EMAIL_OUTBOX_MAX_ATTEMPTS attempts. Every attempt has
+    the same Message-ID, so a resend after a crash between sending and
+    marking the email sent can be recognized by receivers.
+
+    Args:
+        batch_size (int, optional): Emails claimed at once (default: EMAIL_OUTBOX_BATCH)
+        connection (optional): Mail backend to use (default: EMAIL_BACKEND)
+
+    Returns:
+        int: Number of emails sent
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH
+    connection = connection or get_connection()
+    sent = 0
+    try:
+        while True:
+            items = claim_batch(batch_size)
+            if not items:
+                break
+            for item in items:
+                # The emails before it may have taken most of the lease
+                if not _renew_lease(item):
+                    logger.warning(f"Lease on email {item} expired before it was sent, leaving it to its new sender")
+                    continue
+                message = EmailMessage(
+                    item.subject,
+                    body=item.body,
+                    to=item.recipients.split(','),
+                    headers={'Message-ID': message_id(item.idempotency_key)},
+                    connection=connection,
+                )
+                message.content_subtype = 'html'
+                try:
+                    # Opens the connection the first time and after a failure,
+                    # otherwise it's kept open for the next email
+                    connection.open()
+                    message.send()
+                except (smtplib.SMTPException, OSError, ValueError) as e:
+                    # ValueError: an address Django can't use
+                    _fail(item, e)
+                    # The connection may be unusable
+                    connection.close()
+                    continue
+
+                with transaction.atomic():
+                    item.state = WorkItemState.DONE
+                    item.sent_at = timezone.now()
+                    item.lease_expires_at = None
+                    item.save(update_fields=['state', 'sent_at', 'lease_expires_at'])
+                    # One update for all the offers in the email
+                    Job.objects.filter(emails=item).update(digest_sent_at=item.sent_at)
+                sent += 1
+    finally:
+        connection.close()
+
+    if sent:
+        logger.info(f"Sent {sent} queued emails")
+    return sent
@@ -0,0 +1,203 @@
+import datetime
+import json
+import logging
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+import zstandard
+from django.conf import settings
+
+from scraper.ingest import JobIngestor
+
+logger = logging.getLogger(__name__)
+
+# Where a page is in its segment, one JSON line per page in the .idx file
+PageEntry = namedtuple('PageEntry', ['search_url', 'page_number', 'fetched_at', 'offset', 'length'])
+
+SEGMENT_SUFFIX = '.zst'
+INDEX_SUFFIX = '.idx'
+
+
+class PageArchive:
+    """
+    An append-only segment of listing pages.
+
+    Every page is its own zstd frame in the .zst file, and its offset and
+    length go to the .idx file next to it, so any page can be read without
+    decompressing the ones before it. A crash can leave a partial frame at
+    the end, but never an index entry pointing at one.
+    """
+
+    def __init__(self, path, level=None):
+        self.path = Path(path)
+        self.index_path = self.path.with_suffix(INDEX_SUFFIX)
+        self.pages = 0
+        self._compressor = zstandard.ZstdCompressor(level=level or settings.PAGE_ARCHIVE_LEVEL)
+        self._data = open(self.path, 'ab')
+        self._index = open(self.index_path, 'a', encoding='utf-8')
+
+    def append(self, search_url, page_number, content):
+        frame = self._compressor.compress(content.encode('utf-8'))
+        offset = self._data.tell()
+        self._data.write(frame)
+        self._data.flush()
+
+        entry = PageEntry(search_url, page_number, datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                          offset, len(frame))
+        self._index.write(json.dumps(entry._asdict()) + '\n')
+        self._index.flush()
+        self.pages += 1
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_segment(directory=None):
+    """
+    Start the segment of a scraper run.
+
+    Returns:
+        PageArchive or None: None when PAGE_ARCHIVE_DIR is empty
+    """
+    directory = directory or settings.PAGE_ARCHIVE_DIR
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    # Several workers can share a run, each gets its own segment
+    name = f'pages-{datetime.datetime.now(datetime.timezone.utc):%Y%m%dT%H%M%S}-{os.getpid()}'
+    return PageArchive(Path(directory) / (name + SEGMENT_SUFFIX))
+
+
+def list_segments(directory=None, since=None):
+    """
+    Segments in the order they were written.
+
+    Args:
+        since (date, optional): Leave out segments started before this day
+    """
+    directory = Path(directory or settings.PAGE_ARCHIVE_DIR)
+    segments = sorted(path for path in directory.glob(f'pages-*{SEGMENT_SUFFIX}')
+                      if path.with_suffix(INDEX_SUFFIX).exists())
+    if since:
+        # pages-YYYYmmddTHHMMSS-pid.zst
+        segments = [path for path in segments if path.name[6:14] >= f'{since:%Y%m%d}']
+    return segments
+
+
+def prune_segments(directory=None, days=None):
+    """
+    Delete segments started more than `days` days ago, with their indexes.
+
+    Args:
+        directory (str, optional): Archive directory (default: PAGE_ARCHIVE_DIR)
+        days (int, optional): Age in days (default: PAGE_ARCHIVE_KEEP_DAYS), 0 keeps every segment
+
+    Returns:
+        int: Number of segments deleted
+    """
+    directory = directory or settings.PAGE_ARCHIVE_DIR
+    if days is None:
+        days = settings.PAGE_ARCHIVE_KEEP_DAYS
+    if not directory or not days or not Path(directory).is_dir():
+        return 0
+
+    cutoff = f'{datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days):%Y%m%d}'
+    deleted = 0
+    # Also segments whose index was never written
+    for path in sorted(Path(directory).glob(f'pages-*{SEGMENT_SUFFIX}')):
+        if path.name[6:14] >= cutoff:
+            continue
+        path.unlink()
+        path.with_suffix(INDEX_SUFFIX).unlink(missing_ok=True)
+        deleted += 1
+    if deleted:
+        logger.info(f"Deleted {deleted} archived page segments started before {cutoff}")
+    return deleted
+
+
+def read_index(path):
+    """Index entries of a segment, without a partially written last line."""
+    entries = []
+    with open(Path(path).with_suffix(INDEX_SUFFIX), encoding='utf-8') as f:
+        for line in f:
+            try:
+                entries.append(PageEntry(**json.loads(line)))
+            except (ValueError, TypeError):
+                logger.warning(f"Skipping a damaged index entry in {path}")
+    return entries
+
+
+def read_pages(path):
+    """Yield (PageEntry, page HTML) for every indexed page of a segment."""
+    decompressor = zstandard.ZstdDecompressor()
+    with open(path, 'rb') as f:
+        for entry in read_index(path):
+            f.seek(entry.offset)
+            yield entry, decompressor.decompress(f.read(entry.length)).decode('utf-8')
+
+
+def extract_segment(path):
+    """
+    Run the current parser over every page of a segment.
+
+    Returns:
+        tuple: (pages read, the latest JobRecord of every offer in the segment)
+    """
+    # The downloader writes the archive, so importing it at the top would be circular
+    from scraper.job_downloader import parse_listing
+
+    pages = 0
+    records = {}
+    for _, content in read_pages(path):
+        pages += 1
+        for record in parse_listing(content)[1]:
+            records[(record.board, record.original_id)] = record
+    return pages, list(records.values())
+
+
+def reextract_jobs(directory=None, since=None, workers=None, dry_run=False):
+    """
+    Re-read archived listing pages with the current parser and fix saved jobs.
+
+    Segments are parsed in parallel processes; the database is only touched
+    from this one, with a bulk update of the jobs whose fields changed.
+
+    Args:
+        directory (str, optional): Archive directory (default: PAGE_ARCHIVE_DIR)
+        since (date, optional): Only segments started on or after this day
+        workers (int, optional): Parser processes (default: one per CPU)
+        dry_run (bool): Parse and report without updating anything
+
+    Returns:
+        dict: Counts of segments, pages, offers and jobs updated
+    """
+    segments = list_segments(directory, since)
+    stats = {'segments': len(segments), 'pages': 0, 'offers': 0, 'updated': 0}
+    if not segments:
+        return stats
+
+    # Workers only parse, they never use the database connections they inherit
+    records = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=django.setup) as executor:
+        # In segment order, so offers seen again later win over older copies
+        for pages, segment_records in executor.map(extract_segment, segments):
+            stats['pages'] += pages
+            records.extend(segment_records)
+
+    latest = {(record.board, record.original_id): record for record in records}
+    stats['offers'] = len(latest)
+    if not dry_run:
+        stats['updated'] = len(JobIngestor().update(list(latest.values())))
+    logger.info(f"Re-extracted {stats['offers']} offers from {stats['pages']} archived pages, "
+                f"updated {stats['updated']} jobs")
+    return stats
@@ -0,0 +1,61 @@
+import datetime
+import hashlib
+import re
+
+from django.conf import settings
+from django.utils import timezone
+
+from scraper.models import PageFingerprint
+
+
+# Offer ids and links in a listing's HTML. The markup around them changes
+# between visits (tracking parameters, ads, layout experiments) while the
+# offers don't.
+_OFFER_KEY = re.compile(r'data-test-offerid="([^"]*)"|href="([^"?#]*)')
+
+
+def fingerprint(content: str) -> str:
+    """SHA-256 of the offer ids and links (without query strings) of the offers section, in page order."""
+    keys = [offer_id or link for offer_id, link in _OFFER_KEY.findall(content)]
+    return hashlib.sha256('\n'.join(keys).encode('utf-8')).hexdigest()
+
+
+def _cutoff():
+    return timezone.now() - datetime.timedelta(hours=settings.SCRAPER_PAGE_CACHE_TTL_HOURS)
+
+
+def lookup(search_url, page_number, page_fingerprint):
+    """
+    Number of offers on the page if it is unchanged since it was last scraped.
+
+    Returns:
+        int or None: Offers found last time, or None if the page changed,
+        was never scraped or its fingerprint expired
+    """
+    cached = (
+        PageFingerprint.objects
+        .filter(
+            search_url=search_url,
+            page_number=page_number,
+            fingerprint=page_fingerprint,
+            updated_at__gte=_cutoff(),
+        )
+        .values_list('offers_found', flat=True)
+        .first()
+    )
+    return cached
+
+
+def store(search_url, page_number, page_fingerprint, offers_found):
+    """Remember the fingerprint of a page whose every offer was saved."""
+    PageFingerprint.objects.update_or_create(
+        search_url=search_url,
+        page_number=page_number,
+        defaults={'fingerprint': page_fingerprint, 'offers_found': offers_found},
+    )
+
+
+def evict_expired():
+    """Delete fingerprints older than the TTL."""
+    deleted, _ = PageFingerprint.objects.filter(updated_at__lt=_cutoff()).delete()
+    return deleted
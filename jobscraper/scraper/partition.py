@@ -0,0 +1,134 @@
+import logging
+from collections import namedtuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# How big a search is: its listing pages and the offers on them
+SearchSize = namedtuple('SearchSize', ['pages', 'offers'])
+
+# Query parameters holding comma-separated filter values on pracuj.pl:
+# experience levels, work modes and categories. A search with several values
+# is the union of the searches with one value each.
+SPLITTABLE_PARAMS = ['et', 'wm', 'cc']
+
+
+def parse_facets(text):
+    """
+    Read facets in the form of SCRAPER_PARTITION_FACETS.
+
+    Returns:
+        dict: Parameter -> list of values, e.g. "wm=hybrid,home-office;et=1,3"
+        gives {'wm': ['hybrid', 'home-office'], 'et': ['1', '3']}
+    """
+    facets = {}
+    for part in text.split(';'):
+        name, _, values = part.partition('=')
+        if name.strip() and values.strip():
+            facets[name.strip()] = [value.strip() for value in values.split(',') if value.strip()]
+    return facets
+
+
+def with_param(url, name, value):
+    """The URL with query parameter `name` set to `value`, keeping the others in order."""
+    parts = urlsplit(url)
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    if any(key == name for key, _ in params):
+        params = [(key, value if key == name else current) for key, current in params]
+    else:
+        params.append((name, value))
+    return urlunsplit(parts._replace(query=urlencode(params)))
+
+
+def has_facet(url, name):
+    """Whether the search already filters on `name`, in the query or in the path (";wm,home-office")."""
+    parts = urlsplit(url)
+    return (any(key == name for key, _ in parse_qsl(parts.query))
+            or f';{name},' in parts.path)
+
+
+def split_search(url, facets):
+    """
+    Sub-searches that together cover the search.
+
+    A parameter with several values is split into one search per value. A
+    search with single values only is split on the first facet it doesn't
+    filter on yet. Offers matching several values appear in several
+    sub-searches; the ingest skips them after the first.
+
+    Returns:
+        list or None: Sub-search URLs, or None if there is nothing left to split on
+    """
+    params = dict(parse_qsl(urlsplit(url).query))
+    for name in SPLITTABLE_PARAMS:
+        values = [value for value in params.get(name, '').split(',') if value]
+        if len(values) > 1:
+            return [with_param(url, name, value) for value in values]
+
+    for name, values in facets.items():
+        if not has_facet(url, name):
+            return [with_param(url, name, value) for value in values]
+    return None
+
+
+async def plan_partitions(url, count_searches, page_budget=None, facets=None, max_depth=3):
+    """
+    Split a search until every part has at most `page_budget` listing pages.
+
+    Sub-searches are counted a level at a time with `count_searches`. A split
+    whose parts have fewer offers than the search is not exhaustive (e.g. an
+    offer without any work mode) and is not used, so no offers are lost.
+    Offers are compared rather than pages, which are rounded up and would
+    hide a few missing offers.
+
+    Args:
+        url (str): Search URL without the page number
+        count_searches: Coroutine function taking URLs and returning their
+            SearchSize, None where a search couldn't be counted
+        page_budget (int, optional): Default SCRAPER_PARTITION_PAGE_BUDGET
+        facets (dict, optional): Facets to add, default SCRAPER_PARTITION_FACETS
+        max_depth (int): Maximum number of successive splits
+
+    Returns:
+        list: (search URL, listing pages or None) of the parts, the search
+        itself if it is within budget or can't be split
+    """
+    page_budget = page_budget or settings.SCRAPER_PARTITION_PAGE_BUDGET
+    if facets is None:
+        facets = parse_facets(settings.SCRAPER_PARTITION_FACETS)
+
+    [size] = await count_searches([url])
+    partitions = []
+    frontier = [(url, size)]
+    for _ in range(max_depth):
+        splits = []
+        for search, search_size in frontier:
+            over_budget = search_size is not None and search_size.pages > page_budget
+            children = split_search(search, facets) if over_budget else None
+            if children:
+                splits.append((search, search_size, children))
+            else:
+                partitions.append((search, search_size))
+        if not splits:
+            frontier = []
+            break
+
+        sizes = iter(await count_searches([child for _, _, children in splits for child in children]))
+        frontier = []
+        for search, search_size, children in splits:
+            child_sizes = [next(sizes) for _ in children]
+            if None in child_sizes or sum(child.offers for child in child_sizes) < search_size.offers:
+                logger.warning(f"Sub-searches of {search} don't cover it "
+                               f"({[child and child.offers for child in child_sizes]} offers "
+                               f"for {search_size.offers}), keeping it whole")
+                partitions.append((search, search_size))
+                continue
+            frontier.extend(zip(children, child_sizes))
+    partitions.extend(frontier)
+
+    # Parts without offers need no scraping, but keep the search if all are empty
+    non_empty = [(search, search_size.pages if search_size else None)
+                 for search, search_size in partitions if search_size is None or search_size.offers]
+    return non_empty or [(url, size.pages if size else None)]
@@ -0,0 +1,155 @@
+import asyncio
+import bisect
+import logging
+import math
+from collections import deque
+
+from django.conf import settings
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency histogram buckets, in seconds
+BUCKETS = [0.25, 0.5, 1, 2, 5, 10, 20, math.inf]
+
+# Ready when the offers section holds enough offers, or when the page has
+# finished loading with fewer (the last page of a search)
+OFFERS_READY_SCRIPT = """([selector, minOffers]) => {
+    const section = document.querySelector(selector);
+    if (!section) return false;
+    return section.children.length >= minOffers || document.readyState === 'complete';
+}"""
+
+
+class LatencyHistogram:
+    """
+    Latencies of one stage of fetching a page.
+
+    Bucket counts cover the current run, see reset(); percentiles come from
+    the last `window` samples whatever the run, so timeouts adapt across runs.
+    """
+
+    def __init__(self, window=500):
+        self.counts = [0] * len(BUCKETS)
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.samples.append(seconds)
+
+    def reset(self):
+        self.counts = [0] * len(BUCKETS)
+
+    def percentile(self, q):
+        """The q-th percentile (0-100) of the recent samples, None without any."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1)]
+
+    def summary(self):
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            'count': sum(self.counts),
+            'p50': round(p50, 3) if p50 is not None else None,
+            'p95': round(p95, 3) if p95 is not None else None,
+            'histogram': {
+                (f'<={bound:g}s' if bound != math.inf else f'>{BUCKETS[-2]:g}s'): count
+                for bound, count in zip(BUCKETS, self.counts)
+            },
+        }
+
+
+class PageTimings:
+    """
+    Per-stage page latencies and the timeouts derived from them.
+
+    A stage's timeout is its p95 latency times SCRAPER_TIMEOUT_P95_FACTOR,
+    kept between SCRAPER_TIMEOUT_MIN_SECONDS and the stage's ceiling. Until
+    SCRAPER_TIMEOUT_MIN_SAMPLES latencies are known, the ceiling is used.
+    """
+
+    # Stage -> timeout ceiling in seconds, None for the whole page which has no timeout
+    STAGES = {'navigate': 20, 'ready': 10, 'page': None}
+
+    def __init__(self):
+        self.stages = {stage: LatencyHistogram() for stage in self.STAGES}
+
+    def record(self, stage, seconds):
+        self.stages[stage].record(seconds)
+
+    def timeout(self, stage):
+        """Timeout of a stage in milliseconds, as Playwright takes it."""
+        ceiling = self.STAGES[stage]
+        histogram = self.stages[stage]
+        if len(histogram.samples) < settings.SCRAPER_TIMEOUT_MIN_SAMPLES:
+            return ceiling * 1000
+        adaptive = histogram.percentile(95) * settings.SCRAPER_TIMEOUT_P95_FACTOR
+        return max(settings.SCRAPER_TIMEOUT_MIN_SECONDS, min(ceiling, adaptive)) * 1000
+
+    def reset(self):
+        """Start the histograms of a new run, keeping the samples timeouts are based on."""
+        for histogram in self.stages.values():
+            histogram.reset()
+
+    def summary(self):
+        return {stage: histogram.summary() for stage, histogram in self.stages.items()}
+
+
+class OffersReadiness:
+    """A listing page is ready once its offers section holds min_offers offers."""
+
+    def __init__(self, offers_selector, min_offers):
+        self.offers_selector = offers_selector
+        self.min_offers = min_offers
+
+    def watch(self, page):
+        """
+        Start watching a page, before it navigates.
+
+        Returns:
+            Coroutine function taking a timeout in milliseconds, returning once
+            the page is ready and raising PlaywrightTimeoutError otherwise
+        """
+        async def ready(timeout):
+            await page.wait_for_function(
+                OFFERS_READY_SCRIPT, arg=[self.offers_selector, self.min_offers], timeout=timeout
+            )
+        return ready
+
+
+class ResponseReadiness:
+    """A listing page is ready once a response whose URL contains url_part has arrived, and its offers are shown."""
+
+    def __init__(self, offers_selector, url_part):
+        self.offers_selector = offers_selector
+        self.url_part = url_part
+
+    def watch(self, page):
+        arrived = asyncio.Event()
+
+        def on_response(response):
+            if self.url_part in response.url:
+                arrived.set()
+
+        page.on('response', on_response)
+
+        async def ready(timeout):
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            try:
+                await asyncio.wait_for(arrived.wait(), timeout / 1000)
+            except asyncio.TimeoutError:
+                raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded waiting for a response from {self.url_part}")
+            finally:
+                page.remove_listener('response', on_response)
+            remaining = max(1, timeout - (loop.time() - started) * 1000)
+            await page.wait_for_selector(self.offers_selector, timeout=remaining)
+        return ready
+
+
+def get_readiness(offers_selector):
+    """The readiness strategy configured by SCRAPER_READY_RESPONSE and SCRAPER_READY_MIN_OFFERS."""
+    if settings.SCRAPER_READY_RESPONSE:
+        return ResponseReadiness(offers_selector, settings.SCRAPER_READY_RESPONSE)
+    return OffersReadiness(offers_selector, settings.SCRAPER_READY_MIN_OFFERS)
@@ -0,0 +1,137 @@
+import datetime
+import gzip
+import hashlib
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from scraper import api
+from scraper.models import ArchivedJob, ArchivedJobKey, Job
+
+logger = logging.getLogger(__name__)
+
+
+def archive_key(original_id):
+    """Signed 64-bit hash of an original_id, as stored in ArchivedJobKey."""
+    digest = hashlib.blake2b(original_id.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def archived_ids(board, original_ids):
+    """The original_ids of a board that belong to archived jobs."""
+    keys = {archive_key(original_id): original_id for original_id in original_ids}
+    found = ArchivedJobKey.objects.filter(board=board, key__in=list(keys)).values_list('key', flat=True)
+    return {keys[key] for key in found}
+
+
+def _month_start(moment):
+    return datetime.datetime(moment.year, moment.month, 1, tzinfo=datetime.timezone.utc)
+
+
+def ensure_partitions(moments):
+    """Create the monthly Postgres partitions of grabbo_job_archive covering the given times."""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for start in sorted({_month_start(moment) for moment in moments}):
+            end = _month_start(start + datetime.timedelta(days=32))
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS grabbo_job_archive_y{start:%Y}m{start:%m} "
+                f"PARTITION OF grabbo_job_archive FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+
+
+def _archived_job(job, archived_at):
+    return ArchivedJob(
+        id=job.id,
+        board=job.board,
+        original_id=job.original_id,
+        title=job.title,
+        url=job.url,
+        company_name=job.company.name if job.company else '',
+        seniority=job.seniority,
+        salary_text=job.salary_text,
+        salary_id=job.salary_id,
+        description=job.description,
+        requirements=job.requirements,
+        responsibilities=job.responsibilities,
+        status=job.status,
+        lena_comparibility=job.lena_comparibility,
+        created_at=job.created_at,
+        archived_at=archived_at,
+    )
+
+
+def _write_files(directory, archived):
+    """Append archived jobs to gzipped JSON lines files, one per month created."""
+    by_month = {}
+    for job in archived:
+        by_month.setdefault(f'{job.created_at:%Y-%m}', []).append(job)
+
+    os.makedirs(directory, exist_ok=True)
+    for month, jobs in by_month.items():
+        # Every append adds a gzip member; readers see one continuous stream
+        with gzip.open(os.path.join(directory, f'jobs-{month}.jsonl.gz'), 'at', encoding='utf-8') as f:
+            for job in jobs:
+                row = {field.attname: getattr(job, field.attname) for field in ArchivedJob._meta.fields}
+                f.write(json.dumps(row, default=str) + '\n')
+
+
+def archive_jobs(days=None, batch_size=1000, directory=None):
+    """
+    Move jobs older than `days` out of grabbo_job.
+
+    Jobs go to the grabbo_job_archive table, or to gzipped JSON lines files
+    in `directory` if given, in batches of one transaction each. Their
+    (board, original_id) is kept in ArchivedJobKey so they aren't downloaded
+    again. Clustering data of the jobs is dropped with them.
+
+    Args:
+        days (int, optional): Age in days (default: ARCHIVE_AFTER_DAYS)
+        batch_size (int): Jobs moved per transaction
+        directory (str, optional): Write archive files here instead of the table
+
+    Returns:
+        int: Number of jobs archived
+    """
+    if days is None:
+        days = settings.ARCHIVE_AFTER_DAYS
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+    archived_count = 0
+
+    while True:
+        with transaction.atomic():
+            jobs = list(
+                Job.objects.filter(created_at__lt=cutoff)
+                .select_related('company')
+                .order_by('id')[:batch_size]
+            )
+            if not jobs:
+                break
+
+            archived_at = timezone.now()
+            archived = [_archived_job(job, archived_at) for job in jobs]
+            if directory:
+                # Written before the delete commits: a failed batch may end
+                # up in the files twice, but never in neither place
+                _write_files(directory, archived)
+            else:
+                ensure_partitions(job.created_at for job in jobs)
+                ArchivedJob.objects.bulk_create(archived, ignore_conflicts=True)
+            ArchivedJobKey.objects.bulk_create(
+                [ArchivedJobKey(board=job.board, key=archive_key(job.original_id)) for job in jobs],
+                ignore_conflicts=True,
+            )
+            Job.objects.filter(id__in=[job.id for job in jobs]).delete()
+
+        archived_count += len(jobs)
+        logger.info(f"Archived {archived_count} jobs created before {cutoff:%Y-%m-%d}")
+
+    if archived_count:
+        api.invalidate_cache()
+    return archived_count
@@ -0,0 +1,112 @@
+import contextlib
+import contextvars
+import logging
+import math
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Alias reads are routed to, None for the default
+_read_alias = contextvars.ContextVar('read_alias', default=None)
+
+
+class ReplicaRouter:
+    """
+    Routes reads inside replica_reads() to the REPLICA_DATABASE, and
+    everything else to the default database.
+
+    Reads elsewhere stay on the primary, so code that reads what it has just
+    written (the ingest, the work queue) always sees it.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Even for rows read from the replica, which Django would otherwise write back to
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both databases hold the same rows
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary, like its rows
+        if settings.REPLICA_DATABASE and db == settings.REPLICA_DATABASE:
+            return False
+        return None
+
+
+def _newest_job(alias):
+    from scraper.models import Job
+
+    return Job.objects.using(alias).order_by('-id').values_list('created_at', flat=True).first()
+
+
+def replica_lag(alias):
+    """
+    How far the replica is behind the primary, in seconds.
+
+    A Postgres streaming replica reports when it last replayed a
+    transaction. Other replicas (or a second local database standing in for
+    one) are compared by their newest job. That only sees missing inserts,
+    not updates, so it is a lower bound: a replica reported fresh may still
+    hold outdated rows. Callers that must not act on stale data (like the
+    digest, see send_digest) check it again on the primary.
+
+    Raises:
+        DatabaseError: If a database can't be queried
+    """
+    replica = connections[alias]
+    if replica.vendor == 'postgresql':
+        with replica.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_is_in_recovery(), CASE "
+                "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+            )
+            in_recovery, lag = cursor.fetchone()
+        if in_recovery:
+            return float(lag or 0)
+
+    primary_newest = _newest_job(DEFAULT_DB_ALIAS)
+    if primary_newest is None:
+        return 0.0
+    replica_newest = _newest_job(alias)
+    if replica_newest is None:
+        return math.inf
+    return max(0.0, (primary_newest - replica_newest).total_seconds())
+
+
+@contextlib.contextmanager
+def replica_reads():
+    """
+    Read from the replica in this block, if there is one and it's fresh.
+
+    It is used when REPLICA_DATABASE is set and no more than
+    REPLICA_MAX_LAG_SECONDS behind; otherwise, or if it can't be reached,
+    reads stay on the primary. Writes always go to the primary. Also
+    usable as a decorator.
+
+    Yields:
+        str: Alias reads go to
+    """
+    alias = settings.REPLICA_DATABASE or DEFAULT_DB_ALIAS
+    if alias != DEFAULT_DB_ALIAS:
+        try:
+            lag = replica_lag(alias)
+        except DatabaseError as e:
+            logger.warning(f"Replica {alias} unavailable, reading from the primary: {e}")
+            alias = DEFAULT_DB_ALIAS
+        else:
+            if lag > settings.REPLICA_MAX_LAG_SECONDS:
+                logger.warning(f"Replica {alias} is {lag:.0f}s behind, reading from the primary")
+                alias = DEFAULT_DB_ALIAS
+
+    token = _read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_alias.reset(token)
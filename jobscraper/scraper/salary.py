@@ -0,0 +1,123 @@
+import re
+from collections import namedtuple
+
+ParsedSalary = namedtuple(
+    'ParsedSalary',
+    ['amount_from', 'amount_to', 'currency', 'period', 'contract_type', 'is_gross'],
+)
+
+# Hours and days in a month, to compare rates paid per hour/day with monthly pay
+HOURS_PER_MONTH = 168
+DAYS_PER_MONTH = 21
+
+# Spaces and dots group thousands ("1 500", "1.500"); a comma or a dot before
+# one or two digits ("30,50", "30.50") starts the decimals
+NUMBER_RE = re.compile(r'(\d{1,3}(?:[ .]\d{3})+|\d+)(?:[,.](\d{1,2})(?!\d))?\s*(k\b|tys\.?)?')
+PERCENT_RE = re.compile(r'\d+(?:,\d+)?\s*%')
+RANGE_SEPARATOR_RE = re.compile(r'\s*[-–—]\s*')
+
+CURRENCIES = [
+    ('PLN', re.compile(r'zł|\bpln\b')),
+    ('EUR', re.compile(r'€|\beur\b')),
+    ('USD', re.compile(r'\$|\busd\b')),
+    ('GBP', re.compile(r'£|\bgbp\b')),
+    ('CHF', re.compile(r'\bchf\b')),
+]
+PERIODS = [
+    ('hour', re.compile(r'godz|/\s*h\b|\bh\b|hour')),
+    ('day', re.compile(r'dzie[nń]|dni|\bday\b|daily')),
+    ('year', re.compile(r'\brok|rocznie|year|annual')),
+    ('month', re.compile(r'mies|month|mc\b')),
+]
+CONTRACTS = [
+    ('b2b', re.compile(r'b2b|\+\s*vat|kontrakt')),
+    ('uop', re.compile(r'umowa o prac|\buop\b|employment')),
+    ('uz', re.compile(r'zlecenie|\buz\b|mandate')),
+    ('uod', re.compile(r'o dzieło|\buod\b|specific-task')),
+]
+
+
+def _to_number(match):
+    whole, fraction, multiplier = match.groups()
+    value = float(re.sub(r'[ .]', '', whole) + ('.' + fraction if fraction else ''))
+    if multiplier:
+        value *= 1000
+    return value
+
+
+def _first(patterns, text, default=''):
+    for name, pattern in patterns:
+        if pattern.search(text):
+            return name
+    return default
+
+
+def parse_salary(text):
+    """
+    Parse a salary text such as "5 000–7 000 zł brutto / mies.".
+
+    Returns:
+        ParsedSalary or None: None when the text contains no amount
+    """
+    if not text:
+        return None
+    # Thin and non-breaking spaces separate thousands on job boards
+    normalized = re.sub(r'[\u00a0\u2009\u202f]', ' ', text).lower()
+    normalized = RANGE_SEPARATOR_RE.sub(' - ', normalized)
+    # "23% VAT" and similar are not amounts
+    normalized = PERCENT_RE.sub('', normalized)
+
+    amounts = [_to_number(match) for match in NUMBER_RE.finditer(normalized)]
+    if not amounts:
+        return None
+
+    if len(amounts) >= 2:
+        amount_from, amount_to = sorted(amounts[:2])
+    elif re.search(r'\bdo\b|\bup to\b', normalized):
+        amount_from, amount_to = None, amounts[0]
+    elif re.search(r'\bod\b|\bfrom\b', normalized):
+        amount_from, amount_to = amounts[0], None
+    else:
+        amount_from = amount_to = amounts[0]
+
+    if 'brutto' in normalized or 'gross' in normalized:
+        is_gross = True
+    elif 'netto' in normalized or 'net' in normalized.split():
+        is_gross = False
+    else:
+        is_gross = None
+
+    return ParsedSalary(
+        amount_from=amount_from,
+        amount_to=amount_to,
+        currency=_first(CURRENCIES, normalized, default='PLN'),
+        period=_first(PERIODS, normalized, default='month'),
+        contract_type=_first(CONTRACTS, normalized),
+        is_gross=is_gross,
+    )
+
+
+def parse_salaries(texts):
+    """
+    Parse many salary texts at once.
+
+    Job boards reuse a small set of salary strings, so every distinct text is
+    parsed only once.
+
+    Returns:
+        dict: Text -> ParsedSalary or None
+    """
+    return {text: parse_salary(text) for text in set(texts)}
+
+
+def monthly(amount, period):
+    """Monthly equivalent of an amount paid per `period`."""
+    if amount is None:
+        return None
+    if period == 'hour':
+        return round(amount * HOURS_PER_MONTH)
+    if period == 'day':
+        return round(amount * DAYS_PER_MONTH)
+    if period == 'year':
+        return round(amount / 12)
+    return amount
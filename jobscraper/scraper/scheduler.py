@@ -0,0 +1,237 @@
+import datetime
+import logging
+import time
+import zlib
+from contextlib import ExitStack, contextmanager
+
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from scraper.models import RunStatus, SchedulerRun
+
+logger = logging.getLogger(__name__)
+
+
+class CronSchedule:
+    """
+    Standard five-field cron expression (minute hour day month weekday).
+
+    Supports `*`, numbers, ranges (`1-5`), lists (`1,15`) and steps (`*/10`,
+    `0-30/5`). Weekday 0 and 7 are both Sunday. As in cron, when both day of
+    month and weekday are restricted, a day matching either one is used; a
+    field starting with `*` (such as `*/2`) doesn't count as restricted.
+    """
+    FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+
+        parsed = [self._parse_field(field, low, high) for field, (low, high) in zip(fields, self.FIELD_RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # cron uses 0 and 7 for Sunday, Python's weekday() uses 6
+        self.weekdays = {(day - 1) % 7 for day in weekdays}
+        self.days_restricted = not fields[2].startswith('*')
+        self.weekdays_restricted = not fields[4].startswith('*')
+
+    @staticmethod
+    def _parse_field(field, low, high):
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step = part.split('/', 1)
+                step = int(step)
+                if step < 1:
+                    raise ValueError(f"Invalid step in cron field {field!r}")
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(value) for value in part.split('-', 1))
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field {field!r} out of range {low}-{high}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, day: datetime.datetime) -> bool:
+        day_ok = day.day in self.days
+        weekday_ok = day.weekday() in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment: datetime.datetime) -> datetime.datetime:
+        """Return the first matching minute strictly after `moment`."""
+        candidate = moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        # Four years always contain every valid day/month combination
+        limit = candidate + datetime.timedelta(days=4 * 366)
+
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year = candidate.year + candidate.month // 12
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + datetime.timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += datetime.timedelta(minutes=1)
+                continue
+            return candidate
+
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+    def __str__(self) -> str:
+        return self.expression
+
+
+@contextmanager
+def advisory_lock(name: str, wait: bool = False):
+    """
+    Try to take a session-level Postgres advisory lock named `name`.
+
+    Yields True if the lock was acquired and False if another process holds
+    it. With `wait`, blocks until the other process releases it instead. On
+    other databases there is only one worker, so it always yields True.
+    """
+    if connection.vendor != 'postgresql':
+        yield True
+        return
+
+    key = zlib.crc32(f'scraper:{name}'.encode())
+    with connection.cursor() as cursor:
+        if wait:
+            cursor.execute('SELECT pg_advisory_lock(%s)', [key])
+            acquired = True
+        else:
+            cursor.execute('SELECT pg_try_advisory_lock(%s)', [key])
+            acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [key])
+
+
+class Scheduler:
+    """
+    Runs jobs on cron schedules inside a single long-lived process.
+
+    Every scheduled slot is recorded in SchedulerRun under an advisory lock,
+    so when several replicas run the scheduler each slot runs only once.
+    """
+
+    def __init__(self, jobs: dict, poll_interval: int = 30, waits_for: dict = None):
+        """
+        Args:
+            jobs (dict): Job name -> (cron expression, callable)
+            poll_interval (int): Maximum number of seconds between checks
+            waits_for (dict, optional): Job name -> names of the jobs it must
+                not overlap with; it waits for them to finish in any worker
+        """
+        self.jobs = {name: (CronSchedule(cron), func) for name, (cron, func) in jobs.items()}
+        self.poll_interval = poll_interval
+        self.waits_for = waits_for or {}
+        now = timezone.now()
+        self.next_runs = {name: schedule.next_after(now) for name, (schedule, _) in self.jobs.items()}
+        # Job name -> when to try a due slot again whose lock was held
+        self.retry_at = {}
+
+    def run_forever(self):
+        for name, next_run in self.next_runs.items():
+            logger.info(f"Scheduled '{name}' ({self.jobs[name][0]}), next run at {next_run.isoformat()}")
+
+        while True:
+            self.run_pending()
+            due = min(max(next_run, self.retry_at.get(name, next_run)) for name, next_run in self.next_runs.items())
+            sleep_for = (due - timezone.now()).total_seconds()
+            time.sleep(min(max(sleep_for, 1), self.poll_interval))
+
+    def run_pending(self):
+        """
+        Run every job whose next slot is due, then compute its following slot.
+
+        A slot whose lock is held (by the same job in another worker, or by a
+        job waiting for it) is tried again every poll_interval until it can
+        run, or dropped once the job's following slot is due.
+        """
+        for name, (schedule, func) in self.jobs.items():
+            slot = self.next_runs[name]
+            now = timezone.now()
+            if slot > now or self.retry_at.get(name, slot) > now:
+                continue
+            if not self.run_job(name, func, slot):
+                if schedule.next_after(slot) > timezone.now():
+                    if name not in self.retry_at:
+                        logger.info(f"Job '{name}' for {slot.isoformat()} waits: its lock is held by "
+                                    f"{self._lock_holder(name)}")
+                    self.retry_at[name] = timezone.now() + datetime.timedelta(seconds=self.poll_interval)
+                    continue
+                logger.warning(f"Job '{name}' for {slot.isoformat()} dropped: its lock was held by "
+                               f"{self._lock_holder(name)} until the next slot")
+            self.retry_at.pop(name, None)
+            self.next_runs[name] = schedule.next_after(max(slot, timezone.now()))
+
+    def _lock_holder(self, name):
+        """Describe the running job that holds the lock of job `name`, as far as SchedulerRun tells."""
+        holders = [name] + [other for other, waited in self.waits_for.items() if name in waited]
+        run = (
+            SchedulerRun.objects
+            .filter(job_name__in=holders, status=RunStatus.RUNNING)
+            .order_by('-started_at')
+            .first()
+        )
+        if run is None:
+            return "another worker"
+        return f"'{run.job_name}' for {run.scheduled_for.isoformat()}, started at {run.started_at.isoformat()}"
+
+    def run_job(self, name, func, slot):
+        """
+        Run a slot of a job unless another worker has run it.
+
+        Returns:
+            bool: False if the job's lock is held and the slot should be tried again
+        """
+        # Drop connections the database closed while we were sleeping. This
+        # must happen before taking the lock, which lives on the connection.
+        close_old_connections()
+
+        with advisory_lock(name) as acquired:
+            if not acquired:
+                return False
+
+            try:
+                with transaction.atomic():
+                    run = SchedulerRun.objects.create(job_name=name, scheduled_for=slot)
+            except IntegrityError:
+                logger.info(f"Job '{name}' for {slot.isoformat()} already ran in another worker. Skipping.")
+                return True
+
+            logger.info(f"Running job '{name}' scheduled for {slot.isoformat()}")
+            try:
+                with ExitStack() as stack:
+                    # Held until the job ends, so the other jobs don't start meanwhile either
+                    for other in self.waits_for.get(name, ()):
+                        stack.enter_context(advisory_lock(other, wait=True))
+                    result = func()
+                run.status = RunStatus.SUCCEEDED
+                run.result = str(result)[:1024]
+                logger.info(f"Job '{name}' finished: {result}")
+            except Exception as e:
+                run.status = RunStatus.FAILED
+                run.result = str(e)[:1024]
+                logger.exception(f"Job '{name}' failed: {e}")
+            finally:
+                run.finished_at = timezone.now()
+                run.save(update_fields=['status', 'result', 'finished_at'])
+        return True
@@ -0,0 +1,156 @@
+import logging
+import math
+import re
+import time
+import zlib
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from scipy import sparse
+
+from scraper import api
+from scraper.models import Job
+from scraper.search import stem, unaccent
+
+logger = logging.getLogger(__name__)
+
+# Offers that look like any of these are scored below 0
+EXCLUDED_TERMS = [
+    'developer', 'programista', 'sprzedawca', 'handlowiec',
+    'software developer', 'technik', 'kucharz', 'kelner',
+    'księgowa', 'engineer', 'inżynier', 'sprzedaży',
+    'instruktor', 'telemarketing', 'call center'
+]
+
+# Hashed feature space; collisions are rare enough at this size to ignore
+N_FEATURES = 2 ** 18
+# Titles are repeated so they outweigh long descriptions
+TITLE_WEIGHT = 3
+# Recent jobs used to estimate how common each word is
+IDF_SAMPLE_SIZE = 2000
+SCORED_FIELDS = ['lena_comparibility', 'scored_at']
+TEXT_FIELDS = ['id', 'title', 'description', 'requirements', 'responsibilities']
+
+TOKEN_RE = re.compile(r'\w{2,}')
+
+
+@lru_cache(maxsize=100_000)
+def _column(word):
+    """Hashed feature of a word's unaccented stem, as used by the search index."""
+    return zlib.crc32(unaccent(stem(word)).encode()) % N_FEATURES
+
+
+def job_document(job):
+    return ' '.join([job.title] * TITLE_WEIGHT + [job.description, job.requirements, job.responsibilities])
+
+
+def count_matrix(documents):
+    """Sparse documents x features matrix of token counts."""
+    rows, columns = [], []
+    for row, document in enumerate(documents):
+        for word in TOKEN_RE.findall(document.lower()):
+            rows.append(row)
+            columns.append(_column(word))
+    counts = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float64), (rows, columns)),
+        shape=(len(documents), N_FEATURES),
+    )
+    counts.sum_duplicates()
+    return counts
+
+
+class RelevanceScorer:
+    """
+    Scores documents by TF-IDF cosine similarity to a profile document.
+
+    Every excluded term is a profile of its own; a document's score is its
+    similarity to the profile minus its highest similarity to an excluded
+    term, so scores range from -1 to 1.
+    """
+
+    def __init__(self, profile, excluded_terms=()):
+        self.profile = profile
+        self.excluded_terms = list(excluded_terms)
+        self.idf = None
+        self.profiles = None
+
+    def fit(self, documents):
+        """Estimate word weights from a sample of documents."""
+        counts = count_matrix(documents)
+        document_frequency = np.bincount(counts.indices, minlength=N_FEATURES)
+        n_documents = counts.shape[0]
+        self.idf = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+        # features x profiles, so scoring a batch is a single product
+        self.profiles = self.transform([self.profile] + self.excluded_terms).T.tocsr()
+        return self
+
+    def transform(self, documents):
+        """L2-normalized TF-IDF rows, with sublinear term frequencies."""
+        counts = count_matrix(documents)
+        counts.data = 1 + np.log(counts.data)
+        weighted = counts.multiply(self.idf).tocsr()
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms) @ weighted
+
+    def score(self, documents):
+        """
+        Returns:
+            numpy.ndarray: One score per document
+        """
+        if not documents:
+            return np.zeros(0)
+        similarities = (self.transform(documents) @ self.profiles).toarray()
+        scores = similarities[:, 0]
+        if self.excluded_terms:
+            scores = scores - similarities[:, 1:].max(axis=1)
+        return scores
+
+
+def get_scorer():
+    """Scorer for SCORING_PROFILE, fitted on the most recent jobs."""
+    sample = Job.objects.only(*TEXT_FIELDS).order_by('-id')[:IDF_SAMPLE_SIZE]
+    return RelevanceScorer(settings.SCORING_PROFILE, EXCLUDED_TERMS).fit(
+        [job_document(job) for job in sample]
+    )
+
+
+def score_jobs(rescore=False, chunk_size=5000):
+    """
+    Compute Job.lena_comparibility for jobs that haven't been scored yet.
+
+    Enrichment clears scored_at, so jobs are rescored once their
+    descriptions are known.
+
+    Args:
+        rescore (bool): Score every job, e.g. after changing SCORING_PROFILE
+        chunk_size (int): Jobs loaded and scored at a time
+
+    Returns:
+        int: Number of jobs scored
+    """
+    queryset = Job.objects.all() if rescore else Job.objects.filter(scored_at__isnull=True)
+    if not queryset.exists():
+        return 0
+
+    started = time.monotonic()
+    scorer = get_scorer()
+    scored = 0
+    last_id = 0
+    while True:
+        jobs = list(queryset.filter(id__gt=last_id).only(*TEXT_FIELDS).order_by('id')[:chunk_size])
+        if not jobs:
+            break
+        now = timezone.now()
+        for job, score in zip(jobs, scorer.score([job_document(job) for job in jobs])):
+            job.lena_comparibility = float(score)
+            job.scored_at = now
+        Job.objects.bulk_update(jobs, SCORED_FIELDS, batch_size=500)
+        scored += len(jobs)
+        last_id = jobs[-1].id
+
+    api.invalidate_cache()
+    logger.info(f"Scored {scored} jobs in {math.ceil((time.monotonic() - started) * 1000)} ms")
+    return scored
@@ -0,0 +1,197 @@
+import logging
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+from scraper.models import Job
+
+logger = logging.getLogger(__name__)
+
+# Polish inflection endings, longest first. Stripping them leaves a stem that
+# is matched as a prefix, so "analityka" also finds "analityk" and "analitykiem".
+POLISH_SUFFIXES = sorted([
+    'owie', 'ami', 'ach', 'ego', 'emu', 'ymi', 'imi', 'ych', 'ich', 'owi', 'iem', 'ów', 'om',
+    'em', 'ie', 'ia', 'iu', 'ą', 'ę', 'a', 'e', 'i', 'o', 'u', 'y',
+], key=len, reverse=True)
+MIN_STEM_LENGTH = 3
+
+SQLITE_TRIGGERS = {
+    'grabbo_job_fts_insert': """
+        CREATE TRIGGER IF NOT EXISTS grabbo_job_fts_insert AFTER INSERT ON grabbo_job BEGIN
+            INSERT INTO grabbo_job_fts(rowid, title, description, responsibilities, requirements)
+            VALUES (new.id, new.title, new.description, new.responsibilities, new.requirements);
+        END
+    """,
+    'grabbo_job_fts_delete': """
+        CREATE TRIGGER IF NOT EXISTS grabbo_job_fts_delete AFTER DELETE ON grabbo_job BEGIN
+            INSERT INTO grabbo_job_fts(grabbo_job_fts, rowid, title, description, responsibilities, requirements)
+            VALUES ('delete', old.id, old.title, old.description, old.responsibilities, old.requirements);
+        END
+    """,
+    'grabbo_job_fts_update': """
+        CREATE TRIGGER IF NOT EXISTS grabbo_job_fts_update
+        AFTER UPDATE OF title, description, responsibilities, requirements ON grabbo_job BEGIN
+            INSERT INTO grabbo_job_fts(grabbo_job_fts, rowid, title, description, responsibilities, requirements)
+            VALUES ('delete', old.id, old.title, old.description, old.responsibilities, old.requirements);
+            INSERT INTO grabbo_job_fts(rowid, title, description, responsibilities, requirements)
+            VALUES (new.id, new.title, new.description, new.responsibilities, new.requirements);
+        END
+    """,
+}
+
+
+def install_sqlite_triggers(using=connection):
+    """Create the triggers keeping grabbo_job_fts in sync, rebuilding it if any was missing."""
+    if using.vendor != 'sqlite':
+        return
+    with using.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='grabbo_job_fts'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='trigger' AND tbl_name='grabbo_job'")
+        existing = {row[0] for row in cursor.fetchall()}
+        if set(SQLITE_TRIGGERS) <= existing:
+            return
+
+        for sql in SQLITE_TRIGGERS.values():
+            cursor.execute(sql)
+        # Rows written while the triggers were missing are not indexed
+        cursor.execute("INSERT INTO grabbo_job_fts(grabbo_job_fts) VALUES ('rebuild')")
+
+
+def stem(word):
+    """Strip one Polish inflection ending from a lowercase word."""
+    for suffix in POLISH_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+    return word
+
+
+def unaccent(text):
+    # ł has no decomposition, so NFKD alone leaves it in place
+    text = text.replace('ł', 'l').replace('Ł', 'L')
+    return ''.join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+
+
+def query_terms(query):
+    """Unaccented stems of the words in a search query."""
+    words = re.findall(r'\w+', query.lower())
+    return [unaccent(stem(word)) for word in words]
+
+
+def _postgresql_query(terms):
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def _sqlite_query(terms):
+    return ' AND '.join(f'"{term}"*' for term in terms)
+
+
+def _search_postgresql(terms, limit, since):
+    tsquery = _postgresql_query(terms)
+    sql = (
+        "SELECT id, ts_rank_cd(search_vector, query) AS rank "
+        "FROM grabbo_job, to_tsquery('job_search', %s) query "
+        "WHERE search_vector @@ query"
+    )
+    params = [tsquery]
+    if since:
+        sql += " AND created_at >= %s"
+        params.append(since)
+    sql += " ORDER BY rank DESC, id DESC LIMIT %s"
+    params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _search_sqlite(terms, limit, since):
+    match = _sqlite_query(terms)
+    # bm25 is lower for better matches; title matches weigh the most
+    sql = (
+        "SELECT grabbo_job_fts.rowid, -bm25(grabbo_job_fts, 10.0, 3.0, 1.0, 1.0) AS rank "
+        "FROM grabbo_job_fts JOIN grabbo_job ON grabbo_job.id = grabbo_job_fts.rowid "
+        "WHERE grabbo_job_fts MATCH %s"
+    )
+    params = [match]
+    if since:
+        sql += " AND grabbo_job.created_at >= %s"
+        params.append(since)
+    sql += " ORDER BY rank DESC, grabbo_job_fts.rowid DESC LIMIT %s"
+    params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _search_fallback(terms, limit, since):
+    queryset = Job.objects.all()
+    for term in terms:
+        queryset = queryset.filter(title__icontains=term)
+    if since:
+        queryset = queryset.filter(created_at__gte=since)
+    return [(job_id, 1.0) for job_id in queryset.order_by('-id').values_list('id', flat=True)[:limit]]
+
+
+def filter_jobs(queryset, query):
+    """
+    Narrow a Job queryset to jobs matching a search query, keeping its order.
+
+    Unlike search_jobs this doesn't rank, so the result can be paginated by id.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return queryset
+    if connection.vendor == 'postgresql':
+        return queryset.filter(RawSQL(
+            "grabbo_job.search_vector @@ to_tsquery('job_search', %s)", [_postgresql_query(terms)],
+            output_field=BooleanField(),
+        ))
+    if connection.vendor == 'sqlite':
+        return queryset.filter(id__in=RawSQL(
+            "SELECT rowid FROM grabbo_job_fts WHERE grabbo_job_fts MATCH %s", [_sqlite_query(terms)],
+        ))
+    for term in terms:
+        queryset = queryset.filter(title__icontains=term)
+    return queryset
+
+
+def search_jobs(query, limit=20, since=None):
+    """
+    Full-text search over job titles, descriptions, responsibilities and requirements.
+
+    Every word of the query must match, in any inflected form and with or
+    without Polish diacritics. Title matches rank highest.
+
+    Args:
+        query (str): Words to search for
+        limit (int): Maximum number of results
+        since (datetime, optional): Only jobs created at or after this time
+
+    Returns:
+        list: Jobs (with company loaded) ordered by relevance, each with a `rank` attribute
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor == 'postgresql':
+        ranked = _search_postgresql(terms, limit, since)
+    elif connection.vendor == 'sqlite':
+        ranked = _search_sqlite(terms, limit, since)
+    else:
+        logger.warning(f"No full-text index on {connection.vendor}, falling back to title matching")
+        ranked = _search_fallback(terms, limit, since)
+
+    jobs = Job.objects.select_related('company').in_bulk([job_id for job_id, _ in ranked])
+    results = []
+    for job_id, rank in ranked:
+        job = jobs[job_id]
+        job.rank = rank
+        results.append(job)
+    return results
@@ -0,0 +1,245 @@
+import datetime
+import logging
+import random
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from scraper.bulk_copy import copy_rows
+from scraper.ingest import JobRecord, content_hash
+from scraper.models import (
+    ArchivedJob, ArchivedJobKey, Company, EmailOutbox, Job, JobBoard, JobLshBucket, JobRevision, JobSignature, Salary,
+)
+from scraper.retention import archive_key
+from scraper.salary import parse_salaries
+
+logger = logging.getLogger(__name__)
+
+# Marks generated rows, so they can be told apart and deleted. Company urls
+# don't start with http, so enrichment never fetches them.
+SYNTHETIC_PREFIX = 'synthetic-'
+SYNTHETIC_COMPANY_URL = 'synthetic:'
+
+# Company popularity follows Zipf's law with this exponent: the n-th most
+# popular company posts about 1/n^s as many offers as the first
+ZIPF_EXPONENT = 1.1
+
+# Share of offers per board, and of offers showing a salary
+BOARD_WEIGHTS = {JobBoard.PRACUJ: 8, JobBoard.NO_FLUFF: 1, JobBoard.JUST_JOIN_IT: 1}
+SALARY_SHARE = 0.6
+
+ROLES = [
+    'Analityk danych', 'Analityk biznesowy', 'Programista Python', 'Programista Java', 'Inżynier danych',
+    'Specjalista ds. analiz', 'Data Scientist', 'Tester oprogramowania', 'Administrator systemów',
+    'Kierownik projektu', 'Księgowy', 'Specjalista ds. rekrutacji', 'Konsultant SAP',
+    'Architekt rozwiązań chmurowych', 'Specjalista ds. marketingu internetowego', 'Analityk BI',
+    'Programista .NET', 'Inżynier DevOps', 'Specjalista ds. obsługi klienta', 'Controller finansowy',
+]
+TITLE_SUFFIXES = ['', '', '', ' (k/m)', ' - praca zdalna', ' z językiem niemieckim', ' w zespole raportowym']
+SENIORITIES = {
+    'specjalista (mid / regular)': 5,
+    'młodszy specjalista (junior)': 3,
+    'starszy specjalista (senior)': 3,
+    'asystent': 1,
+    'ekspert': 1,
+    'kierownik / koordynator': 1,
+}
+COMPANY_STEMS = [
+    'nord', 'pol', 'data', 'info', 'tele', 'euro', 'bio', 'agro', 'trans', 'medi', 'fin', 'soft', 'logi', 'eko',
+]
+COMPANY_ENDINGS = ['tech', 'soft', 'net', 'pol', 'sys', 'bud', 'med', 'trade', 'com', 'invest']
+COMPANY_KINDS = ['', ' polska', ' consulting', ' solutions', ' group', ' services']
+INDUSTRIES = ['IT', 'Finanse', 'Produkcja', 'Handel', 'Logistyka', 'Medycyna', 'Telekomunikacja', 'Energetyka']
+# (size_from, size_to) of enriched companies; the others have unknown (0) sizes
+COMPANY_SIZES = [(1, 9), (10, 49), (50, 249), (250, 999), (1000, 4999), (5000, 10000)]
+SENTENCES = [
+    'Przygotowywanie raportów i analiz dla zarządu.',
+    'Budowa i utrzymanie procesów przetwarzania danych.',
+    'Współpraca z zespołami biznesowymi przy definiowaniu wymagań.',
+    'Znajomość SQL oraz jednego z języków programowania.',
+    'Doświadczenie w pracy z hurtowniami danych.',
+    'Bardzo dobra znajomość języka angielskiego.',
+    'Umiejętność pracy w zespole i samodzielność.',
+    'Automatyzacja powtarzalnych zadań.',
+    'Optymalizacja zapytań i modeli danych.',
+    'Udział w projektach migracji do chmury.',
+]
+
+# Jobs saved at once
+BATCH_SIZE = 5000
+
+JOB_COLUMNS = [
+    'board', 'original_id', 'title', 'url', 'company_id', 'description', 'requirements', 'responsibilities',
+    'salary_id', 'seniority', 'salary_text', 'status', 'created_at', 'lena_comparibility',
+    'enriched_at', 'scored_at', 'content_hash', 'digest_sent_at', 'enrich_attempts',
+]
+
+
+def _thousands(amount):
+    return f'{amount:,}'.replace(',', ' ')
+
+
+def salary_text(rng):
+    """A salary as pracuj.pl shows it: monthly gross for employment, hourly net for B2B."""
+    if rng.random() < 0.7:
+        low = rng.randrange(4000, 30000, 500)
+        return f'{_thousands(low)}–{_thousands(low + rng.randrange(1000, 10000, 500))} zł brutto / mies.'
+    low = rng.randrange(60, 250, 10)
+    return f'{low}–{low + rng.randrange(10, 80, 10)} zł netto (+ VAT) / godz.'
+
+
+def _salaries(rng, count=300):
+    """A pool of salary texts with their Salary ids, None for texts that don't parse."""
+    texts = {salary_text(rng) for _ in range(count)}
+    return {
+        text: Salary.objects.get_for_parsed(parsed).id if parsed else None
+        for text, parsed in parse_salaries(texts).items()
+    }
+
+
+def create_companies(count, rng, now):
+    """
+    Create synthetic companies, most popular first.
+
+    Returns:
+        list: (id, name, url) of the companies
+    """
+    start = Company.objects.filter(url__startswith=SYNTHETIC_COMPANY_URL).count()
+    companies = []
+    for number in range(start, start + count):
+        name = (f'{rng.choice(COMPANY_STEMS)}{rng.choice(COMPANY_ENDINGS)}'
+                f'{rng.choice(COMPANY_KINDS)} {number}')
+        company = Company(name=name, url=f'{SYNTHETIC_COMPANY_URL}{number}', industry=rng.choice(INDUSTRIES))
+        # Two thirds have been enriched
+        if rng.random() < 2 / 3:
+            company.size_from, company.size_to = rng.choice(COMPANY_SIZES)
+            company.last_enriched_at = now
+        companies.append(company)
+    Company.objects.bulk_create(companies, batch_size=BATCH_SIZE)
+    # Ids aren't returned by every database, read them back in creation order
+    return list(
+        Company.objects.filter(url__startswith=SYNTHETIC_COMPANY_URL)
+        .order_by('-id')[:count]
+        .values_list('id', 'name', 'url')
+    )[::-1]
+
+
+def _job_row(rng, number, company, salaries, now, days):
+    board = rng.choices(list(BOARD_WEIGHTS), weights=list(BOARD_WEIGHTS.values()))[0]
+    original_id = f'{SYNTHETIC_PREFIX}{number}'
+    title = rng.choice(ROLES) + rng.choice(TITLE_SUFFIXES)
+    url = f'https://www.pracuj.pl/praca/oferta,{original_id}'
+    seniority = rng.choices(list(SENIORITIES), weights=list(SENIORITIES.values()))[0]
+    text = rng.choice(list(salaries)) if rng.random() < SALARY_SHARE else ''
+    # Most offers are recent, a few are up to `days` old
+    created_at = now - datetime.timedelta(seconds=rng.triangular(0, days * 86400, 0))
+    company_id, company_name, company_url = company
+    record = JobRecord(board, original_id, title, url, company_name, company_url, seniority, text)
+    return (
+        board, original_id, title, url, company_id,
+        ' '.join(rng.sample(SENTENCES, 3)), ' '.join(rng.sample(SENTENCES, 2)), ' '.join(rng.sample(SENTENCES, 2)),
+        salaries.get(text), seniority, text, 0, created_at, round(rng.betavariate(2, 5), 4),
+        created_at, created_at, content_hash(record),
+        # Everything but the last day has been mailed
+        created_at + datetime.timedelta(hours=1) if created_at < now - datetime.timedelta(days=1) else None,
+        1,
+    )
+
+
+def _save_jobs(rows):
+    if connection.vendor == 'postgresql':
+        copy_rows(Job._meta.db_table, JOB_COLUMNS, rows)
+        return
+    jobs = [Job(**dict(zip(JOB_COLUMNS, row))) for row in rows]
+    Job.objects.bulk_create(jobs, batch_size=500)
+    # created_at is auto_now_add, which overwrites it on create
+    for job, row in zip(jobs, rows):
+        job.created_at = row[JOB_COLUMNS.index('created_at')]
+    Job.objects.bulk_update(jobs, ['created_at'], batch_size=500)
+
+
+def generate(jobs, companies=None, days=365, seed=None):
+    """
+    Add synthetic jobs and the companies posting them.
+
+    They look like scraped, enriched and scored offers: Polish titles and
+    descriptions, salary texts parsed into Salary rows, creation dates
+    skewed towards the present, and companies whose popularity follows
+    Zipf's law. Each job is its own cluster. Jobs older than a day are
+    marked sent, so the digest has a realistic backlog.
+
+    On Postgres the jobs are loaded with COPY, elsewhere with bulk_create.
+    Every batch of BATCH_SIZE jobs is committed on its own, so a large run
+    doesn't hold one long transaction, and an interrupted one keeps what it
+    saved.
+
+    Args:
+        jobs (int): Number of jobs to add
+        companies (int, optional): Number of companies to add, default one per 20 jobs
+        days (int): Age of the oldest job
+        seed (int, optional): Seed for reproducible data
+
+    Returns:
+        int: Number of jobs added
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    start = Job.objects.filter(original_id__startswith=SYNTHETIC_PREFIX).count()
+
+    salaries = _salaries(rng)
+    posters = create_companies(companies or max(1, jobs // 20), rng, now)
+    cumulative = []
+    total = 0
+    for rank in range(len(posters)):
+        total += 1 / (rank + 1) ** ZIPF_EXPONENT
+        cumulative.append(total)
+
+    for offset in range(0, jobs, BATCH_SIZE):
+        size = min(BATCH_SIZE, jobs - offset)
+        chosen = rng.choices(posters, cum_weights=cumulative, k=size)
+        with transaction.atomic():
+            last_id = Job.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            _save_jobs([
+                _job_row(rng, start + offset + i, company, salaries, now, days)
+                for i, company in enumerate(chosen)
+            ])
+            Job.objects.filter(id__gt=last_id, original_id__startswith=SYNTHETIC_PREFIX).update(cluster=F('id'))
+        logger.info(f"Generated {offset + size}/{jobs} synthetic jobs")
+    return jobs
+
+
+def delete_synthetic():
+    """
+    Delete the synthetic jobs and companies, and what refers to them.
+
+    Synthetic jobs archive_jobs moved to grabbo_job_archive are deleted too,
+    with their ArchivedJobKey rows. Those of jobs archived to files can't be
+    told apart and stay.
+
+    Returns:
+        int: Number of jobs deleted, archived ones included
+    """
+    jobs = Job.objects.filter(original_id__startswith=SYNTHETIC_PREFIX)
+    archived = ArchivedJob.objects.filter(original_id__startswith=SYNTHETIC_PREFIX)
+    with transaction.atomic():
+        keys = {}
+        for board, original_id in archived.values_list('board', 'original_id').iterator(chunk_size=BATCH_SIZE):
+            keys.setdefault(board, []).append(archive_key(original_id))
+        for board, board_keys in keys.items():
+            for start in range(0, len(board_keys), BATCH_SIZE):
+                ArchivedJobKey.objects.filter(board=board, key__in=board_keys[start:start + BATCH_SIZE]).delete()
+        archived_deleted, _ = archived.delete()
+
+        # Rows the ORM would cascade to, removed without loading the jobs
+        for model in (JobRevision, JobSignature, JobLshBucket):
+            model.objects.filter(job__in=jobs).delete()
+        EmailOutbox.jobs.through.objects.filter(job__in=jobs).delete()
+        Job.objects.filter(company__url__startswith=SYNTHETIC_COMPANY_URL).exclude(
+            original_id__startswith=SYNTHETIC_PREFIX,
+        ).update(company=None)
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM grabbo_job WHERE original_id LIKE %s", [f'{SYNTHETIC_PREFIX}%'])
+            deleted = cursor.rowcount + archived_deleted
+            cursor.execute("DELETE FROM grabbo_company WHERE url LIKE %s", [f'{SYNTHETIC_COMPANY_URL}%'])
+    return deleted
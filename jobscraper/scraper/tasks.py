@@ -1,65 +1,228 @@
+import datetime
 import logging
+from django.conf import settings
 from django.core.paginator import Paginator
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
 
-from scraper.job_downloader import PracujDownloader
-from scraper.models import Job
-from scraper.mailings import send_mail_with_offers
+from scraper import api, outbox, page_cache, work_queue
+from scraper.models import Job, WorkItemState
+from scraper.mailings import queue_mail_with_offers
+from scraper.routers import replica_reads
+
+# Modules depending on Playwright, BeautifulSoup, NumPy or SciPy are imported
+# inside the functions that need them, so that importing this module (and
+# the commands using it) stays cheap.
 
 logger = logging.getLogger(__name__)
 
+# URLs for job search
+SEARCH_URLS = [
+    'https://www.pracuj.pl/praca/warszawa;wp/ostatnich%203%20dni;p,3?rd=0&et=3%2C17%2C4&ao=false&tc=0&wm=hybrid%2Cfull-office',
+    "https://www.pracuj.pl/praca/ostatnich%203%20dni;p,3/praca%20zdalna;wm,home-office?et=3%2C17%2C4&ao=false&tc=0"
+]
 
-def download_and_send():
-    """
-    Download jobs from predefined URLs and send email with new offers.
-    Returns a string with the result.
+# Replica-read digest candidates checked again on the primary with one query
+DIGEST_RECHECK_CHUNK_SIZE = 500
+
+# Downloader shared by every run in this process, so long-running workers
+# keep the Playwright driver and the company cache warm between runs
+_downloader = None
+
+
+def get_downloader():
+    """Return the process-wide PracujDownloader, creating it on first use."""
+    from scraper.job_downloader import PracujDownloader
+
+    global _downloader
+    if _downloader is None:
+        _downloader = PracujDownloader()
+    return _downloader
+
+
+def close_downloader():
+    """Stop the process-wide downloader's browser driver, if it was started."""
+    if _downloader is not None:
+        _downloader.close()
+
+
+def download_jobs(urls=None, run_key=None):
     """
-    # URLs for job search
-    urls = [
-        'https://www.pracuj.pl/praca/warszawa;wp/ostatnich%203%20dni;p,3?rd=0&et=3%2C17%2C4&ao=false&tc=0&wm=hybrid%2Cfull-office',
-        "https://www.pracuj.pl/praca/ostatnich%203%20dni;p,3/praca%20zdalna;wm,home-office?et=3%2C17%2C4&ao=false&tc=0"
-    ]
+    Download jobs from the given search URLs (SEARCH_URLS by default).
+
+    Args:
+        urls (list, optional): Search URLs
+        run_key (str, optional): Run the pages are queued under, today's by
+            default, so a second run the same day only finishes what the first left
 
-    # Initialize counters
+    Returns:
+        int: Number of jobs added to the database
+    """
     total_jobs_added = 0
 
-    # Download jobs from each URL
-    downloader = PracujDownloader()
-    for url in urls:
+    # Work items of past runs are only kept for inspection
+    work_queue.purge_old_items()
+    page_cache.evict_expired()
+
+    downloader = get_downloader()
+    downloader.stats = dict.fromkeys(downloader.stats, 0)
+    downloader.timings.reset()
+    downloader.reset_caches()
+    for url in urls or SEARCH_URLS:
         logger.info(f"Downloading jobs from {url}")
-        jobs_added = downloader.download_jobs(url)
+        jobs_added = downloader.download_jobs(url, run_key=run_key)
         total_jobs_added += jobs_added
         logger.info(f"Added {jobs_added} jobs from {url}")
 
     logger.info(f"Total jobs added: {total_jobs_added}")
+    api.invalidate_cache()
+    logger.info(f"Unchanged pages skipped: {downloader.stats['pages_unchanged']}, "
+                f"changed pages processed: {downloader.stats['pages_changed']}")
+    for stage, summary in downloader.timings.summary().items():
+        logger.info(f"{stage.capitalize()} latency: {summary['count']} pages, p50 {summary['p50']}s, "
+                    f"p95 {summary['p95']}s, histogram {summary['histogram']}")
+    return total_jobs_added
+
+
+def digest_offers(since):
+    """
+    Offers to put in the digest, best scoring first.
+
+    Args:
+        since (datetime): Oldest creation time of an offer
+
+    Returns:
+        QuerySet: Dicts with the id, title, company__name, url and cluster_id of the offers
+    """
+    # Start with recent jobs not sent yet that resemble SCORING_PROFILE,
+    # leaving out those waiting in the outbox and reposts of sent offers
+    query = Job.objects.filter(
+        digest_sent_at__isnull=True,
+        created_at__gte=since,
+        lena_comparibility__gte=settings.DIGEST_MIN_SCORE,
+    ).exclude(
+        emails__state__in=[WorkItemState.PENDING, WorkItemState.IN_PROGRESS],
+    ).filter(
+        ~Exists(Job.objects.filter(cluster_id=OuterRef('cluster_id'), digest_sent_at__isnull=False)),
+    )
 
-    # Filter jobs created today and exclude certain keywords
-    excluded_terms = [
-        'developer', 'programista', 'sprzedawca', 'handlowiec',
-        'software developer', 'technik', 'kucharz', 'kelner',
-        'księgowa', 'engineer', 'inżynier', 'sprzedaży',
-        'instruktor', 'telemarketing', 'call center'
-    ]
+    # Offers without a parsed salary are kept, they may still pay enough
+    if settings.DIGEST_MIN_SALARY:
+        query = query.exclude(salary__currency='PLN', salary__monthly_to__lt=settings.DIGEST_MIN_SALARY)
+
+    # Company sizes are filled in by enrich_companies, 0 is unknown
+    if settings.DIGEST_MIN_COMPANY_SIZE:
+        query = query.exclude(company__size_to__gt=0, company__size_to__lt=settings.DIGEST_MIN_COMPANY_SIZE)
+    if settings.DIGEST_MAX_COMPANY_SIZE:
+        query = query.exclude(company__size_from__gt=settings.DIGEST_MAX_COMPANY_SIZE)
+
+    return query.order_by('-lena_comparibility', '-created_at').values(
+        'id', 'title', 'company__name', 'url', 'cluster_id',
+    )
+
+
+def send_digest():
+    """
+    Queue an email with the relevant job offers not sent yet.
+
+    The offers are selected and the emails queued in one transaction;
+    scraper.outbox.send_outbox sends them and marks the offers sent. The
+    selection may be read from the replica, but whether an offer was sent
+    or queued already is always checked on the primary.
+
+    Returns:
+        int: Number of offers queued
+    """
+    from scraper.dedup import cluster_new_jobs
+    from scraper.scoring import score_jobs
+
+    cluster_new_jobs()
+    score_jobs()
+    since = timezone.now() - datetime.timedelta(days=settings.DIGEST_LOOKBACK_DAYS)
+
+    with transaction.atomic():
+        # One entry per cluster of near-duplicates, the best scoring one
+        new_offers = []
+        seen_clusters = set()
+        # The heaviest query of the digest, read from the replica when it's fresh enough
+        with replica_reads() as alias:
+            offers = list(digest_offers(since))
+        if alias != DEFAULT_DB_ALIAS:
+            # The replica may not have replayed the latest sends and queued
+            # emails yet, so the candidates are selected again on the primary
+            ids = [offer['id'] for offer in offers]
+            current = set()
+            for start in range(0, len(ids), DIGEST_RECHECK_CHUNK_SIZE):
+                chunk = ids[start:start + DIGEST_RECHECK_CHUNK_SIZE]
+                current.update(digest_offers(since).filter(id__in=chunk).values_list('id', flat=True))
+            offers = [offer for offer in offers if offer['id'] in current]
+        for offer in offers:
+            if offer['cluster_id'] is None or offer['cluster_id'] not in seen_clusters:
+                seen_clusters.add(offer['cluster_id'])
+                new_offers.append(offer)
+        offers_count = len(new_offers)
+
+        logger.info(f"Found {offers_count} new relevant job offers")
+
+        # Send emails in batches to avoid huge emails
+        if offers_count:
+            paginator = Paginator(new_offers, 100)
+            for page in paginator.page_range:
+                offers = paginator.page(page).object_list
+                logger.info(f"Queueing email batch {page} with {len(offers)} offers")
+                queue_mail_with_offers(offers)
+        else:
+            logger.info("No new offers to send")
+
+    return offers_count
+
+
+def download_and_send(run_key=None):
+    """
+    Download jobs from predefined URLs and send email with new offers.
+    Returns a string with the result.
+
+    Args:
+        run_key (str, optional): Run the pages are queued under, see download_jobs
+    """
+    total_jobs_added = download_jobs(run_key=run_key)
+    offers_count = send_digest()
 
-    # Start with jobs created today
-    query = Job.objects.filter(created_at__date=timezone.now().date())
+    # The digest is queued whatever happens here; emails that can't be sent
+    # now are retried by the scheduled 'outbox' job
+    try:
+        emails_sent = outbox.send_outbox()
+    except Exception as e:
+        logger.error(f"Error sending queued emails: {e}")
+        emails_sent = 0
 
-    # Exclude unwanted job titles
-    for term in excluded_terms:
-        query = query.exclude(title__icontains=term)
+    downloader = get_downloader()
+    stats = downloader.stats
+    page_p95 = downloader.timings.summary()['page']['p95']
 
-    new_offers = query.order_by('-created_at')
+    return (f"Success: Added {total_jobs_added} jobs, found {offers_count} relevant offers, "
+            f"sent {emails_sent} emails, "
+            f"page cache {stats['pages_unchanged']} hits / {stats['pages_changed']} misses, "
+            f"page p95 {page_p95}s")
 
-    logger.info(f"Found {new_offers.count()} new relevant job offers")
 
-    # Send emails in batches to avoid huge emails
-    if new_offers.exists():
-        paginator = Paginator(new_offers, 100)
-        for page in paginator.page_range:
-            offers = paginator.page(page).object_list.values('title', 'company__name', 'url')
-            logger.info(f"Sending email batch {page} with {len(offers)} offers")
-            send_mail_with_offers(offers)
-    else:
-        logger.info("No new offers to send")
+# Jobs that run_scheduler can run, by the names used in SCHEDULER_JOBS.
+# Dotted paths, imported only for the jobs that are enabled.
+# Jobs that wait for others to finish: the digest must not mail the partial
+# results of a scrape still running, in this worker or another one
+SCHEDULED_AFTER = {
+    'digest': ['scrape'],
+}
 
-    return f"Success: Added {total_jobs_added} jobs, found {new_offers.count()} relevant offers"
\ No newline at end of file
+SCHEDULED_TASKS = {
+    'scrape': 'scraper.tasks.download_jobs',
+    'digest': 'scraper.tasks.send_digest',
+    'enrich': 'scraper.enrichment.enrich_jobs',
+    'companies': 'scraper.enrichment.enrich_companies',
+    'score': 'scraper.scoring.score_jobs',
+    'boards': 'scraper.boards.download_boards',
+    'archive': 'scraper.retention.archive_jobs',
+    'prune_pages': 'scraper.page_archive.prune_segments',
+    'outbox': 'scraper.outbox.send_outbox',
+}
@@ -0,0 +1,5 @@
+# jobscraper/scraper/tests/__init__.py
+from pathlib import Path
+
+# Recorded listing pages and API responses
+FIXTURES = Path(__file__).parent / 'fixtures'
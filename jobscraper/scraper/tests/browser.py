@@ -0,0 +1,188 @@
+# jobscraper/scraper/tests/browser.py
+"""
+Stand-in for the parts of Playwright PracujDownloader uses.
+
+Listing pages are served from fixture files by their `pn` parameter, so the
+downloader runs end to end without a browser or network. Sub-searches of a
+partitioned search can serve pages of their own. The downloader
+saves from worker threads, so tests using it must be TransactionTestCases:
+
+    site = StubSite({1: 'pracuj_offers_page1.html', 2: 'pracuj_offers_page2.html'})
+    with site.installed():
+        PracujDownloader().download_jobs('https://www.pracuj.pl/praca/warszawa?et=17')
+"""
+from contextlib import contextmanager
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from scraper.job_downloader import MAX_PAGE_SELECTOR, OFFERS_SELECTOR
+from scraper.tests import FIXTURES
+
+EMPTY_PAGE = 'pracuj_offers_empty.html'
+
+
+class StubResponse:
+    def __init__(self, status, url=None):
+        self.status = status
+        self.url = url
+
+
+class StubLocator:
+    def __init__(self, content, matches=1):
+        self.content = content
+        self.matches = matches
+
+    @property
+    def first(self):
+        return self
+
+    async def count(self):
+        return self.matches
+
+    async def evaluate(self, expression):
+        return self.content
+
+    async def text_content(self):
+        return self.content
+
+
+class StubPage:
+    def __init__(self, site):
+        self.site = site
+        self.url = None
+        self.content = None
+        self.listeners = {}
+
+    async def goto(self, url, **kwargs):
+        self.url = url
+        status, self.content = self.site.respond(url)
+        if status is None:
+            raise PlaywrightError(f"net::ERR_CONNECTION_RESET at {url}")
+        response = StubResponse(status, url)
+        for listener in list(self.listeners.get('response', [])):
+            listener(response)
+        return response
+
+    def on(self, event, listener):
+        self.listeners.setdefault(event, []).append(listener)
+
+    def remove_listener(self, event, listener):
+        self.listeners[event].remove(listener)
+
+    async def wait_for_selector(self, selector, timeout=None, state=None):
+        if selector == OFFERS_SELECTOR and self.content is not None:
+            return StubLocator(self.content)
+        raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded waiting for {selector}")
+
+    async def wait_for_function(self, expression, arg=None, timeout=None):
+        # Loaded pages are complete at once
+        if self.content is not None:
+            return True
+        raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded waiting for function")
+
+    async def query_selector(self, selector):
+        return None
+
+    async def evaluate(self, expression):
+        return None
+
+    def locator(self, selector):
+        if selector == MAX_PAGE_SELECTOR:
+            # Pagination is only shown when there are several pages
+            max_page = self.site.max_page(self.url)
+            return StubLocator(f' {max_page} ', matches=int(max_page > 1))
+        return StubLocator(self.content)
+
+    async def close(self):
+        pass
+
+
+class StubContext:
+    def __init__(self, site):
+        self.site = site
+
+    async def new_page(self):
+        return StubPage(self.site)
+
+    async def close(self):
+        pass
+
+
+class StubBrowser:
+    def __init__(self, site):
+        self.site = site
+
+    async def new_context(self, **kwargs):
+        return StubContext(self.site)
+
+    async def close(self):
+        self.site.browsers_closed += 1
+
+
+class StubChromium:
+    def __init__(self, site):
+        self.site = site
+
+    async def launch(self, **kwargs):
+        self.site.browsers_launched += 1
+        return StubBrowser(self.site)
+
+
+class StubPlaywright:
+    def __init__(self, site):
+        self.chromium = StubChromium(site)
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        pass
+
+
+class StubSite:
+    """
+    Listing pages of one search.
+
+    Args:
+        pages (dict): Page number -> fixture file; other pages have no offers
+        failures (dict, optional): Page number -> statuses returned before the
+            page loads, None for a connection error
+        searches (dict, optional): Query parameter such as 'wm=hybrid' ->
+            pages of the searches filtering on it, instead of `pages`
+    """
+
+    def __init__(self, pages, failures=None, searches=None):
+        self.pages = pages
+        self.searches = searches or {}
+        self.failures = {page: list(statuses) for page, statuses in (failures or {}).items()}
+        self.requests = []
+        self.browsers_launched = 0
+        self.browsers_closed = 0
+
+    def respond(self, url):
+        self.requests.append(url)
+        page_number = int(parse_qs(urlparse(url).query).get('pn', ['1'])[0])
+        if self.failures.get(page_number):
+            status = self.failures[page_number].pop(0)
+            if status is None or status >= 400:
+                return status, None
+        content = (FIXTURES / self.pages_of(url).get(page_number, EMPTY_PAGE)).read_text()
+        return 200, content
+
+    def pages_of(self, url):
+        query = urlparse(url).query.split('&')
+        for param, pages in self.searches.items():
+            if param in query:
+                return pages
+        return self.pages
+
+    def max_page(self, url):
+        return max(self.pages_of(url), default=1)
+
+    @contextmanager
+    def installed(self):
+        """Serve this site to every PracujDownloader created inside the block."""
+        with patch('scraper.job_downloader.async_playwright', lambda: StubPlaywright(self)):
+            yield self
@@ -0,0 +1,86 @@
+# jobscraper/scraper/tests/test_api.py
+import datetime
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from django.utils import timezone
+
+from scraper import api
+from scraper.models import Company, Job, JobBoard
+
+
+class JobsApiTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        company = Company.objects.create(name='acme')
+        self.jobs = [
+            Job.objects.create(
+                board=board, original_id=str(i), title=title, url='', seniority='', salary_text='',
+                description='', requirements='', responsibilities='', company=company,
+            )
+            for i, (board, title) in enumerate([
+                (JobBoard.PRACUJ, 'Analityk danych'),
+                (JobBoard.NO_FLUFF, 'Data Analyst'),
+                (JobBoard.PRACUJ, 'Kierowca'),
+                (JobBoard.PRACUJ, 'Starszy analityk'),
+            ])
+        ]
+
+    def test_keyset_pagination_and_filters(self):
+        first = self.client.get('/api/jobs', {'board': 'pracuj', 'limit': 2}).json()
+        self.assertEqual([job['title'] for job in first['results']], ['Starszy analityk', 'Kierowca'])
+
+        second = self.client.get('/api/jobs', {'board': 'pracuj', 'limit': 2, 'cursor': first['next_cursor']}).json()
+        self.assertEqual([job['title'] for job in second['results']], ['Analityk danych'])
+        self.assertIsNone(second['next_cursor'])
+
+        found = self.client.get('/api/jobs', {'q': 'analityka'}).json()
+        self.assertEqual([job['id'] for job in found['results']], [self.jobs[3].id, self.jobs[0].id])
+
+        self.assertEqual(self.client.get('/api/jobs', {'board': 'monster'}).status_code, 400)
+
+    def test_cached_until_invalidated(self):
+        response = self.client.get('/api/jobs')
+        etag = response['ETag']
+        self.assertIn(str(self.jobs[-1].id), etag)
+
+        # Only the cache generation is read
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get('/api/jobs', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(
+                self.client.get('/api/jobs', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304,
+            )
+
+        self.jobs[0].delete()
+        self.assertEqual(len(self.client.get('/api/jobs').json()['results']), 4)
+
+        api.invalidate_cache()
+        response = self.client.get('/api/jobs', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 3)
+
+    def test_rescoring_old_jobs_changes_the_validators(self):
+        response = self.client.get('/api/jobs')
+
+        Job.objects.filter(pk=self.jobs[0].pk).update(
+            lena_comparibility=0.9, scored_at=timezone.now() + datetime.timedelta(hours=1),
+        )
+        api.invalidate_cache()
+        rescored = self.client.get('/api/jobs', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(rescored.status_code, 200)
+        self.assertNotEqual(rescored['ETag'], response['ETag'])
+        self.assertNotEqual(rescored['Last-Modified'], response['Last-Modified'])
+
+    def test_invalidation_reaches_a_process_with_its_own_cache(self):
+        web_cache = LocMemCache('web', {})
+        with patch('scraper.api.cache', web_cache):
+            etag = self.client.get('/api/jobs')['ETag']
+
+        # The worker's cache isn't the web process's; the database is shared
+        with patch('scraper.api.cache', LocMemCache('worker', {})):
+            api.invalidate_cache()
+
+        with patch('scraper.api.cache', web_cache):
+            self.assertEqual(self.client.get('/api/jobs', HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -0,0 +1,80 @@
+# jobscraper/scraper/tests/test_boards.py
+import json
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from unittest.mock import patch, MagicMock
+
+from scraper.boards import ADAPTERS, JustJoinITAdapter, NoFluffJobsAdapter, download_boards
+from scraper.ingest import JobIngestor, JobRecord
+from scraper.models import Company, Job, JobBoard
+from scraper.salary import parse_salary
+from scraper.tests import FIXTURES
+
+
+class BoardAdapterTestCase(TestCase):
+    def load(self, name):
+        return json.loads((FIXTURES / name).read_text())
+
+    def test_nofluffjobs_parses_recorded_listing(self):
+        records, has_next_page = NoFluffJobsAdapter().parse(self.load('nofluffjobs_search.json'), page=1)
+
+        self.assertTrue(has_next_page)
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0].board, JobBoard.NO_FLUFF)
+        self.assertEqual(records[0].url, 'https://nofluffjobs.com/pl/job/data-analyst-acme-warszawa')
+        self.assertEqual(records[0].company_name, 'ACME Sp. z o.o.')
+        self.assertEqual(records[1].seniority, 'Junior, Trainee')
+        self.assertEqual(parse_salary(records[0].salary_text)[:5], (12000, 16000, 'PLN', 'month', 'b2b'))
+        self.assertEqual(records[2].salary_text, '')
+
+    def test_justjoinit_parses_recorded_listing(self):
+        records, has_next_page = JustJoinITAdapter().parse(self.load('justjoinit_offers.json'))
+
+        self.assertFalse(has_next_page)
+        self.assertEqual([record.original_id for record in records], [
+            'acme-data-analyst-warszawa-sql',
+            'umbrella-reporting-specialist-gdansk-excel',
+            'hooli-office-manager-remote-ms-office',
+        ])
+        self.assertEqual(parse_salary(records[1].salary_text)[:4], (90, 120, 'PLN', 'hour'))
+
+    def test_download_boards_saves_new_offers_once(self):
+        responses = {
+            NoFluffJobsAdapter.search_url: self.load('nofluffjobs_search.json'),
+            JustJoinITAdapter.search_url: self.load('justjoinit_offers.json'),
+        }
+
+        def request(method, url, **kwargs):
+            response = MagicMock(status_code=200)
+            response.json.return_value = responses[url]
+            return response
+
+        client = MagicMock()
+        client.request.side_effect = request
+        with patch('scraper.boards.get_client', return_value=client), override_settings(BOARD_MAX_PAGES=2):
+            self.assertEqual(download_boards(sorted(ADAPTERS)), 6)
+            self.assertEqual(download_boards(sorted(ADAPTERS)), 0)
+
+        self.assertEqual(Job.objects.filter(board=JobBoard.NO_FLUFF).count(), 3)
+        # The same offer on both boards is one cluster
+        acme = Job.objects.filter(title='Data Analyst')
+        self.assertEqual(len({job.cluster_id for job in acme}), 1)
+        # Companies are matched regardless of the legal form
+        self.assertEqual(Company.objects.filter(name='acme').count(), 1)
+
+    def test_ingest_batches_queries(self):
+        records = [
+            JobRecord(JobBoard.PRACUJ, str(i), f'Analityk {i}', '', 'acme', '', 'mid', '5 000 zł / mies.')
+            for i in range(50)
+        ]
+        ingestor = JobIngestor()
+        # Independent of the number of records: existence and archive lookups,
+        # salary and company get-or-create, one insert, then clustering
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(len(ingestor.ingest(records)), 50)
+        self.assertLessEqual(len(captured), 20, '\n'.join(query['sql'] for query in captured))
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(ingestor.ingest(records), [])
+        self.assertLessEqual(len(captured), 3, '\n'.join(query['sql'] for query in captured))
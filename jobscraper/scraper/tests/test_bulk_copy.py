@@ -0,0 +1,189 @@
+# jobscraper/scraper/tests/test_bulk_copy.py
+import csv
+import datetime
+import io
+import os
+import tempfile
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from scraper.bulk_copy import EXPORT_FIELDS, export_jobs, export_query, import_jobs
+from scraper.models import Company, HypeStatus, Job, JobBoard, JobSignature
+
+
+def make_job(original_id, title, company=None, board=JobBoard.PRACUJ, **fields):
+    return Job.objects.create(
+        board=board, original_id=original_id, title=title, url=f'https://example.com/{original_id}',
+        company=company, description='', requirements='', responsibilities='',
+        seniority='mid', salary_text='', **fields,
+    )
+
+
+def csv_file(rows, fieldnames=EXPORT_FIELDS):
+    output = io.StringIO(newline='')
+    writer = csv.DictWriter(output, fieldnames=fieldnames)
+    writer.writeheader()
+    writer.writerows(rows)
+    output.seek(0)
+    return output
+
+
+class ExportTestCase(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='acme', url='https://acme.example')
+        self.first = make_job('1', 'Data analyst', self.company, status=HypeStatus.HYPED)
+        self.second = make_job('2', 'Data engineer', board=JobBoard.NO_FLUFF)
+
+    def export(self, **options):
+        output = io.StringIO(newline='')
+        exported = export_jobs(output, **options)
+        output.seek(0)
+        return exported, list(csv.DictReader(output))
+
+    def test_export_writes_jobs_in_id_order(self):
+        exported, rows = self.export()
+
+        self.assertEqual(exported, 2)
+        self.assertEqual(list(rows[0]), EXPORT_FIELDS)
+        self.assertEqual([row['id'] for row in rows], [str(self.first.id), str(self.second.id)])
+        self.assertEqual(
+            (rows[0]['board_name'], rows[0]['status_name'], rows[0]['company_name'], rows[0]['company_url']),
+            ('Pracuj', 'Hyped', 'acme', 'https://acme.example'),
+        )
+        self.assertEqual(rows[1]['company_name'], '')
+
+    def test_export_filters_by_board_and_limit(self):
+        self.assertEqual(self.export(board=JobBoard.NO_FLUFF)[1][0]['original_id'], '2')
+        self.assertEqual(self.export(limit=1)[0], 1)
+
+    def test_copy_query_labels_choices_like_the_orm(self):
+        sql, params = export_query(board=JobBoard.PRACUJ, limit=10)
+
+        self.assertIn('CASE j.board WHEN %s THEN %s', sql)
+        self.assertEqual(params[:2], [JobBoard.NO_FLUFF.value, 'No Fluff'])
+        self.assertEqual(params[-2:], [JobBoard.PRACUJ, 10])
+        self.assertEqual(sql.count('%s'), len(params))
+
+
+class ImportTestCase(TestCase):
+    def test_export_round_trips_into_an_empty_database(self):
+        company = Company.objects.create(name='acme', url='https://acme.example')
+        created_at = timezone.now() - datetime.timedelta(days=40)
+        job = make_job('1', 'Data analyst', company, lena_comparibility=0.5)
+        Job.objects.filter(pk=job.pk).update(created_at=created_at)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'jobs.csv')
+            call_command('export_jobs_csv', output=path, stdout=io.StringIO())
+            Job.objects.all().delete()
+            Company.objects.all().delete()
+
+            out = io.StringIO()
+            call_command('import_jobs', path, stdout=out)
+
+        self.assertIn('1 jobs created, 0 updated', out.getvalue())
+        imported = Job.objects.select_related('company').get()
+        self.assertEqual(
+            (imported.board, imported.original_id, imported.title, imported.lena_comparibility),
+            (JobBoard.PRACUJ, '1', 'Data analyst', 0.5),
+        )
+        self.assertEqual((imported.company.name, imported.company.url), ('acme', 'https://acme.example'))
+        self.assertEqual(imported.created_at, created_at)
+        # Not mailed again by the digest
+        self.assertIsNotNone(imported.digest_sent_at)
+
+    def test_import_merges_on_board_and_original_id(self):
+        company = Company.objects.create(name='acme', url='')
+        unchanged = make_job('1', 'Data analyst', company)
+        edited = make_job('2', 'Data engineer', company, content_hash='f' * 32)
+        rows = [
+            {'board': JobBoard.PRACUJ, 'original_id': '1', 'title': 'Data analyst', 'url': unchanged.url,
+             'seniority': 'mid', 'company_name': 'acme'},
+            {'board': JobBoard.PRACUJ, 'original_id': '2', 'title': 'Old title', 'url': edited.url,
+             'seniority': 'mid', 'company_name': 'acme'},
+            # The last row of an offer wins
+            {'board': JobBoard.PRACUJ, 'original_id': '2', 'title': 'Senior data engineer', 'url': edited.url,
+             'seniority': 'mid', 'company_name': 'acme'},
+            # Same id on another board is another offer
+            {'board': JobBoard.NO_FLUFF, 'original_id': '1', 'title': 'Analyst', 'company_name': 'Initech'},
+        ]
+
+        created, updated = import_jobs(csv_file(rows))
+
+        self.assertEqual((created, updated), (1, 1))
+        edited.refresh_from_db()
+        self.assertEqual((edited.title, edited.content_hash), ('Senior data engineer', ''))
+        self.assertEqual(Job.objects.filter(board=JobBoard.PRACUJ).count(), 2)
+        new = Job.objects.get(board=JobBoard.NO_FLUFF)
+        self.assertEqual((new.title, new.status, new.company.name), ('Analyst', HypeStatus.UNKNOWN, 'Initech'))
+        self.assertEqual(Company.objects.count(), 2)
+
+    def test_import_matches_companies_like_the_ingest_and_clusters_new_jobs(self):
+        company = Company.objects.create(name='acme', url='https://acme.example')
+        rows = [
+            {'board': JobBoard.PRACUJ, 'original_id': '1', 'title': 'Data analyst',
+             'company_name': 'ACME sp. z o.o.', 'company_url': 'https://acme.example'},
+            {'board': JobBoard.NO_FLUFF, 'original_id': '7', 'title': 'Data analyst',
+             'company_name': 'Acme', 'company_url': 'https://acme.example'},
+        ]
+
+        self.assertEqual(import_jobs(csv_file(rows)), (2, 0))
+
+        self.assertEqual(Company.objects.count(), 1)
+        first, second = Job.objects.order_by('board')
+        self.assertEqual((first.company_id, second.company_id), (company.id, company.id))
+        self.assertEqual(JobSignature.objects.count(), 2)
+        # The same offer on two boards
+        self.assertEqual(first.cluster_id, second.cluster_id)
+
+    def test_import_needs_known_columns(self):
+        with self.assertRaisesMessage(ValueError, 'Missing columns in the import file: original_id'):
+            import_jobs(csv_file([], fieldnames=['board', 'title']))
+        with self.assertRaisesMessage(ValueError, 'Unknown columns in the import file: description'):
+            import_jobs(csv_file([], fieldnames=['board', 'original_id', 'description']))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'COPY needs Postgres')
+class CopyImportTestCase(TestCase):
+    """The COPY paths, which the default SQLite test database doesn't take."""
+
+    def test_copy_export_round_trips_through_copy_import(self):
+        company = Company.objects.create(name='acme', url='https://acme.example')
+        make_job('1', 'Data analyst', company, status=HypeStatus.HYPED, lena_comparibility=0.5)
+        output = io.StringIO(newline='')
+        self.assertEqual(export_jobs(output), 1)
+        Job.objects.all().delete()
+        output.seek(0)
+
+        self.assertEqual(import_jobs(output), (1, 0))
+
+        imported = Job.objects.get()
+        self.assertEqual(
+            (imported.original_id, imported.status, imported.lena_comparibility, imported.company_id),
+            ('1', HypeStatus.HYPED, 0.5, company.id),
+        )
+        self.assertIsNotNone(imported.digest_sent_at)
+        self.assertEqual(imported.cluster_id, imported.id)
+
+    def test_copy_import_merges_rows_and_matches_companies(self):
+        company = Company.objects.create(name='acme', url='')
+        edited = make_job('2', 'Data engineer', company, content_hash='f' * 32)
+        rows = [
+            {'board': JobBoard.PRACUJ, 'original_id': '2', 'title': 'Old title', 'url': edited.url,
+             'seniority': 'mid', 'company_name': 'acme'},
+            {'board': JobBoard.PRACUJ, 'original_id': '2', 'title': 'Senior data engineer', 'url': edited.url,
+             'seniority': 'mid', 'company_name': 'acme'},
+            {'board': JobBoard.NO_FLUFF, 'original_id': '1', 'title': 'Analyst', 'company_name': 'Acme sp. z o.o.'},
+            {'board': JobBoard.NO_FLUFF, 'original_id': '3', 'title': 'Tester', 'company_name': 'Initech'},
+        ]
+
+        self.assertEqual(import_jobs(csv_file(rows)), (2, 1))
+
+        edited.refresh_from_db()
+        self.assertEqual((edited.title, edited.content_hash), ('Senior data engineer', ''))
+        self.assertEqual(Job.objects.get(original_id='1').company_id, company.id)
+        self.assertEqual(Company.objects.count(), 2)
+        self.assertEqual(JobSignature.objects.filter(job__board=JobBoard.NO_FLUFF).count(), 2)
@@ -0,0 +1,48 @@
+# jobscraper/scraper/tests/test_dedup.py
+from django.test import TestCase, override_settings
+from unittest.mock import patch
+
+from scraper.dedup import cluster_jobs, minhash, normalize, similarity
+from scraper.models import Company, Job, JobBoard
+from scraper.tasks import send_digest
+
+
+class DedupTestCase(TestCase):
+    def make_job(self, original_id, title, company, board=JobBoard.PRACUJ, seniority='specjalista (mid / regular)'):
+        return Job.objects.create(
+            board=board, original_id=original_id, title=title, url='', seniority=seniority,
+            salary_text='', description='', requirements='', responsibilities='',
+            company=Company.objects.get_or_create(name=company, url='')[0],
+        )
+
+    def test_normalize_ignores_case_accents_and_legal_form(self):
+        self.assertEqual(
+            normalize('ACME Sp. z o.o.', 'Analityk Danych (K/M)', 'mid'),
+            normalize('acme', 'analityk danych', 'mid'),
+        )
+        self.assertEqual(normalize('Łódź', 'Księgowa', ''), 'lodz ksiegowa')
+        self.assertLess(similarity(minhash('acme analityk danych'), minhash('globex kierowca')), 0.3)
+
+    def test_reposts_and_cross_board_offers_share_a_cluster(self):
+        original = self.make_job('1', 'Analityk danych', 'acme sp. z o.o.')
+        other = self.make_job('2', 'Kierowca', 'acme sp. z o.o.')
+        cluster_jobs([original, other])
+
+        repost = self.make_job('3', 'Analityk Danych (K/M)', 'acme sp. z o.o.')
+        cross_board = self.make_job('4', 'Analityk danych', 'ACME', board=JobBoard.NO_FLUFF)
+        cluster_jobs([repost, cross_board])
+
+        self.assertEqual(original.cluster_id, original.id)
+        self.assertEqual(other.cluster_id, other.id)
+        self.assertEqual(Job.objects.get(id=repost.id).cluster_id, original.id)
+        self.assertEqual(Job.objects.get(id=cross_board.id).cluster_id, original.id)
+
+    @override_settings(SCORING_PROFILE='analityk danych', DIGEST_MIN_SCORE=0.0)
+    def test_digest_sends_one_offer_per_cluster(self):
+        self.make_job('1', 'Analityk danych', 'acme')
+        self.make_job('2', 'Analityk danych', 'acme', board=JobBoard.JUST_JOIN_IT)
+        self.make_job('3', 'Kierowca', 'globex')
+
+        with patch('scraper.tasks.queue_mail_with_offers') as send_mail:
+            self.assertEqual(send_digest(), 2)
+        self.assertEqual([offer['title'] for offer in send_mail.call_args.args[0]], ['Analityk danych', 'Kierowca'])
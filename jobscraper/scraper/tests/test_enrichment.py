@@ -0,0 +1,152 @@
+# jobscraper/scraper/tests/test_enrichment.py
+import datetime
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from unittest.mock import patch, MagicMock
+
+from scraper import api
+from scraper.enrichment import (
+    enrich_companies, enrich_jobs, parse_company_profile, parse_company_size, parse_job_details,
+)
+from scraper.models import Company, Job, JobBoard
+from scraper.tasks import send_digest
+
+
+class EnrichmentTestCase(TestCase):
+    detail_page = """
+    <html><body>
+        <section data-test="section-about-project"><p>Data platform for logistics.</p></section>
+        <section data-test="section-responsibilities"><ul><li>Build reports</li><li>Own KPIs</li></ul></section>
+        <section data-test="section-requirements"><ul><li>SQL</li></ul></section>
+    </body></html>
+    """
+
+    def test_parse_job_details(self):
+        details = parse_job_details(self.detail_page)
+        self.assertEqual(details['description'], 'Data platform for logistics.')
+        self.assertEqual(details['responsibilities'], 'Build reports\nOwn KPIs')
+        self.assertEqual(details['requirements'], 'SQL')
+
+    @patch('scraper.enrichment.get_client')
+    def test_enrich_jobs_respects_budget_and_failures(self, mock_get_client):
+        jobs = [
+            Job.objects.create(
+                board=JobBoard.PRACUJ, original_id=str(i), title='Analyst',
+                url=f'https://www.pracuj.pl/praca/,oferta,{i}', seniority='', salary_text='',
+                description='', requirements='', responsibilities='',
+            )
+            for i in range(4)
+        ]
+        responses = {
+            jobs[3].url: MagicMock(status_code=200, text=self.detail_page),
+            jobs[2].url: MagicMock(status_code=503, text=''),
+            jobs[1].url: MagicMock(status_code=200, text='<html><body><div id="app"></div></body></html>'),
+        }
+        mock_get_client.return_value.get.side_effect = lambda url: responses[url]
+
+        # Newest jobs go first, so the oldest one is out of budget
+        self.assertEqual(enrich_jobs(budget=3), 1)
+        # The API serves the new details
+        self.assertEqual(api._generation(), 1)
+
+        jobs[3].refresh_from_db()
+        self.assertEqual(jobs[3].requirements, 'SQL')
+        self.assertIsNotNone(jobs[3].enriched_at)
+        # The failed page and the one without any details stay in the backlog for the next run
+        self.assertEqual(Job.objects.filter(enriched_at__isnull=True).count(), 3)
+
+        # They back off, so the next run gets to the oldest job
+        responses[jobs[0].url] = MagicMock(status_code=200, text=self.detail_page)
+        self.assertEqual(enrich_jobs(budget=3), 1)
+        self.assertEqual(mock_get_client.return_value.get.call_args.args, (jobs[0].url,))
+        self.assertEqual(
+            list(Job.objects.filter(enriched_at__isnull=True).order_by('id').values_list('enrich_attempts', flat=True)),
+            [1, 1],
+        )
+
+    @override_settings(ENRICH_MAX_ATTEMPTS=2)
+    @patch('scraper.enrichment.get_client')
+    def test_enrich_jobs_gives_up_on_pages_that_keep_failing(self, mock_get_client):
+        job = Job.objects.create(
+            board=JobBoard.PRACUJ, original_id='1', title='Analyst', url='https://www.pracuj.pl/praca/,oferta,1',
+            seniority='', salary_text='', description='', requirements='', responsibilities='',
+        )
+        mock_get_client.return_value.get.return_value = MagicMock(status_code=503, text='')
+
+        for _ in range(2):
+            self.assertEqual(enrich_jobs(), 0)
+            # Its backoff is over
+            Job.objects.filter(pk=job.pk).update(enrich_next_attempt_at=timezone.now())
+
+        self.assertEqual(enrich_jobs(), 0)
+        self.assertEqual(mock_get_client.return_value.get.call_count, 2)
+        job.refresh_from_db()
+        self.assertEqual((job.enrich_attempts, job.enriched_at), (2, None))
+
+
+class CompanyEnrichmentTestCase(TestCase):
+    profile_page = """
+    <html><head><script type="application/ld+json">
+        {"@context": "https://schema.org", "@type": "Organization", "name": "ACME",
+         "industry": "Logistyka", "numberOfEmployees": {"@type": "QuantitativeValue", "minValue": 250, "maxValue": 499}}
+    </script></head><body></body></html>
+    """
+
+    def make_company(self, name, **kwargs):
+        return Company.objects.create(name=name, url=f'https://pracodawcy.pracuj.pl/company/{name}/profile', **kwargs)
+
+    def test_parse_company_profile(self):
+        self.assertEqual(parse_company_profile(self.profile_page),
+                         {'industry': 'Logistyka', 'size_from': 250, 'size_to': 499})
+        # Without structured data, the labelled sections
+        page = '<div data-test="text-company-size">1 000+ pracowników</div><div data-test="text-company-industry">IT</div>'
+        self.assertEqual(parse_company_profile(page), {'industry': 'IT', 'size_from': 1000, 'size_to': 0})
+        self.assertEqual(parse_company_size('do 50 osób'), (1, 50))
+
+    @override_settings(COMPANY_ENRICH_TTL_DAYS=30)
+    @patch('scraper.enrichment.get_client')
+    def test_enrich_companies_skips_fresh_and_retries_failures(self, mock_get_client):
+        never = self.make_company('acme')
+        stale = self.make_company('globex', last_enriched_at=timezone.now() - datetime.timedelta(days=31))
+        fresh = self.make_company('hooli', last_enriched_at=timezone.now() - datetime.timedelta(days=1))
+        failing = self.make_company('umbrella')
+        # Offers without a profile link
+        Company.objects.create(name='trans-pol', url='')
+        responses = {
+            never.url: MagicMock(status_code=200, text=self.profile_page),
+            stale.url: MagicMock(status_code=404, text=''),
+            failing.url: MagicMock(status_code=503, text=''),
+        }
+        mock_get_client.return_value.get.side_effect = lambda url: responses[url]
+
+        self.assertEqual(enrich_companies(), 2)
+
+        self.assertEqual([call.args[0] for call in mock_get_client.return_value.get.call_args_list].count(fresh.url), 0)
+        never.refresh_from_db()
+        self.assertEqual((never.industry, never.size_from, never.size_to), ('Logistyka', 250, 499))
+        self.assertIsNotNone(never.last_enriched_at)
+        stale.refresh_from_db()
+        self.assertGreater(stale.last_enriched_at, fresh.last_enriched_at)
+        # The failed page is fetched again on the next run
+        self.assertEqual(list(Company.objects.filter(last_enriched_at__isnull=True).values_list('name', flat=True)),
+                         ['umbrella', 'trans-pol'])
+
+    @override_settings(DIGEST_MIN_COMPANY_SIZE=50, DIGEST_MAX_COMPANY_SIZE=1000, DIGEST_MIN_SCORE=0.0)
+    def test_digest_filters_on_known_company_sizes(self):
+        companies = {
+            'small': self.make_company('small', size_from=1, size_to=9),
+            'medium': self.make_company('medium', size_from=250, size_to=499),
+            'large': self.make_company('large', size_from=5000, size_to=0),
+            'unknown': self.make_company('unknown'),
+        }
+        for name, company in companies.items():
+            Job.objects.create(
+                board=JobBoard.PRACUJ, original_id=name, title='Analityk danych', url='', seniority='',
+                salary_text='', description='', requirements='', responsibilities='', company=company,
+            )
+
+        with patch('scraper.tasks.queue_mail_with_offers') as send_mail:
+            self.assertEqual(send_digest(), 2)
+
+        self.assertEqual(sorted(offer['company__name'] for offer in send_mail.call_args.args[0]), ['medium', 'unknown'])
@@ -0,0 +1,100 @@
+# jobscraper/scraper/tests/test_ingest.py
+from unittest import mock
+
+from django.db import DataError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from scraper.ingest import JobIngestor, content_hash
+from scraper.job_downloader import parse_listing
+from scraper.models import Company, Job, JobRevision
+from scraper.tests import FIXTURES
+
+
+class ChangeTrackingTestCase(TestCase):
+    def setUp(self):
+        _, self.records = parse_listing((FIXTURES / 'pracuj_offers_page1.html').read_text())
+        JobIngestor().ingest(self.records)
+
+    def test_offers_seen_again_unchanged_are_not_written(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(JobIngestor().ingest(self.records), [])
+
+        writes = [query['sql'] for query in captured if not query['sql'].startswith('SELECT')]
+        self.assertEqual(writes, [])
+        self.assertFalse(JobRevision.objects.exists())
+
+    def test_edited_offer_is_updated_with_a_revision(self):
+        edited = self.records[0]._replace(title='Starszy analityk danych', salary_text='')
+        job = Job.objects.get(original_id=edited.original_id)
+        Job.objects.filter(pk=job.pk).update(scored_at=timezone.now())
+
+        self.assertEqual(JobIngestor().ingest([edited] + self.records[1:]), [])
+
+        updated = Job.objects.get(pk=job.pk)
+        self.assertEqual((updated.title, updated.salary_text, updated.salary), ('Starszy analityk danych', '', None))
+        self.assertEqual(updated.content_hash, content_hash(edited))
+        # A new title needs a new score
+        self.assertIsNone(updated.scored_at)
+
+        [revision] = JobRevision.objects.all()
+        self.assertEqual(revision.job_id, job.pk)
+        self.assertEqual(revision.changes, {
+            'title': job.title, 'salary_text': job.salary_text, 'salary_id': job.salary_id,
+        })
+
+    def test_jobs_saved_without_hash_get_one_without_a_revision(self):
+        Job.objects.update(content_hash='')
+
+        JobIngestor().ingest(self.records)
+
+        self.assertEqual(
+            sorted(Job.objects.values_list('content_hash', flat=True)),
+            sorted(content_hash(record) for record in self.records),
+        )
+        self.assertFalse(JobRevision.objects.exists())
+
+    def test_rehashing_does_not_create_companies_or_revisions(self):
+        job = Job.objects.select_related('company').get(original_id=self.records[0].original_id)
+        # A second company of the same name makes the name ambiguous to the manager
+        Company.objects.create(name=job.company.name, url=job.company.url)
+        companies = Company.objects.count()
+        # Saved before content hashes, with a title normalized differently
+        Job.objects.update(content_hash='')
+        Job.objects.filter(pk=job.pk).update(title=job.title.upper())
+
+        JobIngestor().ingest(self.records)
+
+        self.assertEqual(Company.objects.count(), companies)
+        updated = Job.objects.get(pk=job.pk)
+        self.assertEqual((updated.title, updated.company_id), (self.records[0].title, job.company_id))
+        self.assertFalse(JobRevision.objects.exists())
+
+    def test_reset_caches_empties_them(self):
+        ingestor = JobIngestor()
+        ingestor.ingest([record._replace(original_id=f'{record.original_id}-new') for record in self.records])
+        self.assertTrue(ingestor._company_cache)
+
+        ingestor.reset_caches()
+
+        self.assertEqual((ingestor._company_cache, ingestor._salary_cache), ({}, {}))
+
+    def test_bad_record_does_not_lose_the_rest_of_the_page(self):
+        records = [record._replace(original_id=f'{record.original_id}-new') for record in self.records]
+        bad = records[1]
+        save = Job.save
+
+        def save_unless_bad(job, *args, **kwargs):
+            if job.original_id == bad.original_id:
+                raise DataError('value too long')
+            return save(job, *args, **kwargs)
+
+        failed = []
+        with mock.patch.object(Job.objects, 'bulk_create', side_effect=DataError('value too long')), \
+                mock.patch.object(Job, 'save', autospec=True, side_effect=save_unless_bad):
+            created = JobIngestor().ingest(records, failed)
+
+        self.assertEqual(len(created), len(records) - 1)
+        self.assertEqual(failed, [bad])
+        self.assertFalse(Job.objects.filter(original_id=bad.original_id).exists())
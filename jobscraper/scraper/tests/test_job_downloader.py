@@ -0,0 +1,215 @@
+# jobscraper/scraper/tests/test_job_downloader.py
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from unittest import mock
+
+from django.db import DatabaseError, connection
+from django.db.backends.signals import connection_created
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from scraper import work_queue
+from scraper.ingest import JobIngestor
+from scraper.job_downloader import PracujDownloader, parse_listing
+from scraper.models import Company, Job, JobBoard, PageWorkItem, Salary, WorkItemState
+from scraper.page_archive import list_segments, read_pages
+from scraper.tests import FIXTURES
+from scraper.tests.browser import StubSite
+
+SEARCH_URL = 'https://www.pracuj.pl/praca/warszawa;wp?rd=30&et=17'
+LISTING_PAGES = sorted(FIXTURES.glob('pracuj_offers_*.html'))
+
+# Upper bound on queries per listing page, from claiming the page to
+# completing it: queue bookkeeping, page cache, bulk lookups and inserts.
+# Salaries and companies are created once per distinct value on top of that.
+MAX_QUERIES_PER_PAGE = 30
+MAX_QUERIES_PER_NEW_VALUE = 3
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL of every thread's queries, unlike assertNumQueries."""
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(record)
+
+    connection_created.connect(install)
+    try:
+        with connection.execute_wrapper(record):
+            yield queries
+    finally:
+        connection_created.disconnect(install)
+
+
+class ListingParserTestCase(TestCase):
+    """
+    Golden tests of the listing parser over recorded pages.
+
+    After a deliberate parser change, regenerate the expected output with
+    UPDATE_GOLDEN=1 python manage.py test scraper.tests.test_job_downloader
+    and review the diff of the .expected.json files.
+    """
+
+    def test_fixture_pages_match_golden_output(self):
+        self.assertTrue(LISTING_PAGES)
+        for page in LISTING_PAGES:
+            with self.subTest(page=page.name):
+                offers_found, records = parse_listing(page.read_text())
+                parsed = {
+                    'offers_found': offers_found,
+                    'records': [record._asdict() for record in records],
+                }
+                golden = page.with_name(page.name.replace('.html', '.expected.json'))
+                if os.environ.get('UPDATE_GOLDEN'):
+                    golden.write_text(json.dumps(parsed, ensure_ascii=False, indent=2) + '\n')
+                self.assertEqual(parsed, json.loads(golden.read_text()))
+
+    def test_offers_without_id_are_not_counted(self):
+        offers_found, records = parse_listing((FIXTURES / 'pracuj_offers_page1.html').read_text())
+
+        self.assertEqual(offers_found, 5)
+        self.assertNotIn(None, [record.original_id for record in records])
+
+    def test_whole_document_is_parsed_like_the_offers_section(self):
+        section = (FIXTURES / 'pracuj_offers_page2.html').read_text()
+        document = f'<html><body><header>Pracuj.pl</header><main>{section}</main></body></html>'
+
+        self.assertEqual(parse_listing(document), parse_listing(section))
+
+    def test_page_without_offers_section(self):
+        self.assertEqual(parse_listing('<html><body>Przerwa techniczna</body></html>'), (0, []))
+
+
+class IngestQueriesTestCase(TestCase):
+    def setUp(self):
+        _, self.records = parse_listing((FIXTURES / 'pracuj_offers_page1.html').read_text())
+        # Companies and salaries of the page exist, like on any day but the first
+        JobIngestor().ingest(self.records)
+
+    def copies(self, count):
+        """New offers with the page's companies and salaries."""
+        return [
+            record._replace(original_id=f'{record.original_id}-{copy}')
+            for copy in range(count) for record in self.records
+        ]
+
+    def test_queries_do_not_grow_with_offers(self):
+        with count_queries() as page:
+            self.assertEqual(len(JobIngestor().ingest(self.copies(1))), 5)
+        # Bulk inserts are split at SQLite's variable limit, so stay well under it
+        with count_queries() as pages:
+            self.assertEqual(len(JobIngestor().ingest(self.copies(3)[5:])), 10)
+
+        self.assertEqual(len(page), len(pages), '\n'.join(pages))
+
+
+@override_settings(SCRAPER_PAGES_PER_BROWSER=2)
+class PracujDownloaderTestCase(TransactionTestCase):
+    # Jobs are saved from worker threads, which don't see a TestCase's transaction
+    def setUp(self):
+        self.downloader = PracujDownloader()
+        self.addCleanup(self.downloader.close)
+
+    def test_download_jobs_saves_offers_of_every_page(self):
+        site = StubSite({1: 'pracuj_offers_page1.html', 2: 'pracuj_offers_page2.html'})
+        with site.installed():
+            jobs_added = self.downloader.download_jobs(SEARCH_URL)
+
+        # The offer promoted on both pages is saved once; page 3 has no offers.
+        # Two browsers take the pages side by side, one page ahead.
+        self.assertEqual(jobs_added, 7)
+        self.assertEqual(Job.objects.filter(board=JobBoard.PRACUJ).count(), 7)
+        self.assertEqual(sorted(url.rsplit('=', 1)[1] for url in site.requests), ['1', '2', '3', '4'])
+        self.assertEqual(site.browsers_launched, site.browsers_closed)
+        # Every page is timed for the run summary
+        self.assertEqual(self.downloader.timings.summary()['page']['count'], 4)
+
+        job = Job.objects.select_related('company', 'salary').get(original_id='1003791234')
+        self.assertEqual(job.title, 'Analityk danych')
+        self.assertEqual(job.url, 'https://www.pracuj.pl/praca/,oferta,1003791234')
+        self.assertEqual(job.seniority, 'specjalista (mid / regular)')
+        self.assertEqual(job.salary.amount_from, 12000)
+        # Both ACME offers share the company, matched regardless of the legal form
+        self.assertEqual(Company.objects.filter(name='acme').count(), 1)
+
+    def test_failed_page_is_retried_through_the_queue(self):
+        site = StubSite({1: 'pracuj_offers_page1.html', 2: 'pracuj_offers_page2.html'}, failures={2: [503, None]})
+        with site.installed():
+            jobs_added = self.downloader.download_jobs(SEARCH_URL)
+
+        self.assertEqual(jobs_added, 7)
+        self.assertFalse(PageWorkItem.objects.exclude(state=WorkItemState.DONE).exists())
+
+    def test_max_pages(self):
+        site = StubSite({1: 'pracuj_offers_page1.html', 2: 'pracuj_offers_page2.html'})
+        with site.installed():
+            self.assertEqual(self.downloader.download_jobs(SEARCH_URL, max_pages=1), 5)
+
+        self.assertEqual(len(site.requests), 1)
+
+    @override_settings(SCRAPER_PARTITION_PAGE_BUDGET=1, SCRAPER_PARTITION_FACETS='wm=hybrid,home-office')
+    def test_large_search_is_partitioned(self):
+        site = StubSite({1: 'pracuj_offers_page1.html', 2: 'pracuj_offers_page2.html'}, searches={
+            'wm=hybrid': {1: 'pracuj_offers_page1.html'},
+            'wm=home-office': {1: 'pracuj_offers_page2.html'},
+        })
+        with site.installed():
+            jobs_added = self.downloader.download_jobs(SEARCH_URL)
+
+        # The offer in both parts is saved once
+        self.assertEqual(jobs_added, 7)
+        self.assertEqual(Job.objects.filter(board=JobBoard.PRACUJ).count(), 7)
+        self.assertEqual(
+            set(PageWorkItem.objects.values_list('search_url', 'page_number')),
+            {(f'{SEARCH_URL}&wm={mode}', page) for mode in ['hybrid', 'home-office'] for page in [1, 2, 3]},
+        )
+        self.assertEqual(site.browsers_launched, site.browsers_closed)
+
+    def test_fetched_pages_are_archived(self):
+        site = StubSite({1: 'pracuj_offers_page1.html', 2: 'pracuj_offers_page2.html'})
+        with tempfile.TemporaryDirectory() as directory, override_settings(PAGE_ARCHIVE_DIR=directory):
+            with site.installed():
+                self.downloader.download_jobs(SEARCH_URL)
+
+            [segment] = list_segments(directory)
+            pages = list(read_pages(segment))
+
+        self.assertEqual(sorted((entry.search_url, entry.page_number) for entry, _ in pages),
+                         [(SEARCH_URL, 1), (SEARCH_URL, 2), (SEARCH_URL, 3), (SEARCH_URL, 4)])
+        [first_page] = [content for entry, content in pages if entry.page_number == 1]
+        self.assertEqual(first_page, (FIXTURES / 'pracuj_offers_page1.html').read_text())
+
+    def test_queries_per_page_are_bounded(self):
+        site = StubSite({1: 'pracuj_offers_page1.html', 2: 'pracuj_offers_page2.html'})
+        with site.installed(), count_queries() as queries:
+            self.downloader.download_jobs(SEARCH_URL)
+
+        pages = len(site.requests)
+        new_values = Salary.objects.count() + Company.objects.count()
+        self.assertLessEqual(
+            len(queries), MAX_QUERIES_PER_PAGE * pages + MAX_QUERIES_PER_NEW_VALUE * new_values,
+            f"{len(queries)} queries for {pages} pages and {new_values} new salaries and companies",
+        )
+
+    def test_unchanged_pages_are_skipped_once_saved(self):
+        site = StubSite({1: 'pracuj_offers_page1.html', 2: 'pracuj_offers_page2.html'})
+
+        def download():
+            self.downloader.stats = dict.fromkeys(self.downloader.stats, 0)
+            return self.downloader.download_jobs(SEARCH_URL, run_key=work_queue.new_run_key())
+
+        with site.installed():
+            with mock.patch.object(JobIngestor, 'ingest', side_effect=DatabaseError('disk full')):
+                self.assertEqual(download(), 0)
+            # The pages with offers weren't saved, so they are processed again
+            self.assertEqual(download(), 7)
+            self.assertEqual(self.downloader.stats['pages_changed'], 2)
+
+            self.assertEqual(download(), 0)
+            self.assertEqual(self.downloader.stats['pages_changed'], 0)
@@ -0,0 +1,27 @@
+# jobscraper/scraper/tests/test_memory.py
+from django.test import TestCase
+
+from scraper.memory import MemoryGovernor, read_rss
+
+
+class MemoryGovernorTestCase(TestCase):
+    def test_reads_own_rss(self):
+        rss = read_rss()
+        if rss is None:
+            self.skipTest('/proc is not available')
+        self.assertGreater(rss, 0)
+
+    def test_stage_peaks_and_batch_shrinking(self):
+        governor = MemoryGovernor(python_budget_mb=1, browser_budget_mb=1, pages_per_browser=3)
+        if not governor.enabled:
+            self.skipTest('/proc is not available')
+
+        with governor.stage('parse'):
+            pass
+        self.assertGreater(governor.peaks['parse'][0], 0)
+
+        # Any real Python process is over a 1 MB budget
+        governor.after_batch()
+        governor.after_batch()
+        governor.after_batch()
+        self.assertEqual(governor.pages_per_browser, 1)
@@ -0,0 +1,139 @@
+# jobscraper/scraper/tests/test_outbox.py
+import datetime
+import os
+import smtplib
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from scraper.models import EmailOutbox, Job, JobBoard, WorkItemState
+from scraper.outbox import claim_batch, enqueue, message_id, send_outbox
+from scraper.tasks import send_digest
+
+
+class CountingBackend(EmailBackend):
+    """Locmem backend counting connections, failing the first `failures` sends."""
+
+    def __init__(self, failures=0, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.opened = 0
+        self.is_open = False
+
+    def open(self):
+        if self.is_open:
+            return False
+        self.is_open = True
+        self.opened += 1
+        return True
+
+    def close(self):
+        self.is_open = False
+
+    def send_messages(self, messages):
+        if self.failures:
+            self.failures -= 1
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        return super().send_messages(messages)
+
+
+@patch.dict(os.environ, {'EMAIL_RECIPIENTS': 'me@example.com'})
+class OutboxTestCase(TestCase):
+    def make_job(self, original_id, title):
+        return Job.objects.create(
+            board=JobBoard.PRACUJ, original_id=original_id, title=title, url='', seniority='',
+            salary_text='', description='', requirements='', responsibilities='',
+        )
+
+    @override_settings(SCORING_PROFILE='analityk danych', DIGEST_MIN_SCORE=0.0)
+    def test_digest_is_queued_once_and_sent_later(self):
+        self.make_job('1', 'Analityk danych')
+
+        self.assertEqual(send_digest(), 1)
+        self.assertEqual(mail.outbox, [])
+        # Running the digest again doesn't queue the same offers twice
+        send_digest()
+        [queued] = EmailOutbox.objects.all()
+        self.assertEqual(queued.state, WorkItemState.PENDING)
+
+        self.assertEqual(send_outbox(), 1)
+        [message] = mail.outbox
+        self.assertEqual(message.to, ['me@example.com'])
+        self.assertIn('Analityk danych', message.body)
+        self.assertEqual(message.extra_headers['Message-ID'], message_id(queued.idempotency_key))
+        self.assertEqual(send_outbox(), 0)
+
+    @override_settings(SCORING_PROFILE='analityk danych', DIGEST_MIN_SCORE=0.0)
+    def test_digest_sends_each_offer_once(self):
+        first = self.make_job('1', 'Analityk danych')
+        # Scraped just before midnight, a day earlier
+        late = self.make_job('2', 'Starszy analityk danych')
+        Job.objects.filter(pk=late.pk).update(created_at=timezone.now() - datetime.timedelta(days=1))
+
+        self.assertEqual(send_digest(), 2)
+        self.assertFalse(Job.objects.filter(digest_sent_at__isnull=False).exists())
+        send_outbox()
+        self.assertEqual(Job.objects.filter(digest_sent_at__isnull=False).count(), 2)
+
+        # A repost of a sent offer isn't sent again, a new offer is
+        repost = self.make_job('3', 'Analityk danych')
+        Job.objects.filter(pk=repost.pk).update(cluster=first)
+        Job.objects.filter(pk=first.pk).update(cluster=first)
+        self.make_job('4', 'Młodszy analityk danych')
+        with patch('scraper.tasks.queue_mail_with_offers') as queue_mail:
+            self.assertEqual(send_digest(), 1)
+        self.assertEqual([offer['title'] for offer in queue_mail.call_args.args[0]], ['Młodszy analityk danych'])
+
+    def test_one_connection_for_all_emails(self):
+        for number in range(3):
+            enqueue(f'test:{number}', 'Offers', '<p>Offers</p>', ['me@example.com'])
+        connection = CountingBackend()
+
+        self.assertEqual(send_outbox(batch_size=2, connection=connection), 3)
+        self.assertEqual(connection.opened, 1)
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_email_is_retried_with_backoff_then_given_up(self):
+        enqueue('test:1', 'Offers', '<p>Offers</p>', ['me@example.com'])
+        enqueue('test:2', 'Offers', '<p>Offers</p>', ['me@example.com'])
+        connection = CountingBackend(failures=1)
+
+        # The failure reopens the connection for the next email
+        self.assertEqual(send_outbox(connection=connection), 1)
+        self.assertEqual(connection.opened, 2)
+        failed = EmailOutbox.objects.get(idempotency_key='test:1')
+        self.assertEqual((failed.state, failed.attempts), (WorkItemState.PENDING, 1))
+        self.assertGreater(failed.next_attempt_at, timezone.now())
+        self.assertIn('unexpectedly closed', failed.last_error)
+
+        # Not due yet
+        self.assertEqual(send_outbox(connection=CountingBackend(failures=1)), 0)
+
+        EmailOutbox.objects.filter(pk=failed.pk).update(next_attempt_at=timezone.now() - datetime.timedelta(seconds=1))
+        self.assertEqual(send_outbox(connection=CountingBackend(failures=1)), 0)
+        failed.refresh_from_db()
+        self.assertEqual((failed.state, failed.attempts), (WorkItemState.FAILED, 2))
+
+        # Queueing it again gives it a fresh set of attempts
+        self.assertTrue(enqueue('test:1', 'Offers', '<p>More offers</p>', ['me@example.com']))
+        self.assertFalse(enqueue('test:1', 'Offers', '<p>More offers</p>', ['me@example.com']))
+        self.assertEqual(send_outbox(), 1)
+        self.assertIn('More offers', mail.outbox[-1].body)
+
+    def test_email_reclaimed_after_its_lease_expired_is_not_sent_twice(self):
+        enqueue('test:1', 'Offers', '<p>Offers</p>', ['me@example.com'])
+        enqueue('test:2', 'Offers', '<p>Offers</p>', ['me@example.com'])
+        [first, second] = claim_batch(2)
+        # The first send took so long that another sender reclaimed the second email
+        EmailOutbox.objects.filter(pk=second.pk).update(lease_expires_at=timezone.now() - datetime.timedelta(seconds=1))
+        [reclaimed] = claim_batch(2)
+        self.assertEqual((reclaimed.pk, reclaimed.attempts), (second.pk, 2))
+
+        with patch('scraper.outbox.claim_batch', side_effect=[[first, second], []]):
+            self.assertEqual(send_outbox(), 1)
+        self.assertEqual([message.to for message in mail.outbox], [['me@example.com']])
+        second.refresh_from_db()
+        self.assertEqual((second.state, second.attempts), (WorkItemState.IN_PROGRESS, 2))
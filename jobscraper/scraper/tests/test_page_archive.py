@@ -0,0 +1,97 @@
+# jobscraper/scraper/tests/test_page_archive.py
+import datetime
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from scraper.ingest import JobIngestor
+from scraper.job_downloader import parse_listing
+from scraper.models import Job
+from scraper.page_archive import (
+    PageArchive, list_segments, open_segment, prune_segments, read_index, read_pages, reextract_jobs,
+)
+from scraper.tests import FIXTURES
+
+SEARCH_URL = 'https://www.pracuj.pl/praca/warszawa;wp?rd=30&et=17'
+
+
+class PageArchiveTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.pages = [(FIXTURES / f'pracuj_offers_page{n}.html').read_text() for n in (1, 2)]
+
+    def test_pages_are_read_back_by_offset(self):
+        with open_segment(self.directory) as archive:
+            for number, content in enumerate(self.pages, start=1):
+                archive.append(SEARCH_URL, number, content)
+
+        [segment] = list_segments(self.directory)
+        self.assertEqual([content for _, content in read_pages(segment)], self.pages)
+        entries = read_index(segment)
+        self.assertEqual([entry.page_number for entry in entries], [1, 2])
+        self.assertEqual(entries[1].offset, entries[0].length)
+        self.assertLess(segment.stat().st_size, sum(len(content) for content in self.pages) / 3)
+
+    def test_old_segments_are_pruned(self):
+        old = self.directory / 'pages-20200301T060000-1.zst'
+        with PageArchive(old) as archive:
+            archive.append(SEARCH_URL, 1, self.pages[0])
+        with open_segment(self.directory) as archive:
+            archive.append(SEARCH_URL, 1, self.pages[0])
+
+        self.assertEqual(prune_segments(self.directory, days=0), 0)
+        self.assertEqual(prune_segments(self.directory, days=30), 1)
+        self.assertFalse(old.exists() or old.with_suffix('.idx').exists())
+        self.assertEqual(len(list_segments(self.directory)), 1)
+
+    def test_partial_writes_are_ignored(self):
+        path = self.directory / 'pages-20250301T060000-1.zst'
+        with PageArchive(path) as archive:
+            archive.append(SEARCH_URL, 1, self.pages[0])
+        # A crash while appending the next page
+        with open(path, 'ab') as f:
+            f.write(b'\x28\xb5\x2f\xfd\x00')
+        with open(path.with_suffix('.idx'), 'a') as f:
+            f.write('{"search_url": "')
+
+        self.assertEqual([content for _, content in read_pages(path)], self.pages[:1])
+
+    def test_segments_since(self):
+        for name in ['pages-20250228T230000-1', 'pages-20250301T060000-1', 'pages-20250302T060000-1']:
+            PageArchive(self.directory / f'{name}.zst').close()
+
+        self.assertEqual(
+            [path.name for path in list_segments(self.directory, since=datetime.date(2025, 3, 1))],
+            ['pages-20250301T060000-1.zst', 'pages-20250302T060000-1.zst'],
+        )
+
+    def test_reextract_fixes_jobs_saved_by_an_older_parser(self):
+        records = parse_listing(self.pages[0])[1]
+        JobIngestor().ingest(records)
+        # What a parser broken by a markup change saved
+        Job.objects.filter(original_id=records[0].original_id).update(title='Unknown Position', seniority='')
+        Job.objects.filter(original_id=records[1].original_id).update(salary_text='', salary=None)
+
+        with PageArchive(self.directory / 'pages-20250301T060000-1.zst') as archive:
+            archive.append(SEARCH_URL, 1, self.pages[0])
+        with PageArchive(self.directory / 'pages-20250302T060000-1.zst') as archive:
+            archive.append(SEARCH_URL, 1, self.pages[1])
+
+        with self.assertNumQueries(0):
+            stats = reextract_jobs(self.directory, workers=2, dry_run=True)
+        self.assertEqual(stats, {'segments': 2, 'pages': 2, 'offers': 7, 'updated': 0})
+
+        out = StringIO()
+        call_command('reextract_jobs', directory=str(self.directory), workers=2, stdout=out)
+        self.assertIn('Updated 2 jobs', out.getvalue())
+
+        job = Job.objects.get(original_id=records[0].original_id)
+        self.assertEqual((job.title, job.seniority), ('Analityk danych', 'specjalista (mid / regular)'))
+        self.assertIsNotNone(Job.objects.get(original_id=records[1].original_id).salary)
+        # Offers that were never saved are not created
+        self.assertEqual(Job.objects.count(), 5)
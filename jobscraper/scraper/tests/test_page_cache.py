@@ -0,0 +1,37 @@
+# jobscraper/scraper/tests/test_page_cache.py
+import datetime
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from scraper import page_cache
+from scraper.models import PageFingerprint
+
+
+class PageCacheTestCase(TestCase):
+    url = 'https://www.pracuj.pl/praca?et=17'
+
+    def test_unchanged_page_hits(self):
+        html = '<div data-test="section-offers"><div><div data-test-offerid="1"></div></div></div>'
+        page_fingerprint = page_cache.fingerprint(html)
+        self.assertIsNone(page_cache.lookup(self.url, 1, page_fingerprint))
+
+        page_cache.store(self.url, 1, page_fingerprint, offers_found=1)
+        self.assertEqual(page_cache.lookup(self.url, 1, page_fingerprint), 1)
+        self.assertIsNone(page_cache.lookup(self.url, 2, page_fingerprint))
+        self.assertIsNone(page_cache.lookup(self.url, 1, page_cache.fingerprint(html.replace('"1"', '"2"'))))
+
+    def test_fingerprint_ignores_markup_around_the_offers(self):
+        html = ('<div data-test="section-offers"><div><div data-test-offerid="1">'
+                '<a href="https://www.pracuj.pl/praca/analityk,oferta,1?s=abc">Analityk</a></div></div></div>')
+        restyled = html.replace('<div><div', '<div class="promoted"><div').replace('s=abc', 's=def')
+        self.assertEqual(page_cache.fingerprint(html), page_cache.fingerprint(restyled))
+        self.assertNotEqual(page_cache.fingerprint(html), page_cache.fingerprint(html.replace(',1?', ',3?')))
+
+    @override_settings(SCRAPER_PAGE_CACHE_TTL_HOURS=1)
+    def test_expired_fingerprints_are_evicted(self):
+        page_cache.store(self.url, 1, 'abc', offers_found=20)
+        PageFingerprint.objects.update(updated_at=timezone.now() - datetime.timedelta(hours=2))
+
+        self.assertIsNone(page_cache.lookup(self.url, 1, 'abc'))
+        self.assertEqual(page_cache.evict_expired(), 1)
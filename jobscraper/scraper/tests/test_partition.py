@@ -0,0 +1,111 @@
+# jobscraper/scraper/tests/test_partition.py
+import asyncio
+
+from django.test import SimpleTestCase
+
+from scraper.partition import SearchSize, has_facet, parse_facets, plan_partitions, split_search, with_param
+
+SEARCH_URL = 'https://www.pracuj.pl/praca/warszawa;wp?rd=30&et=1,17'
+FACETS = {'wm': ['hybrid', 'home-office']}
+
+
+def search_sizes(sizes):
+    """A count_searches for plan_partitions, recording the URLs it was asked about."""
+    asked = []
+
+    async def count_searches(urls):
+        asked.append(list(urls))
+        return [SearchSize(*sizes[url]) if url in sizes else None for url in urls]
+
+    count_searches.asked = asked
+    return count_searches
+
+
+class PartitionTestCase(SimpleTestCase):
+    def plan(self, sizes, facets=FACETS, max_depth=3):
+        """Plan with a budget of 10 pages; sizes are (pages, offers) by URL."""
+        count_searches = search_sizes(sizes)
+        partitions = asyncio.run(plan_partitions(
+            SEARCH_URL, count_searches, page_budget=10, facets=facets, max_depth=max_depth
+        ))
+        return partitions, count_searches.asked
+
+    def test_parse_facets(self):
+        self.assertEqual(parse_facets('wm=hybrid, home-office;et=1,3;;broken'),
+                         {'wm': ['hybrid', 'home-office'], 'et': ['1', '3']})
+
+    def test_with_param_replaces_or_appends(self):
+        self.assertEqual(with_param(SEARCH_URL, 'et', '17'), 'https://www.pracuj.pl/praca/warszawa;wp?rd=30&et=17')
+        self.assertEqual(with_param(SEARCH_URL, 'wm', 'hybrid'),
+                         'https://www.pracuj.pl/praca/warszawa;wp?rd=30&et=1%2C17&wm=hybrid')
+
+    def test_has_facet_in_query_or_path(self):
+        self.assertTrue(has_facet(SEARCH_URL, 'et'))
+        self.assertTrue(has_facet('https://www.pracuj.pl/praca/warszawa;wm,home-office', 'wm'))
+        self.assertFalse(has_facet(SEARCH_URL, 'wm'))
+
+    def test_split_search_splits_multiple_values_first(self):
+        self.assertEqual(split_search(SEARCH_URL, FACETS), [
+            'https://www.pracuj.pl/praca/warszawa;wp?rd=30&et=1',
+            'https://www.pracuj.pl/praca/warszawa;wp?rd=30&et=17',
+        ])
+        self.assertEqual(split_search('https://www.pracuj.pl/praca?et=17', FACETS), [
+            'https://www.pracuj.pl/praca?et=17&wm=hybrid',
+            'https://www.pracuj.pl/praca?et=17&wm=home-office',
+        ])
+        self.assertIsNone(split_search('https://www.pracuj.pl/praca?et=17&wm=hybrid', FACETS))
+
+    def test_search_within_budget_is_not_split(self):
+        partitions, asked = self.plan({SEARCH_URL: (8, 160)})
+
+        self.assertEqual(partitions, [(SEARCH_URL, 8)])
+        self.assertEqual(asked, [[SEARCH_URL]])
+
+    def test_large_search_is_split_until_within_budget(self):
+        et1 = with_param(SEARCH_URL, 'et', '1')
+        et17 = with_param(SEARCH_URL, 'et', '17')
+        partitions, asked = self.plan({
+            SEARCH_URL: (30, 600),
+            et1: (4, 80),
+            et17: (26, 520),
+            with_param(et17, 'wm', 'hybrid'): (16, 320),
+            with_param(et17, 'wm', 'home-office'): (10, 200),
+            with_param(et17, 'wm', 'mobile'): (0, 0),
+        }, facets={'wm': ['hybrid', 'home-office', 'mobile']}, max_depth=2)
+
+        # The hybrid part is still over budget at the maximum depth, but it is
+        # kept; only the empty part is left out
+        self.assertEqual(partitions, [
+            (et1, 4), (with_param(et17, 'wm', 'hybrid'), 16), (with_param(et17, 'wm', 'home-office'), 10),
+        ])
+        # Every level is counted in one call
+        self.assertEqual(len(asked), 3)
+
+    def test_split_missing_offers_is_not_used(self):
+        # Offers without a work mode would be lost
+        et1 = with_param(SEARCH_URL, 'et', '1')
+        et17 = with_param(SEARCH_URL, 'et', '17')
+        partitions, _ = self.plan({
+            SEARCH_URL: (30, 600),
+            et1: (5, 100),
+            et17: (25, 500),
+            with_param(et17, 'wm', 'hybrid'): (10, 200),
+            with_param(et17, 'wm', 'home-office'): (9, 180),
+        })
+
+        self.assertEqual(partitions, [(et1, 5), (et17, 25)])
+
+    def test_split_short_of_a_few_offers_is_not_used(self):
+        # The parts have as many pages as the search, but one offer fewer
+        partitions, _ = self.plan({
+            SEARCH_URL: (11, 201),
+            with_param(SEARCH_URL, 'et', '1'): (6, 101),
+            with_param(SEARCH_URL, 'et', '17'): (5, 99),
+        })
+
+        self.assertEqual(partitions, [(SEARCH_URL, 11)])
+
+    def test_split_with_unknown_count_is_not_used(self):
+        partitions, _ = self.plan({SEARCH_URL: (30, 600), with_param(SEARCH_URL, 'et', '1'): (20, 400)})
+
+        self.assertEqual(partitions, [(SEARCH_URL, 30)])
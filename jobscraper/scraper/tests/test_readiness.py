@@ -0,0 +1,76 @@
+# jobscraper/scraper/tests/test_readiness.py
+import asyncio
+
+from django.test import SimpleTestCase, override_settings
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from scraper.job_downloader import OFFERS_SELECTOR
+from scraper.readiness import LatencyHistogram, PageTimings, ResponseReadiness
+from scraper.tests.browser import StubPage, StubSite
+
+SEARCH_URL = 'https://www.pracuj.pl/praca/warszawa;wp?rd=30&et=17'
+
+
+class LatencyHistogramTestCase(SimpleTestCase):
+    def test_buckets_and_percentiles(self):
+        histogram = LatencyHistogram()
+        for seconds in [0.1, 0.3, 0.3, 0.8, 1.5, 30]:
+            histogram.record(seconds)
+
+        summary = histogram.summary()
+        self.assertEqual(summary['count'], 6)
+        self.assertEqual(summary['p50'], 0.3)
+        self.assertEqual(summary['p95'], 30)
+        self.assertEqual(summary['histogram'], {
+            '<=0.25s': 1, '<=0.5s': 2, '<=1s': 1, '<=2s': 1, '<=5s': 0, '<=10s': 0, '<=20s': 0, '>20s': 1,
+        })
+
+    def test_reset_keeps_samples(self):
+        histogram = LatencyHistogram()
+        histogram.record(2)
+        histogram.reset()
+
+        self.assertEqual(histogram.summary()['count'], 0)
+        self.assertEqual(histogram.percentile(95), 2)
+
+
+@override_settings(SCRAPER_TIMEOUT_MIN_SAMPLES=3, SCRAPER_TIMEOUT_P95_FACTOR=3, SCRAPER_TIMEOUT_MIN_SECONDS=1)
+class PageTimingsTestCase(SimpleTestCase):
+    def timings(self, *latencies):
+        timings = PageTimings()
+        for seconds in latencies:
+            timings.record('navigate', seconds)
+        return timings
+
+    def test_ceiling_until_enough_samples(self):
+        self.assertEqual(self.timings(0.5, 0.5).timeout('navigate'), 20000)
+
+    def test_timeout_follows_p95(self):
+        self.assertEqual(self.timings(0.5, 0.5, 2).timeout('navigate'), 6000)
+
+    def test_timeout_is_bounded(self):
+        self.assertEqual(self.timings(0.1, 0.1, 0.1).timeout('navigate'), 1000)
+        self.assertEqual(self.timings(9, 9, 9).timeout('navigate'), 20000)
+
+
+class ResponseReadinessTestCase(SimpleTestCase):
+    def wait(self, url_part, timeout=1000):
+        page = StubPage(StubSite({1: 'pracuj_offers_page1.html'}))
+
+        async def load():
+            ready = ResponseReadiness(OFFERS_SELECTOR, url_part).watch(page)
+            await page.goto(SEARCH_URL)
+            await ready(timeout)
+
+        asyncio.run(load())
+        return page
+
+    def test_ready_after_matching_response(self):
+        page = self.wait('/praca/warszawa')
+
+        # The listener is removed once the page is ready
+        self.assertEqual(page.listeners['response'], [])
+
+    def test_times_out_without_matching_response(self):
+        with self.assertRaises(PlaywrightTimeoutError):
+            self.wait('/api/offers', timeout=10)
@@ -0,0 +1,52 @@
+# jobscraper/scraper/tests/test_retention.py
+import datetime
+import gzip
+import json
+import tempfile
+
+from django.test import TestCase
+from django.utils import timezone
+
+from scraper.ingest import JobIngestor, JobRecord
+from scraper.models import ArchivedJob, Job, JobBoard
+from scraper.retention import archive_jobs
+
+
+class RetentionTestCase(TestCase):
+    def setUp(self):
+        records = [
+            JobRecord(JobBoard.PRACUJ, str(i), f'Analityk {i}', '', 'acme', '', 'mid', '')
+            for i in range(5)
+        ]
+        self.records = records
+        JobIngestor().ingest(records)
+        # The first three are old
+        Job.objects.filter(original_id__in=['0', '1', '2']).update(
+            created_at=timezone.now() - datetime.timedelta(days=100),
+        )
+
+    def test_old_jobs_move_to_archive_and_are_not_downloaded_again(self):
+        clusters = dict(Job.objects.filter(original_id__in=['3', '4']).values_list('id', 'cluster_id'))
+        self.assertEqual(archive_jobs(days=90, batch_size=2), 3)
+
+        self.assertEqual(sorted(Job.objects.values_list('original_id', flat=True)), ['3', '4'])
+        self.assertEqual(sorted(ArchivedJob.objects.values_list('original_id', flat=True)), ['0', '1', '2'])
+        self.assertEqual(ArchivedJob.objects.get(original_id='0').company_name, 'acme')
+        # Cluster ids survive even if they point at an archived job
+        self.assertEqual(dict(Job.objects.values_list('id', 'cluster_id')), clusters)
+        self.assertEqual(JobIngestor().ingest(self.records), [])
+
+    def test_archive_to_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(archive_jobs(days=90, directory=directory), 3)
+            month = timezone.now() - datetime.timedelta(days=100)
+            with gzip.open(f'{directory}/jobs-{month:%Y-%m}.jsonl.gz', 'rt') as f:
+                rows = [json.loads(line) for line in f]
+
+        self.assertEqual(sorted(row['original_id'] for row in rows), ['0', '1', '2'])
+        self.assertFalse(ArchivedJob.objects.exists())
+        self.assertEqual(JobIngestor().ingest(self.records), [])
+
+    def test_zero_days_archives_everything(self):
+        self.assertEqual(archive_jobs(days=0), 5)
+        self.assertFalse(Job.objects.exists())
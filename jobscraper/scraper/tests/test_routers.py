@@ -0,0 +1,79 @@
+# jobscraper/scraper/tests/test_routers.py
+import datetime
+import io
+import os
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from scraper.models import EmailOutbox, Job
+from scraper.routers import ReplicaRouter, replica_reads
+from scraper.tasks import send_digest
+
+
+def make_job(database, pk, title, created_at):
+    Job.objects.using(database).create(
+        pk=pk, board=3, original_id=str(pk), title=title, url='', description='', requirements='',
+        responsibilities='', seniority='', salary_text='',
+    )
+    Job.objects.using(database).filter(pk=pk).update(created_at=created_at)
+
+
+@override_settings(REPLICA_DATABASE='replica', REPLICA_MAX_LAG_SECONDS=60)
+class ReplicaRoutingTestCase(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.now = timezone.now()
+        # Replicated
+        for database in ('default', 'replica'):
+            make_job(database, 1, 'Analityk danych', self.now - datetime.timedelta(hours=1))
+
+    def test_reads_go_to_a_fresh_replica_and_writes_to_the_primary(self):
+        with replica_reads() as alias:
+            self.assertEqual(alias, 'replica')
+            job = Job.objects.get()
+            job.title = 'Starszy analityk danych'
+            job.save()
+
+        self.assertEqual(Job.objects.get().title, 'Starszy analityk danych')
+        self.assertEqual(Job.objects.using('replica').get().title, 'Analityk danych')
+        self.assertEqual(Job.objects.all().db, 'default')
+
+    def test_lagging_replica_is_not_used(self):
+        make_job('default', 2, 'Inżynier danych', self.now)
+
+        with replica_reads() as alias:
+            self.assertEqual(alias, 'default')
+            self.assertEqual(Job.objects.count(), 2)
+
+    def test_reporting_commands_read_from_the_replica(self):
+        # Caught up, with a job the primary no longer has
+        make_job('replica', 2, 'Inżynier danych', self.now - datetime.timedelta(minutes=30))
+        out = io.StringIO()
+
+        call_command('count_jobs', stdout=out)
+
+        self.assertIn('Total jobs: 2', out.getvalue())
+
+    @override_settings(REPLICA_DATABASE='')
+    def test_without_a_replica_reads_stay_on_the_primary(self):
+        with replica_reads() as alias:
+            self.assertEqual(alias, 'default')
+            self.assertEqual(Job.objects.all().db, 'default')
+
+    @override_settings(SCORING_PROFILE='analityk danych', DIGEST_MIN_SCORE=0.0)
+    @patch.dict(os.environ, {'EMAIL_RECIPIENTS': 'me@example.com'})
+    def test_digest_checks_sent_and_queued_offers_on_the_primary(self):
+        self.assertEqual(send_digest(), 1)
+        # Queued on the primary only; the replica still shows the offer unsent
+        self.assertEqual(send_digest(), 0)
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    def test_replica_is_never_migrated(self):
+        router = ReplicaRouter()
+
+        self.assertIs(router.allow_migrate('replica', 'scraper', model_name='job'), False)
+        self.assertIsNone(router.allow_migrate('default', 'scraper', model_name='job'))
@@ -0,0 +1,71 @@
+# jobscraper/scraper/tests/test_salary.py
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.test import TestCase
+
+from scraper.models import Job, JobBoard, Salary
+from scraper.salary import ParsedSalary, parse_salary
+
+
+class SalaryParsingTestCase(TestCase):
+    def test_parse_salary(self):
+        cases = {
+            '5 000–7 000 zł brutto / mies.': ParsedSalary(5000, 7000, 'PLN', 'month', '', True),
+            '120–150 zł netto (+ VAT) / godz.': ParsedSalary(120, 150, 'PLN', 'hour', 'b2b', False),
+            'od 10 000 zł brutto / mies.': ParsedSalary(10000, None, 'PLN', 'month', '', True),
+            '60 000 EUR rocznie': ParsedSalary(60000, 60000, 'EUR', 'year', '', None),
+            '25k-30k PLN B2B': ParsedSalary(25000, 30000, 'PLN', 'month', 'b2b', None),
+            'umowa o pracę: 9 500,50 zł brutto': ParsedSalary(9500.5, 9500.5, 'PLN', 'month', 'uop', True),
+            '30.50 - 40.50 zł/h': ParsedSalary(30.5, 40.5, 'PLN', 'hour', '', None),
+            '8.500 - 12.000 PLN': ParsedSalary(8500, 12000, 'PLN', 'month', '', None),
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(parse_salary(text), expected)
+        self.assertIsNone(parse_salary(''))
+        self.assertIsNone(parse_salary('wynagrodzenie do uzgodnienia'))
+
+    def test_salary_rows_are_shared_and_monthly(self):
+        hourly = Salary.objects.get_for_parsed(parse_salary('120–150 zł netto (+ VAT) / godz.'))
+        self.assertEqual((hourly.monthly_from, hourly.monthly_to), (120 * 168, 150 * 168))
+        self.assertEqual(Salary.objects.get_for_parsed(parse_salary('120 - 150 zł netto + VAT / godz.')), hourly)
+
+        # Amounts are rounded, monthly rates are not
+        fractional = Salary.objects.get_for_parsed(parse_salary('30.50 - 40.50 zł/h'))
+        self.assertEqual((fractional.amount_from, fractional.amount_to), (30, 40))
+        self.assertEqual((fractional.monthly_from, fractional.monthly_to), (round(30.5 * 168), round(40.5 * 168)))
+
+    def test_backfill_command(self):
+        for i, text in enumerate(['5 000–7 000 zł brutto / mies.', '5 000–7 000 zł brutto / mies.', '']):
+            Job.objects.create(
+                board=JobBoard.PRACUJ, original_id=str(i), title='Analyst', url='', seniority='',
+                salary_text=text, description='', requirements='', responsibilities='',
+            )
+
+        call_command('parse_salaries', chunk_size=1, stdout=StringIO())
+
+        self.assertEqual(Job.objects.filter(salary__monthly_to=7000).count(), 2)
+        self.assertEqual(Salary.objects.count(), 1)
+
+    def test_concurrent_create_returns_the_existing_row(self):
+        parsed = parse_salary('od 10 000 zł brutto / mies.')
+        existing = Salary.objects.get_for_parsed(parsed)
+        # Another process created the row after this one's lookup missed
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Salary.objects.create(amount_from=10000, amount_to=None, currency='PLN', period='month', is_gross=True)
+
+        original_get = QuerySet.get
+        misses = iter([True])
+
+        def get(queryset, *args, **kwargs):
+            if next(misses, False):
+                raise Salary.DoesNotExist
+            return original_get(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'get', get):
+            self.assertEqual(Salary.objects.get_for_parsed(parsed), existing)
+        self.assertEqual(Salary.objects.count(), 1)
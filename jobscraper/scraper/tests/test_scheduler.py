@@ -0,0 +1,112 @@
+# jobscraper/scraper/tests/test_scheduler.py
+import contextlib
+import datetime
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from scraper.models import RunStatus, SchedulerRun
+from scraper.scheduler import CronSchedule, Scheduler
+
+
+class CronScheduleTestCase(TestCase):
+    def test_next_after(self):
+        schedule = CronSchedule('30 6 * * *')
+        moment = datetime.datetime(2025, 3, 1, 6, 30, tzinfo=datetime.timezone.utc)
+        self.assertEqual(schedule.next_after(moment), datetime.datetime(2025, 3, 2, 6, 30, tzinfo=datetime.timezone.utc))
+
+    def test_steps_lists_and_weekdays(self):
+        # Every 15 minutes during working hours on weekdays
+        schedule = CronSchedule('*/15 9-17 * * 1-5')
+        friday_evening = datetime.datetime(2025, 2, 28, 17, 50, tzinfo=datetime.timezone.utc)
+        self.assertEqual(
+            schedule.next_after(friday_evening),
+            datetime.datetime(2025, 3, 3, 9, 0, tzinfo=datetime.timezone.utc),
+        )
+
+    def test_starred_day_fields_are_not_restricted(self):
+        # Odd days that are Mondays, not odd days or Mondays
+        schedule = CronSchedule('0 0 */2 * 1')
+        monday = datetime.datetime(2025, 3, 3, 0, 0, tzinfo=datetime.timezone.utc)
+        self.assertEqual(schedule.next_after(monday), datetime.datetime(2025, 3, 17, 0, 0, tzinfo=datetime.timezone.utc))
+
+    def test_invalid_expression(self):
+        with self.assertRaises(ValueError):
+            CronSchedule('61 * * * *')
+        with self.assertRaises(ValueError):
+            CronSchedule('* * *')
+
+
+class SchedulerTestCase(TestCase):
+    def test_slot_runs_only_once(self):
+        calls = []
+        scheduler = Scheduler({'scrape': ('0 6 * * *', lambda: calls.append(1))})
+        slot = datetime.datetime(2025, 3, 1, 6, 0, tzinfo=datetime.timezone.utc)
+
+        scheduler.run_job('scrape', lambda: calls.append(1), slot)
+        # A second worker trying the same slot must skip it
+        scheduler.run_job('scrape', lambda: calls.append(1), slot)
+
+        self.assertEqual(len(calls), 1)
+        run = SchedulerRun.objects.get(job_name='scrape', scheduled_for=slot)
+        self.assertEqual(run.status, RunStatus.SUCCEEDED)
+        self.assertIsNotNone(run.finished_at)
+
+    def test_job_waits_for_the_jobs_it_must_not_overlap(self):
+        locks = []
+
+        @contextlib.contextmanager
+        def recording_lock(name, wait=False):
+            locks.append((name, wait))
+            yield True
+
+        calls = []
+        scheduler = Scheduler(
+            {'scrape': ('0 6 * * *', None), 'digest': ('30 6 * * *', None)},
+            waits_for={'digest': ['scrape']},
+        )
+        slot = datetime.datetime(2025, 3, 1, 6, 30, tzinfo=datetime.timezone.utc)
+        with patch('scraper.scheduler.advisory_lock', recording_lock):
+            scheduler.run_job('digest', lambda: calls.append(list(locks)), slot)
+
+        # The digest holds the scrape lock, waited for, while it runs
+        self.assertEqual(calls, [[('digest', False), ('scrape', True)]])
+
+    def test_slot_with_a_held_lock_waits_for_it(self):
+        @contextlib.contextmanager
+        def held_lock(name, wait=False):
+            yield False
+
+        calls = []
+        scheduler = Scheduler({'scrape': ('0 6 * * *', lambda: calls.append(1))}, waits_for={'digest': ['scrape']})
+        slot = timezone.now().replace(second=0, microsecond=0) - datetime.timedelta(minutes=5)
+        scheduler.next_runs['scrape'] = slot
+        # The digest holds the scrape lock while it runs
+        SchedulerRun.objects.create(job_name='digest', scheduled_for=slot)
+
+        with patch('scraper.scheduler.advisory_lock', held_lock), self.assertLogs('scraper.scheduler', 'INFO') as logs:
+            scheduler.run_pending()
+        self.assertIn("its lock is held by 'digest'", logs.output[0])
+        self.assertEqual((calls, scheduler.next_runs['scrape']), ([], slot))
+
+        # Tried again once the lock is free
+        scheduler.retry_at['scrape'] = timezone.now()
+        scheduler.run_pending()
+        self.assertEqual(calls, [1])
+        self.assertGreater(scheduler.next_runs['scrape'], slot)
+
+    def test_slot_is_dropped_when_the_next_one_is_due(self):
+        @contextlib.contextmanager
+        def held_lock(name, wait=False):
+            yield False
+
+        scheduler = Scheduler({'scrape': ('*/5 * * * *', None)})
+        slot = timezone.now().replace(second=0, microsecond=0) - datetime.timedelta(minutes=30)
+        scheduler.next_runs['scrape'] = slot
+
+        with patch('scraper.scheduler.advisory_lock', held_lock), \
+                self.assertLogs('scraper.scheduler', 'WARNING') as logs:
+            scheduler.run_pending()
+        self.assertIn('dropped', logs.output[0])
+        self.assertGreater(scheduler.next_runs['scrape'], timezone.now())
@@ -0,0 +1,38 @@
+# jobscraper/scraper/tests/test_scoring.py
+from django.test import TestCase, override_settings
+from unittest.mock import patch
+
+from scraper.models import Job, JobBoard
+from scraper.scoring import RelevanceScorer, score_jobs
+from scraper.tasks import send_digest
+
+
+class ScoringTestCase(TestCase):
+    def make_job(self, original_id, title):
+        return Job.objects.create(
+            board=JobBoard.PRACUJ, original_id=original_id, title=title, url='', seniority='',
+            salary_text='', description='', requirements='', responsibilities='',
+        )
+
+    def test_scorer_prefers_profile_and_penalizes_excluded_terms(self):
+        documents = ['Analityk danych', 'Kierowca kat. B', 'Programista Python']
+        scorer = RelevanceScorer('analityk danych raportowanie', ['programista']).fit(documents)
+
+        analyst, driver, developer = scorer.score(documents)
+        self.assertGreater(analyst, driver)
+        self.assertEqual(driver, 0)
+        self.assertLess(developer, 0)
+
+    @override_settings(SCORING_PROFILE='analityk danych', DIGEST_MIN_SCORE=0.0)
+    def test_digest_sorted_by_score(self):
+        self.make_job('1', 'Kierowca')
+        self.make_job('2', 'Programista Java')
+        analyst = self.make_job('3', 'Starszy analityk danych')
+
+        with patch('scraper.tasks.queue_mail_with_offers') as send_mail:
+            self.assertEqual(send_digest(), 2)
+
+        offers = list(send_mail.call_args.args[0])
+        self.assertEqual([offer['title'] for offer in offers], [analyst.title, 'Kierowca'])
+        # Only new jobs are scored on the next run
+        self.assertEqual(score_jobs(), 0)
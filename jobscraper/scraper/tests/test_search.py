@@ -0,0 +1,32 @@
+# jobscraper/scraper/tests/test_search.py
+from django.test import TestCase
+
+from scraper.models import Job, JobBoard
+from scraper.search import search_jobs
+
+
+class SearchTestCase(TestCase):
+    def make_job(self, original_id, title, description=''):
+        return Job.objects.create(
+            board=JobBoard.PRACUJ, original_id=original_id, title=title, url='', seniority='',
+            salary_text='', description=description, requirements='', responsibilities='',
+        )
+
+    def test_inflected_and_unaccented_matches(self):
+        analyst = self.make_job('1', 'Analityk danych')
+        described = self.make_job('2', 'Specjalista ds. raportowania', description='Praca z analityką danych w Krakowie')
+        self.make_job('3', 'Kierowca')
+
+        results = search_jobs('analityka dane')
+        self.assertEqual([job.id for job in results], [analyst.id, described.id])
+        self.assertGreater(results[0].rank, results[1].rank)
+
+        self.assertEqual([job.id for job in search_jobs('krakow')], [described.id])
+
+    def test_index_follows_updates(self):
+        job = self.make_job('1', 'Kierowca')
+        job.title = 'Analityk'
+        job.save()
+
+        self.assertEqual([result.id for result in search_jobs('analityk')], [job.id])
+        self.assertEqual(search_jobs('kierowca'), [])
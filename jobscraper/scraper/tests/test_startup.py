@@ -0,0 +1,28 @@
+# jobscraper/scraper/tests/test_startup.py
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from scraper.management.commands.check_startup import parse_importtime
+
+
+class StartupTestCase(SimpleTestCase):
+    def test_commands_start_without_heavy_imports(self):
+        out = StringIO()
+        # Raises CommandError if a command imports Playwright, NumPy etc. Import
+        # times depend on the machine, so they are left to check_startup runs
+        call_command(
+            'check_startup', 'count_jobs', 'export_jobs_csv', 'scrape_jobs', 'run_scheduler',
+            budget_ms=0, stdout=out,
+        )
+        self.assertIn('Startup within budget', out.getvalue())
+
+    def test_parse_importtime(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |   _io\n'
+            'import time:       300 |        900 | requests\n'
+            'import time:       600 |        600 |   urllib3\n'
+        )
+        self.assertEqual(parse_importtime(output), [('_io', 1, 120), ('requests', 0, 900), ('urllib3', 1, 600)])
@@ -0,0 +1,75 @@
+# jobscraper/scraper/tests/test_synthetic.py
+import io
+from collections import Counter
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from scraper.ingest import JobIngestor, JobRecord
+from scraper.models import ArchivedJob, ArchivedJobKey, Company, Job
+from scraper.retention import archive_jobs
+from scraper.synthetic import SYNTHETIC_PREFIX, delete_synthetic, generate
+
+
+class SyntheticDataTestCase(TestCase):
+    def test_generated_jobs_look_scraped(self):
+        self.assertEqual(generate(400, companies=40, days=30, seed=1), 400)
+
+        jobs = Job.objects.select_related('company')
+        self.assertEqual(jobs.count(), 400)
+        self.assertTrue(all(job.original_id.startswith(SYNTHETIC_PREFIX) for job in jobs))
+        self.assertFalse(jobs.filter(cluster__isnull=True).exists())
+        self.assertTrue(jobs.filter(salary__isnull=False).exists())
+        self.assertTrue(jobs.filter(digest_sent_at__isnull=True).exists())
+        # A few companies post most offers
+        posts = sorted(Counter(job.company_id for job in jobs).values(), reverse=True)
+        self.assertGreater(posts[0], 5 * posts[len(posts) // 2])
+
+        # Seen again by the scraper, they are unchanged
+        records = [
+            JobRecord(job.board, job.original_id, job.title, job.url, job.company.name, job.company.url,
+                      job.seniority, job.salary_text)
+            for job in jobs
+        ]
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(JobIngestor().ingest(records), [])
+        self.assertEqual([query['sql'] for query in captured if not query['sql'].startswith('SELECT')], [])
+
+    def test_delete_keeps_real_jobs(self):
+        company = Company.objects.create(name='acme')
+        Job.objects.create(board=3, original_id='1', title='Analityk', url='', company=company,
+                           description='', requirements='', responsibilities='', seniority='', salary_text='')
+        generate(50, seed=2)
+
+        self.assertEqual(delete_synthetic(), 50)
+        self.assertEqual(list(Job.objects.values_list('original_id', flat=True)), ['1'])
+        self.assertEqual(list(Company.objects.all()), [company])
+
+    def test_delete_removes_archived_synthetic_jobs(self):
+        generate(30, days=30, seed=3)
+        archived = archive_jobs(days=1)
+        self.assertGreater(archived, 0)
+
+        self.assertEqual(delete_synthetic(), 30)
+        self.assertFalse(ArchivedJob.objects.exists())
+        self.assertFalse(ArchivedJobKey.objects.exists())
+
+    def test_benchmark_prints_a_table_and_cleans_up(self):
+        out = io.StringIO()
+        call_command('benchmark_queries', scales='20,60', repeat=1, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        header = next(line for line in lines if line.startswith('query'))
+        self.assertEqual(header.split()[1:], ['20', '60'])
+        self.assertTrue(any(line.startswith('digest ') for line in lines))
+        self.assertFalse(Job.objects.exists())
+
+    def test_benchmark_refuses_a_database_not_named_for_it(self):
+        with patch.dict(connection.settings_dict, {'NAME': '/srv/jobscraper/db.sqlite3'}):
+            with self.assertRaisesMessage(CommandError, 'Pass --force'):
+                call_command('benchmark_queries', scales='20', repeat=1, stdout=io.StringIO())
+        self.assertFalse(Job.objects.exists())
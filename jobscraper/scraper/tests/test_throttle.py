@@ -0,0 +1,97 @@
+# jobscraper/scraper/tests/test_throttle.py
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import requests
+from django.test import TestCase
+
+from scraper.http_client import HttpClient
+from scraper.throttle import CircuitBreaker, HostThrottle, backoff_delay
+
+
+class ThrottleTestCase(TestCase):
+    def make_throttle(self):
+        return HostThrottle(
+            'www.pracuj.pl', rate=1.0, min_rate=0.1, max_rate=2.0, target_latency=5.0,
+            breaker=CircuitBreaker(threshold=3, cooldown=30),
+        )
+
+    def test_rate_adapts_to_responses(self):
+        throttle = self.make_throttle()
+        throttle.record(0.5, status=200)
+        self.assertAlmostEqual(throttle.rate, 1.1)
+        throttle.record(0.5, status=429)
+        self.assertAlmostEqual(throttle.rate, 0.55)
+        # Slow responses also back off, without counting as failures
+        throttle.record(8.0, status=200)
+        self.assertAlmostEqual(throttle.rate, 0.275)
+        self.assertEqual(throttle.breaker.consecutive_failures, 0)
+
+    def test_breaker_opens_and_half_opens(self):
+        throttle = self.make_throttle()
+        for _ in range(3):
+            throttle.record(20.0, timed_out=True)
+        metrics = throttle.metrics()
+        self.assertEqual(metrics['breaker_state'], CircuitBreaker.OPEN)
+        self.assertEqual(metrics['timeouts'], 3)
+
+        breaker = throttle.breaker
+        self.assertGreater(breaker.seconds_until_allowed(time.monotonic()), 0)
+        # After the cooldown exactly one probe gets through
+        later = breaker.open_until + 1
+        self.assertEqual(breaker.seconds_until_allowed(later), 0)
+        self.assertGreater(breaker.seconds_until_allowed(later), 0)
+        throttle.record(0.5, status=200)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def open_with_debt(self):
+        """A throttle whose breaker just went half-open, with the bucket in debt."""
+        throttle = self.make_throttle()
+        for _ in range(3):
+            throttle.record(20.0, timed_out=True)
+        throttle.breaker.open_until = time.monotonic() - 1
+        throttle.rate = 10.0
+        throttle.tokens = -1.0
+        throttle.updated_at = time.monotonic()
+        return throttle
+
+    def test_probe_returns_after_waiting_for_its_token(self):
+        throttle = self.open_with_debt()
+        worker = threading.Thread(target=throttle.acquire, daemon=True)
+        worker.start()
+        worker.join(timeout=5)
+        self.assertFalse(worker.is_alive())
+        # The probe is out, its outcome decides the breaker
+        self.assertEqual(throttle.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(throttle.breaker.probe_in_flight)
+
+        throttle = self.open_with_debt()
+        asyncio.run(asyncio.wait_for(throttle.acquire_async(), timeout=5))
+        self.assertEqual(throttle.breaker.state, CircuitBreaker.HALF_OPEN)
+
+    def test_error_frees_the_probe_without_failing_it(self):
+        throttle = self.open_with_debt()
+        self.assertEqual(throttle.breaker.seconds_until_allowed(time.monotonic()), 0)
+        throttle.record_error(0.1)
+        self.assertEqual(throttle.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(throttle.breaker.seconds_until_allowed(time.monotonic()), 0)
+        self.assertEqual(throttle.metrics()['errors'], 1)
+
+    def test_backoff_delay_is_capped(self):
+        for attempt in range(10):
+            self.assertLessEqual(backoff_delay(attempt, base=1, cap=8), 8)
+
+    def test_only_timeouts_count_against_the_host(self):
+        throttle = self.make_throttle()
+        client = HttpClient(max_attempts=1)
+        errors = [requests.ConnectionError('Connection refused'), requests.ReadTimeout('Read timed out')]
+        with patch('scraper.http_client.get_throttle', return_value=throttle), \
+                patch.object(client.session, 'request', side_effect=errors):
+            for _ in errors:
+                with self.assertRaises(requests.RequestException):
+                    client.get('https://www.pracuj.pl/')
+
+        self.assertEqual((throttle.errors, throttle.timeouts), (1, 1))
+        self.assertEqual(throttle.breaker.consecutive_failures, 1)
@@ -0,0 +1,92 @@
+# jobscraper/scraper/tests/test_work_queue.py
+import datetime
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from scraper import work_queue
+from scraper.models import PageWorkItem, WorkItemState
+
+
+class WorkQueueTestCase(TestCase):
+    url = 'https://www.pracuj.pl/praca?et=17'
+
+    def test_complete_queues_next_page(self):
+        work_queue.enqueue_page('run', self.url, 1, page_limit=2)
+        # Enqueueing again, e.g. after a crash, must not duplicate the page
+        work_queue.enqueue_page('run', self.url, 1, page_limit=2)
+
+        item = work_queue.claim_item('run')
+        self.assertEqual((item.page_number, item.state, item.attempts), (1, WorkItemState.IN_PROGRESS, 1))
+        self.assertIsNone(work_queue.claim_item('run'))
+
+        work_queue.complete_item(item, jobs_added=3, has_next_page=True)
+        item = work_queue.claim_item('run')
+        self.assertEqual(item.page_number, 2)
+
+        # Page 2 is the limit, so no page 3 gets queued
+        work_queue.complete_item(item, jobs_added=0, has_next_page=True)
+        self.assertIsNone(work_queue.claim_item('run'))
+        self.assertEqual(PageWorkItem.objects.filter(state=WorkItemState.DONE).count(), 2)
+
+    @override_settings(SCRAPER_MAX_PAGE_ATTEMPTS=2)
+    def test_failed_item_is_retried_then_given_up(self):
+        work_queue.enqueue_page('run', self.url, 1)
+
+        work_queue.fail_item(work_queue.claim_item('run'), 'timeout')
+        item = work_queue.claim_item('run')
+        self.assertEqual(item.attempts, 2)
+
+        work_queue.fail_item(item, 'timeout')
+        self.assertEqual(PageWorkItem.objects.get(page_number=1).state, WorkItemState.FAILED)
+        # The search goes on after the page given up on
+        self.assertEqual(work_queue.claim_item('run').page_number, 2)
+
+    @override_settings(SCRAPER_MAX_PAGE_ATTEMPTS=1, SCRAPER_MAX_FAILED_PAGES=3)
+    def test_failed_pages_in_a_row_end_a_search_of_unknown_length(self):
+        work_queue.enqueue_page('run', self.url, 1)
+        work_queue.complete_item(work_queue.claim_item('run'), jobs_added=1, has_next_page=True)
+
+        # Every page after the first fails, like pages past the end do
+        failed = 0
+        while (item := work_queue.claim_item('run')) is not None:
+            work_queue.fail_item(item, 'offers did not load')
+            failed += 1
+            self.assertLess(failed, 10)
+
+        self.assertEqual(failed, 4)
+        self.assertEqual(
+            sorted(PageWorkItem.objects.filter(state=WorkItemState.FAILED).values_list('page_number', flat=True)),
+            [2, 3, 4, 5],
+        )
+
+    @override_settings(SCRAPER_QUEUE_WINDOW=3)
+    def test_pages_are_queued_a_window_ahead(self):
+        work_queue.enqueue_pages('run', self.url, 1, 3)
+        first, second = work_queue.claim_item('run'), work_queue.claim_item('run')
+        self.assertEqual((first.page_number, second.page_number), (1, 2))
+
+        work_queue.complete_item(second, jobs_added=1, has_next_page=True)
+        self.assertEqual(sorted(PageWorkItem.objects.values_list('page_number', flat=True)), [1, 2, 3, 4, 5])
+
+        # Page 3 is past the end, so the pages queued after it are dropped
+        work_queue.complete_item(work_queue.claim_item('run'), jobs_added=0, has_next_page=False)
+        self.assertIsNone(work_queue.claim_item('run'))
+
+    def test_new_run_scrapes_pages_again(self):
+        work_queue.enqueue_page('run', self.url, 1)
+        work_queue.complete_item(work_queue.claim_item('run'), jobs_added=1, has_next_page=False)
+
+        run_key = work_queue.new_run_key()
+        self.assertNotEqual(run_key, work_queue.new_run_key())
+        work_queue.enqueue_page(run_key, self.url, 1)
+        self.assertEqual(work_queue.claim_item(run_key).page_number, 1)
+
+    def test_expired_lease_is_reclaimed(self):
+        work_queue.enqueue_page('run', self.url, 1)
+        item = work_queue.claim_item('run')
+        # Simulate a worker that died while holding the page
+        PageWorkItem.objects.filter(pk=item.pk).update(lease_expires_at=timezone.now() - datetime.timedelta(seconds=1))
+
+        reclaimed = work_queue.claim_item('run')
+        self.assertEqual((reclaimed.pk, reclaimed.attempts), (item.pk, 2))
@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Stops requests to a host after repeated failures.
+
+    Closed: requests flow. After `threshold` consecutive failures it opens and
+    rejects requests for a cooldown that doubles (with jitter) every time it
+    reopens. After the cooldown it is half-open and lets one probe through: a
+    success closes it, a failure opens it again.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, threshold: int, cooldown: float, max_cooldown: float = 600.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.open_until = 0.0
+        self.probe_in_flight = False
+
+    def seconds_until_allowed(self, now: float) -> float:
+        """0 if a request may go now, otherwise how long to wait."""
+        if self.state == self.OPEN:
+            if now < self.open_until:
+                return self.open_until - now
+            self.state = self.HALF_OPEN
+            self.probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            if self.probe_in_flight:
+                # Check back once the probe had time to finish
+                return 1.0
+            self.probe_in_flight = True
+        return 0.0
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+
+    def release_probe(self):
+        """Let another request probe, the one in flight ended without an outcome."""
+        self.probe_in_flight = False
+
+    def record_failure(self, now: float):
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.threshold:
+            cooldown = min(self.max_cooldown, self.cooldown * 2 ** self.times_opened)
+            self.open_until = now + random.uniform(cooldown / 2, cooldown)
+            self.times_opened += 1
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit opened after {self.consecutive_failures} failures, "
+                               f"pausing for {self.open_until - now:.0f}s")
+            self.state = self.OPEN
+
+
+class HostThrottle:
+    """
+    Token bucket for one host whose rate adapts with AIMD.
+
+    Fast successful responses raise the rate by a fixed step, while 429, 5xx,
+    timeouts and responses slower than the target latency halve it. Failures
+    also feed the host's circuit breaker.
+    """
+
+    def __init__(self, host, rate, min_rate, max_rate, target_latency, breaker):
+        self.host = host
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = min_rate
+        self.target_latency = target_latency
+        self.breaker = breaker
+        # Allow a small burst, but never more than a couple of requests
+        self.capacity = 2.0
+        self.tokens = 1.0
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+        self.requests = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.latency_total = 0.0
+
+    def _reserve(self) -> tuple:
+        """
+        Take a token if the breaker lets a request through.
+
+        Returns:
+            tuple: (seconds until the breaker lets a request through, seconds
+                until the token may be used); no token is taken while the
+                first is not 0
+        """
+        with self.lock:
+            now = time.monotonic()
+            breaker_wait = self.breaker.seconds_until_allowed(now)
+            if breaker_wait:
+                return breaker_wait, 0.0
+
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0, 0.0
+            return 0.0, -self.tokens / self.rate
+
+    def acquire(self):
+        """Block until a request to this host is allowed."""
+        while True:
+            breaker_wait, token_wait = self._reserve()
+            if not breaker_wait:
+                break
+            time.sleep(breaker_wait)
+        # Let through by the breaker, possibly as its half-open probe, and
+        # holding a token that is ours once the wait is over
+        if token_wait:
+            time.sleep(token_wait)
+
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a request is allowed."""
+        while True:
+            breaker_wait, token_wait = self._reserve()
+            if not breaker_wait:
+                break
+            await asyncio.sleep(breaker_wait)
+        if token_wait:
+            await asyncio.sleep(token_wait)
+
+    def record(self, latency: float, status: int = None, timed_out: bool = False):
+        """
+        Report the outcome of a request.
+
+        Args:
+            latency (float): Seconds the request took
+            status (int, optional): HTTP status code, if a response arrived
+            timed_out (bool): Whether the request timed out
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.requests += 1
+            self.latency_total += latency
+
+            pushed_back = timed_out or status == 429 or (status is not None and status >= 500)
+            if status == 429:
+                self.throttled += 1
+            elif status is not None and status >= 500:
+                self.server_errors += 1
+            if timed_out:
+                self.timeouts += 1
+
+            if pushed_back:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.tokens = min(self.tokens, 0.0)
+                self.breaker.record_failure(now)
+            else:
+                if latency > self.target_latency:
+                    self.rate = max(self.min_rate, self.rate / 2)
+                else:
+                    self.rate = min(self.max_rate, self.rate + self.increase_step)
+                self.breaker.record_success()
+
+    def record_error(self, latency: float):
+        """
+        Report a request that failed without a response or a timeout, e.g.
+        one aborted by the browser. It says nothing about the host, so only
+        frees the breaker's probe for another request.
+        """
+        with self.lock:
+            self.requests += 1
+            self.errors += 1
+            self.latency_total += latency
+            self.breaker.release_probe()
+
+    def metrics(self) -> dict:
+        with self.lock:
+            return {
+                'rate': round(self.rate, 3),
+                'breaker_state': self.breaker.state,
+                'breaker_opened': self.breaker.times_opened,
+                'consecutive_failures': self.breaker.consecutive_failures,
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'server_errors': self.server_errors,
+                'timeouts': self.timeouts,
+                'errors': self.errors,
+                'avg_latency': round(self.latency_total / self.requests, 3) if self.requests else 0.0,
+            }
+
+
+_throttles = {}
+_throttles_lock = threading.Lock()
+
+
+def get_throttle(url: str) -> HostThrottle:
+    """Return the shared throttle for the host of `url`."""
+    host = urlparse(url).netloc or url
+    with _throttles_lock:
+        throttle = _throttles.get(host)
+        if throttle is None:
+            throttle = HostThrottle(
+                host,
+                rate=settings.SCRAPER_RATE_INITIAL,
+                min_rate=settings.SCRAPER_RATE_MIN,
+                max_rate=settings.SCRAPER_RATE_MAX,
+                target_latency=settings.SCRAPER_TARGET_LATENCY,
+                breaker=CircuitBreaker(
+                    threshold=settings.SCRAPER_BREAKER_THRESHOLD,
+                    cooldown=settings.SCRAPER_BREAKER_COOLDOWN,
+                ),
+            )
+            _throttles[host] = throttle
+        return throttle
+
+
+def metrics() -> dict:
+    """Current rate, breaker state and counters of every host, by host name."""
+    with _throttles_lock:
+        throttles = list(_throttles.values())
+    return {throttle.host: throttle.metrics() for throttle in throttles}
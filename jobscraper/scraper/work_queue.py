@@ -0,0 +1,172 @@
+import datetime
+import logging
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from scraper.models import PageWorkItem, WorkItemState
+
+logger = logging.getLogger(__name__)
+
+
+def current_run_key() -> str:
+    """
+    Runs are daily by default, so pages already done today are not scraped
+    again, and a run that was interrupted resumes where it stopped.
+    """
+    return timezone.now().date().isoformat()
+
+
+def new_run_key() -> str:
+    """A key no other run has, for a run that must scrape every page again."""
+    return f'{timezone.now():%Y-%m-%dT%H%M%S}-{uuid.uuid4().hex[:8]}'
+
+
+def enqueue_pages(run_key, search_url, first, last, page_limit=None):
+    """Add pages first to last (but not past page_limit) to the queue, skipping those this run already has."""
+    if page_limit is not None:
+        last = min(last, page_limit)
+    PageWorkItem.objects.bulk_create(
+        [PageWorkItem(
+            run_key=run_key,
+            search_url=search_url,
+            page_number=page_number,
+            page_limit=page_limit,
+        ) for page_number in range(first, last + 1)],
+        ignore_conflicts=True,
+    )
+
+
+def enqueue_page(run_key, search_url, page_number, page_limit=None):
+    """Add a page to the queue unless this run already has it."""
+    enqueue_pages(run_key, search_url, page_number, page_number, page_limit)
+
+
+def _enqueue_following(item):
+    """Keep SCRAPER_QUEUE_WINDOW pages after item queued, so workers can take them side by side."""
+    enqueue_pages(
+        item.run_key, item.search_url,
+        item.page_number + 1, item.page_number + settings.SCRAPER_QUEUE_WINDOW,
+        item.page_limit,
+    )
+
+
+def _enqueue_after_failure(item):
+    """
+    Queue the pages after an item given up on, unless the search looks ended.
+
+    Without a page limit, pages past the end of a search fail too (they have
+    no offers to wait for), so nothing more is queued once the item and the
+    pages before it make SCRAPER_MAX_FAILED_PAGES failed pages in a row.
+    """
+    if item.page_limit is None:
+        failed_before = PageWorkItem.objects.filter(
+            run_key=item.run_key,
+            search_url=item.search_url,
+            page_number__gte=item.page_number - settings.SCRAPER_MAX_FAILED_PAGES + 1,
+            page_number__lt=item.page_number,
+            state=WorkItemState.FAILED,
+        ).count()
+        if failed_before + 1 >= settings.SCRAPER_MAX_FAILED_PAGES:
+            logger.error(f"{failed_before + 1} pages in a row failed, not queueing pages after {item}")
+            return
+    _enqueue_following(item)
+
+
+def claim_item(run_key=None, search_url=None):
+    """
+    Lease the oldest claimable work item, or return None if there is none.
+
+    An item is claimable when it is pending, or when the worker holding it
+    let its lease expire (e.g. the process died). Rows locked by other
+    workers are skipped, so any number of workers can drain the same queue.
+    """
+    now = timezone.now()
+    claimable = (
+        PageWorkItem.objects
+        .select_for_update(skip_locked=True)
+        .filter(
+            Q(state=WorkItemState.PENDING)
+            | Q(state=WorkItemState.IN_PROGRESS, lease_expires_at__lt=now)
+        )
+        .order_by('id')
+    )
+    if run_key:
+        claimable = claimable.filter(run_key=run_key)
+    if isinstance(search_url, (list, tuple)):
+        # Any of the parts of a partitioned search
+        claimable = claimable.filter(search_url__in=search_url)
+    elif search_url:
+        claimable = claimable.filter(search_url=search_url)
+
+    with transaction.atomic():
+        for item in claimable[:10]:
+            if item.attempts >= settings.SCRAPER_MAX_PAGE_ATTEMPTS:
+                # Its last worker died mid-page too many times
+                item.state = WorkItemState.FAILED
+                item.lease_expires_at = None
+                item.save(update_fields=['state', 'lease_expires_at', 'updated_at'])
+                logger.error(f"Giving up on {item} after {item.attempts} attempts")
+                # The rest of the search may still be worth scraping
+                _enqueue_after_failure(item)
+                continue
+
+            item.state = WorkItemState.IN_PROGRESS
+            item.attempts += 1
+            item.lease_expires_at = now + datetime.timedelta(seconds=settings.SCRAPER_PAGE_LEASE_SECONDS)
+            item.save(update_fields=['state', 'attempts', 'lease_expires_at', 'updated_at'])
+            return item
+
+    return None
+
+
+def complete_item(item, jobs_added, has_next_page):
+    """Mark an item done and queue the following pages of the same search."""
+    with transaction.atomic():
+        item.state = WorkItemState.DONE
+        item.jobs_added = jobs_added
+        item.lease_expires_at = None
+        item.save(update_fields=['state', 'jobs_added', 'lease_expires_at', 'updated_at'])
+
+        if has_next_page:
+            _enqueue_following(item)
+        else:
+            # Pages queued ahead are past the end too, unless a worker already took them
+            PageWorkItem.objects.filter(
+                run_key=item.run_key,
+                search_url=item.search_url,
+                page_number__gt=item.page_number,
+                state=WorkItemState.PENDING,
+            ).update(state=WorkItemState.DONE, updated_at=timezone.now())
+
+
+def fail_item(item, error):
+    """
+    Return an item to the queue, or fail it once it is out of attempts.
+
+    A failed page doesn't end its search: the pages after it are queued as if
+    it had offers, and an empty one ends the search as usual. A run of failed
+    pages does end it, see _enqueue_after_failure.
+    """
+    with transaction.atomic():
+        if item.attempts >= settings.SCRAPER_MAX_PAGE_ATTEMPTS:
+            item.state = WorkItemState.FAILED
+            logger.error(f"Giving up on {item} after {item.attempts} attempts: {error}")
+        else:
+            item.state = WorkItemState.PENDING
+        item.lease_expires_at = None
+        item.last_error = str(error)[:1024]
+        item.save(update_fields=['state', 'lease_expires_at', 'last_error', 'updated_at'])
+        if item.state == WorkItemState.FAILED:
+            # Saved first, so it counts among the failed pages in a row
+            _enqueue_after_failure(item)
+
+
+def purge_old_items(days=7):
+    """Delete work items of runs older than `days` days."""
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+    deleted, _ = PageWorkItem.objects.filter(created_at__lt=cutoff).delete()
+    return deleted